@@ -0,0 +1,336 @@
+"""
+Offline benchmark of the row level validation, against local SQLite stand-ins
+for the Source & Target DBs. No DB server is needed.
+
+For each scenario (rows x columns x type mix x drift rate), a Source & a Target
+table are generated, then validated with data_validation_single_table(), the
+same way app.py validates a table. Each scenario runs in a new process, so the
+peak RSS reported is the scenario's own.
+
+Usage (from the project root):
+
+    python -m benchmarks.benchmark
+    python -m benchmarks.benchmark --rows 10000,100000 --columns 10,50 --types mixed,text
+    python -m benchmarks.benchmark --set DATA_VALIDATION_REC_COUNT=100000 --set TABLE_PARTITIONS=4
+
+The number of records validated is DATA_VALIDATION_REC_COUNT (see settings.py,
+or override it with --set). Log & output files are written to logs &
+data_validation_reports, as in a normal run.
+"""
+import argparse
+import ast
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import settings
+from tabulate import tabulate
+
+# Column types of each type mix. The columns of a table cycle through them.
+TYPE_MIXES = {
+    "numeric": ["int", "float"],
+    "text": ["text"],
+    "datetime": ["datetime"],
+    "mixed": ["int", "float", "text", "datetime"],
+}
+
+SQLITE_TYPES = {
+    "int": "INTEGER",
+    "float": "REAL",
+    "text": "VARCHAR(100)",
+    "datetime": "TIMESTAMP",
+}
+
+# Phases reported for each run, see src/metrics.py. Times are added up over the
+# partitions of a table, so they can add up to more than the total.
+PHASES = ["source_fetch", "target_fetch", "merge", "compare", "output"]
+
+
+def parse_list(value, convert):
+    return [convert(item) for item in value.split(",") if item.strip() != ""]
+
+
+def parse_setting(value):
+    """
+    Parses a NAME=VALUE override of a setting. VALUE is a Python literal.
+    """
+    name, _, literal = value.partition("=")
+
+    if not hasattr(settings, name):
+        raise argparse.ArgumentTypeError(f"Unknown setting: {name}")
+
+    try:
+        return name, ast.literal_eval(literal)
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f"{name}: {literal} is not a Python literal")
+
+
+# ------------------------------------------------------------------------------#
+# Synthetic tables.                                                             #
+# ------------------------------------------------------------------------------#
+def generate_column(rng, column_type, no_rows):
+    if column_type == "int":
+        return pd.Series(rng.integers(0, 1_000_000, no_rows), dtype=object)
+
+    if column_type == "float":
+        return pd.Series(np.round(rng.random(no_rows) * 1000, 4), dtype=object)
+
+    if column_type == "text":
+        values = rng.integers(0, 1_000_000_000, no_rows).astype(str)
+        return pd.Series(np.char.add("value_", values), dtype=object)
+
+    if column_type == "datetime":
+        seconds = rng.integers(0, 10 * 365 * 86400, no_rows)
+        values = pd.Timestamp("2015-01-01") + pd.to_timedelta(seconds, unit="s")
+        return pd.Series(values.strftime("%Y-%m-%d %H:%M:%S"), dtype=object)
+
+    raise ValueError(f"Unknown column type: {column_type}")
+
+
+def drift_column(column_type, values):
+    """
+    Changes the given values, so that they don't match the Source anymore.
+    """
+    if column_type in ["int", "float"]:
+        return values.map(lambda value: None if value is None else value + 1)
+
+    if column_type == "text":
+        return values.map(lambda value: None if value is None else value + "_changed")
+
+    return values.map(
+        lambda value: None if value is None else str(pd.Timestamp(value) + pd.Timedelta(days=1))
+    )
+
+
+def generate_tables(scenario, src_db, tgt_db, null_rate, missing_rate, seed):
+    """
+    Creates the Source & Target tables of a scenario. The Target table is a
+    copy of the Source table, with `drift` of its records changed (one column
+    each) and `missing_rate` of its records deleted.
+    """
+    rng = np.random.default_rng(seed)
+    no_rows = scenario["rows"]
+    column_types = [
+        TYPE_MIXES[scenario["types"]][i % len(TYPE_MIXES[scenario["types"]])]
+        for i in range(scenario["columns"])
+    ]
+
+    source_df = pd.DataFrame({"id": np.arange(1, no_rows + 1)})
+
+    for i, column_type in enumerate(column_types):
+        values = generate_column(rng, column_type, no_rows)
+        values[rng.random(no_rows) < null_rate] = None
+        source_df[f"c{i + 1}"] = values
+
+    target_df = source_df.copy()
+
+    if len(column_types) > 0:
+        drifted = np.flatnonzero(rng.random(no_rows) < scenario["drift"])
+        drifted_columns = rng.integers(0, len(column_types), len(drifted))
+
+        for i, column_type in enumerate(column_types):
+            rows = drifted[drifted_columns == i]
+            column = f"c{i + 1}"
+            target_df.loc[rows, column] = drift_column(column_type, target_df.loc[rows, column])
+
+    target_df = target_df[rng.random(no_rows) >= missing_rate]
+
+    columns_ddl = ", ".join(
+        ["id INTEGER PRIMARY KEY"]
+        + [f"c{i + 1} {SQLITE_TYPES[column_type]}" for i, column_type in enumerate(column_types)]
+    )
+
+    for db_file, df in [(src_db, source_df), (tgt_db, target_df)]:
+        with sqlite3.connect(db_file) as connection:
+            connection.execute(f"DROP TABLE IF EXISTS {scenario['table']}")
+            connection.execute(f"CREATE TABLE {scenario['table']} ({columns_ddl})")
+            connection.executemany(
+                f"INSERT INTO {scenario['table']} VALUES ({', '.join(['?'] * len(df.columns))})",
+                df.itertuples(index=False, name=None),
+            )
+
+    return len(target_df)
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process, in bytes. None, where
+    the resource module isn't available (Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Kilobytes on Linux, bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_scenario(scenario, src_db, tgt_db, overrides):
+    """
+    Validates the scenario's table. Runs in its own process: the settings are
+    overridden before the validation modules are imported.
+    """
+    for name, value in overrides:
+        setattr(settings, name, value)
+
+    import src.data_validation as data_validation
+    import src.output_writers as output_writers
+    from src.compare_processes import shutdown_compare_processes
+    from databases.engines import dispose_engines
+
+    src_config = {"db_engine": "SQLite", "host": "", "port": "", "service": src_db, "user": "", "password": ""}
+    tgt_config = {"db_engine": "SQLite", "host": "", "port": "", "service": tgt_db, "user": "", "password": ""}
+
+    start = time.perf_counter()
+    result = data_validation.data_validation_single_table(
+        "main", scenario["table"], ["id"], src_config, tgt_config
+    )
+    output_writers.wait_for_outputs()
+    total = time.perf_counter() - start
+
+    shutdown_compare_processes()
+
+    dispose_engines()
+
+    phases = result.metrics.to_dict()["phases"]
+    times = {phase: phases.get(phase, {"seconds": 0.0})["seconds"] for phase in PHASES}
+
+    return {
+        **scenario,
+        "status": result.status,
+        "message": result.message,
+        "rows_validated": result.no_recs_validated,
+        "rows_having_differences": result.no_recs_having_differences,
+        "seconds": total,
+        "rows_per_second": result.no_recs_validated / total if total > 0 else None,
+        "peak_rss_mb": None if peak_rss() is None else peak_rss() / 1024 / 1024,
+        "phases": times,
+    }
+
+
+def print_results(results):
+    headers = ["table", "rows", "cols", "types", "drift", "validated", "diffs", "rows/s",
+               "peak RSS MB", "total s"] + [f"{phase} s" for phase in PHASES]
+    rows = []
+
+    for r in results:
+        rows.append(
+            [r["table"], r["rows"], r["columns"], r["types"], r["drift"], r["rows_validated"],
+             r["rows_having_differences"],
+             None if r["rows_per_second"] is None else round(r["rows_per_second"]),
+             None if r["peak_rss_mb"] is None else round(r["peak_rss_mb"], 1),
+             round(r["seconds"], 3)]
+            + [round(r["phases"][phase], 3) for phase in PHASES]
+        )
+
+    print(tabulate(rows, headers=headers, tablefmt="github"))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the data validation against local SQLite DBs."
+    )
+    parser.add_argument("--rows", default="10000", help="Comma separated row counts.")
+    parser.add_argument("--columns", default="10", help="Comma separated column counts.")
+    parser.add_argument(
+        "--types", default="mixed", help=f"Comma separated type mixes: {', '.join(TYPE_MIXES)}."
+    )
+    parser.add_argument(
+        "--drift", default="0,0.01", help="Comma separated rates of Target records changed."
+    )
+    parser.add_argument("--missing", type=float, default=0.0, help="Rate of Target records deleted.")
+    parser.add_argument("--nulls", type=float, default=0.05, help="Rate of null values.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs of each scenario.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--set",
+        type=parse_setting,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Overrides a setting in settings.py, for ex. DATA_VALIDATION_REC_COUNT=100000.",
+    )
+    parser.add_argument("--work-dir", help="Where the DB files are created. Default: a temporary directory.")
+    parser.add_argument("--json", help="Writes the results to this JSON file.")
+    args = parser.parse_args()
+
+    types = parse_list(args.types, str)
+
+    for name in types:
+        if name not in TYPE_MIXES:
+            parser.error(f"Unknown type mix: {name}")
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="data_validation_benchmark_")
+    os.makedirs(work_dir, exist_ok=True)
+    src_db = os.path.join(work_dir, "source.db")
+    tgt_db = os.path.join(work_dir, "target.db")
+
+    scenarios = []
+
+    for no_rows in parse_list(args.rows, int):
+        for no_columns in parse_list(args.columns, int):
+            for type_mix in types:
+                for drift in parse_list(args.drift, float):
+                    scenarios.append(
+                        {
+                            "table": f"bench_{no_rows}_{no_columns}_{type_mix}_{round(drift * 10000)}",
+                            "rows": no_rows,
+                            "columns": no_columns,
+                            "types": type_mix,
+                            "drift": drift,
+                        }
+                    )
+
+    print(f"-> Scenarios: {len(scenarios)}. DB files: {work_dir}")
+
+    # The settings are read when the validation modules are imported. They're
+    # imported by the runs, after the settings are overridden.
+    from src.utils import get_project_root
+
+    root_dir = get_project_root()
+
+    for directory in ["logs", "data_validation_reports"]:
+        os.makedirs(os.path.join(root_dir, directory), exist_ok=True)
+
+    results = []
+
+    try:
+        for scenario in scenarios:
+            start = time.perf_counter()
+            generate_tables(scenario, src_db, tgt_db, args.nulls, args.missing, args.seed)
+            print(f"-> {scenario['table']} generated in {time.perf_counter() - start:.1f}s")
+
+            for _ in range(args.repeat):
+                # A new process for each run, so that the peak RSS is the run's own.
+                with ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    results.append(
+                        executor.submit(run_scenario, scenario, src_db, tgt_db, args.set).result()
+                    )
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=1)
+
+        print(f"-> Results have been written to {os.path.abspath(args.json)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# ------------------------------------------------------------------------------#
+# Entry points to the DB adapters.                                              #
+#                                                                               #
+# The adapters (and their drivers: cx_Oracle, psycopg2, pyodbc) are imported    #
+# on first use, so a run loads only the drivers of its Source & Target DBs.    #
+# Import the functions below rather than the adapter modules.                   #
+# ------------------------------------------------------------------------------#
+import sqlalchemy
+from src.constants import ORACLE, POSTGRES, SQLITE, SQLSERVER
+
+
+def get_db_engine(config):
+    """
+    Returns the shared SQLAlchemy engine for the DB described by the config.
+
+    :param config: Dictionary containing DB connection details.
+    """
+    db_engine = config["db_engine"]
+
+    if db_engine in ORACLE:
+        from .oracle import oracle_get_engine
+
+        return oracle_get_engine(config)
+
+    if db_engine in POSTGRES:
+        from .postgres import postgres_get_engine
+
+        return postgres_get_engine(config)
+
+    if db_engine in SQLSERVER:
+        from .sql_server import sqlserver_get_engine
+
+        return sqlserver_get_engine(config)
+
+    if db_engine in SQLITE:
+        from .sqlite import sqlite_get_engine
+
+        return sqlite_get_engine(config)
+
+    raise ValueError(f"{db_engine} IS NOT SUPPORTED AT THE MOMENT")
+
+
+def table_to_df(config, query, params=None):
+    """
+    Executes given SQL query on the DB described by the config and returns a
+    Pandas DataFrame.
+
+    :param config: Dictionary containing DB connection details.
+    :param query: SQL query to be executed.
+    :param params: Parameters to be passed to the query.
+    """
+    db_engine = config["db_engine"]
+
+    if db_engine in ORACLE:
+        from .oracle import oracle_table_to_df
+
+        return oracle_table_to_df(config, query, params)
+
+    if db_engine in POSTGRES:
+        from .postgres import postgres_table_to_df
+
+        return postgres_table_to_df(config, query, params)
+
+    if db_engine in SQLSERVER:
+        from .sql_server import sqlserver_table_to_df
+
+        return sqlserver_table_to_df(config, query, params)
+
+    if db_engine in SQLITE:
+        from .sqlite import sqlite_table_to_df
+
+        return sqlite_table_to_df(config, query, params)
+
+    raise ValueError(f"{db_engine} IS NOT SUPPORTED AT THE MOMENT")
+
+
+def table_to_df_chunks(config, query, params, chunksize):
+    """
+    Executes given SQL query on the DB described by the config using a server
+    side cursor, and returns an iterator of Pandas DataFrames.
+
+    :param config: Dictionary containing DB connection details.
+    :param query: SQL query to be executed.
+    :param params: Parameters to be passed to the query.
+    :param chunksize: Number of records in each DataFrame.
+    """
+    db_engine = config["db_engine"]
+
+    if db_engine in ORACLE:
+        from .oracle import oracle_table_to_df_chunks
+
+        return oracle_table_to_df_chunks(config, query, params, chunksize)
+
+    if db_engine in POSTGRES:
+        from .postgres import postgres_table_to_df_chunks
+
+        return postgres_table_to_df_chunks(config, query, params, chunksize)
+
+    if db_engine in SQLSERVER:
+        from .sql_server import sqlserver_table_to_df_chunks
+
+        return sqlserver_table_to_df_chunks(config, query, params, chunksize)
+
+    if db_engine in SQLITE:
+        from .sqlite import sqlite_table_to_df_chunks
+
+        return sqlite_table_to_df_chunks(config, query, params, chunksize)
+
+    raise ValueError(f"{db_engine} IS NOT SUPPORTED AT THE MOMENT")
+
+
+def table_columns(config, schema, table):
+    """
+    Returns the columns of a table, using SQLAlchemy's inspector.
+
+    :return: A list of dictionaries with keys: name, type (a SQLAlchemy type), nullable.
+    """
+    engine = get_db_engine(config)
+
+    # Unquoted identifiers are stored in upper case in Oracle and in lower case
+    # in the other DBs. SQLAlchemy expects them in lower case.
+    return sqlalchemy.inspect(engine).get_columns(table.lower(), schema=schema.lower())
@@ -0,0 +1,239 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from settings import (ENGINE_MAX_OVERFLOW, ENGINE_POOL_RECYCLE, ENGINE_POOL_SIZE,
+                      FETCH_BUFFER_SIZE, SQL_ALCHEMY_ECHO_MODE)
+from sqlalchemy import exc as sa_exc
+
+# ------------------------------------------------------------------------------#
+# Process wide registry of SQLAlchemy engines.                                  #
+#                                                                               #
+# Creating an engine for every query means a fresh login for every table (and  #
+# one more for the primary key lookup). Engines are cached here, keyed by the   #
+# connection config, so all the validation threads share one connection pool   #
+# per database.                                                                 #
+# ------------------------------------------------------------------------------#
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def engine_key(config):
+    """
+    Returns the key used to identify an engine in the registry.
+
+    :param config: Dictionary containing DB connection details.
+    """
+    return (
+        config["db_engine"],
+        config["host"],
+        str(config["port"]),
+        config["service"],
+        config["user"],
+        config["password"],
+    )
+
+
+def get_engine(config, url, **kwargs):
+    """
+    Returns the cached engine for the given connection config. The engine is
+    created on first use.
+
+    :param config: Dictionary containing DB connection details.
+    :param url: SQLAlchemy connection URL, used only when the engine is created.
+    :param kwargs: Extra, dialect specific arguments to create_engine().
+    """
+    key = engine_key(config)
+
+    with _engines_lock:
+        engine = _engines.get(key)
+
+        if engine is None:
+            engine = sqlalchemy.create_engine(
+                url,
+                pool_size=ENGINE_POOL_SIZE,
+                max_overflow=ENGINE_MAX_OVERFLOW,
+                pool_recycle=ENGINE_POOL_RECYCLE,
+                pool_pre_ping=True,
+                echo=SQL_ALCHEMY_ECHO_MODE,
+                **kwargs,
+            )
+            _engines[key] = engine
+
+    return engine
+
+
+def dispose_engines():
+    """
+    Closes all the pooled connections and empties the registry.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+
+        _engines.clear()
+
+
+def read_sql_chunks(engine, query, params, chunksize):
+    """
+    Executes given SQL query using a server side cursor and yields the result as
+    Pandas DataFrames of `chunksize` records. Only one chunk is held in memory
+    at a time.
+
+    :param engine: SQLAlchemy engine.
+    :param query: SQL query to be executed.
+    :param params: Parameters to be passed to the query, can be None.
+    :param chunksize: Number of records in each DataFrame.
+    """
+    with engine.connect().execution_options(stream_results=True) as connection:
+        for df in pd.read_sql(
+            query, connection, params=params, chunksize=chunksize, coerce_float=False
+        ):
+            yield exact_decimals(df)
+
+
+# Bounds of the cursor arraysize used by read_sql_columnar().
+MIN_FETCH_ARRAYSIZE = 100
+MAX_FETCH_ARRAYSIZE = 100000
+
+# Width assumed for a column whose size the driver doesn't report (LOBs, etc.).
+DEFAULT_COLUMN_WIDTH = 4000
+
+# Range of the integer Decimals converted to int64, see exact_decimals().
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+
+def read_sql_columnar(engine, query, params):
+    """
+    Executes given SQL query on a driver (DB-API) cursor & returns a Pandas
+    DataFrame. Records are fetched in batches of FETCH_BUFFER_SIZE bytes and
+    put together a column at a time: no SQLAlchemy Row is created per record.
+    The column types are the ones pd.read_sql() would return, except for the
+    Decimals, see exact_decimals().
+
+    :param engine: SQLAlchemy engine. Its dialect is used to bind the parameters
+        & to name the columns.
+    :param query: SQL query to be executed. A string is passed to the driver as
+        it is, like pd.read_sql() does.
+    :param params: Parameters to be passed to the query, can be None.
+    """
+    dialect = engine.dialect
+
+    if isinstance(query, str):
+        statement, parameters = query, params
+    else:
+        compiled = query.compile(dialect=dialect)
+        statement = str(compiled)
+        parameters = compiled.construct_params(params or {})
+
+        if compiled.positiontup is not None:
+            parameters = [parameters[name] for name in compiled.positiontup]
+
+    dbapi = getattr(dialect, "loaded_dbapi", None) or dialect.dbapi
+    connection = engine.raw_connection()
+
+    try:
+        cursor = connection.cursor()
+
+        if parameters is None:
+            cursor.execute(statement)
+        else:
+            cursor.execute(statement, parameters)
+
+        names = [column[0] for column in cursor.description]
+        cursor.arraysize = fetch_arraysize(cursor.description)
+        columns = [[] for _ in names]
+
+        while True:
+            rows = cursor.fetchmany(cursor.arraysize)
+
+            if len(rows) == 0:
+                break
+
+            for column, values in zip(columns, zip(*rows)):
+                column.append(np.fromiter(values, dtype=object, count=len(rows)))
+
+        cursor.close()
+    except dbapi.Error as err:
+        raise sa_exc.DBAPIError(statement, parameters, err)
+    finally:
+        connection.close()
+
+    # Oracle reports case insensitive names in upper case, SQLAlchemy lowers them.
+    if getattr(dialect, "requires_name_normalize", False):
+        names = [dialect.normalize_name(name) for name in names]
+
+    df = pd.DataFrame(
+        {
+            index: np.concatenate(column) if len(column) > 0 else np.empty(0, dtype=object)
+            for index, column in enumerate(columns)
+        }
+    )
+    df = exact_decimals(df.infer_objects())
+    df.columns = names
+
+    return df
+
+
+def read_sql(engine, query, params):
+    """
+    Executes given SQL query with pd.read_sql() & returns a Pandas DataFrame.
+    Decimals are kept exact, see exact_decimals().
+    """
+    return exact_decimals(pd.read_sql(query, engine, params=params, coerce_float=False))
+
+
+def exact_decimals(df):
+    """
+    Converts the columns of Decimals (NUMERIC, DECIMAL, Oracle NUMBER) to int64,
+    when all the values are integers that fit in it. Other Decimal columns are
+    kept as they are: float64, as pd.read_sql(coerce_float=True) returns them,
+    would keep only 15 to 17 significant digits, and NUMERIC values wouldn't be
+    compared exactly.
+    """
+    for index in df.columns:
+        if df[index].dtype == object and pd.api.types.infer_dtype(df[index], skipna=True) == "decimal":
+            df[index] = exact_decimal_column(df[index])
+
+    return df
+
+
+def exact_decimal_column(col):
+    """
+    Returns a column of Decimals as int64, when all the values are integers that
+    fit in it. Otherwise, as it is.
+    """
+    if col.isna().any():
+        return col
+
+    for value in col:
+        if not (value.is_finite() and value == value.to_integral_value()):
+            return col
+
+        if not INT64_MIN <= value <= INT64_MAX:
+            return col
+
+    return col.astype("int64")
+
+
+def fetch_arraysize(description):
+    """
+    Returns the no. of records to fetch in a round trip, so that a batch is
+    about FETCH_BUFFER_SIZE bytes. Column widths are taken from the cursor
+    description (internal size, or display size).
+    """
+    row_width = 0
+
+    for column in description:
+        width = column[3] or column[2]
+
+        if width is None or width <= 0:
+            width = DEFAULT_COLUMN_WIDTH
+
+        row_width += max(width, 8)
+
+    arraysize = FETCH_BUFFER_SIZE // max(row_width, 1)
+
+    return int(min(max(arraysize, MIN_FETCH_ARRAYSIZE), MAX_FETCH_ARRAYSIZE))
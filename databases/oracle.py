@@ -4,14 +4,13 @@ import sys
 import warnings
 
 import cx_Oracle
-import pandas as pd
-import sqlalchemy
-from settings import SHOW_CONNECTION_STRING, SQL_ALCHEMY_ECHO_MODE
+from settings import COLUMNAR_FETCH, SHOW_CONNECTION_STRING, SQL_ALCHEMY_ECHO_MODE
 from sqlalchemy import exc as sa_exc
 from sqlalchemy.exc import SQLAlchemyError
 from src.utils import print_messages
 from tabulate import tabulate
 
+from .engines import get_engine, read_sql, read_sql_chunks, read_sql_columnar
 from .oracle_queries import oracle_queries
 
 
@@ -34,6 +33,28 @@ def oracle_get_connection(config):
         sys.exit(1)
 
 
+def oracle_get_engine(config):
+    """
+    Returns the shared SQLAlchemy engine for the given Oracle DB.
+
+    :param config: Dictionary containing DB connection details.
+    """
+    host = config["host"]
+    port = config["port"]
+    service = config["service"]
+    user = config["user"]
+    password = config["password"]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=sa_exc.SAWarning)
+
+        return get_engine(
+            config,
+            f"oracle+cx_oracle://{user}:{password}@{host}:{port}/?service_name={service}",
+            arraysize=1000,
+        )
+
+
 def oracle_table_to_df(config, query, params):
     """"
     Executes given SQL query and returns a Pandas DataFrame.
@@ -62,18 +83,12 @@ def oracle_table_to_df(config, query, params):
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=sa_exc.SAWarning)
 
-            engine = sqlalchemy.create_engine(
-                f"oracle+cx_oracle://{user}:{password}@{host}:{port}/?service_name={service}",
-                arraysize=1000,
-                echo=SQL_ALCHEMY_ECHO_MODE
-            )
-
-            if params is None:
-                df = pd.read_sql(query, engine)
-                return df
-            else:
-                df = pd.read_sql(query, engine, params=params)
-                return df
+            engine = oracle_get_engine(config)
+
+            if COLUMNAR_FETCH:
+                return read_sql_columnar(engine, query, params)
+
+            return read_sql(engine, query, params)
     except SQLAlchemyError as e:
         if SHOW_CONNECTION_STRING:
             msg1 = "VERIFY IF THE CONNECTION STRING IS CORRECT OR NOT !!!"
@@ -84,6 +99,21 @@ def oracle_table_to_df(config, query, params):
         raise e
 
 
+def oracle_table_to_df_chunks(config, query, params, chunksize):
+    """
+    Executes given SQL query and yields the result as Pandas DataFrames of
+    `chunksize` records, using a server side cursor.
+
+    :param config: Dictionary containing DB connection details.
+    :param query: SQL query to be executed.
+    :param params: List of parameters to be passed to the query.
+    :param chunksize: Number of records in each DataFrame.
+    """
+    engine = oracle_get_engine(config)
+
+    return read_sql_chunks(engine, query, params, chunksize)
+
+
 def oracle_execute_query(config, query, parameters):
     """
     Executes given SQL query.
@@ -110,24 +140,10 @@ def oracle_execute_query(config, query, parameters):
 
         # Process all the records
         for record in cur:
-            rec = []
-
             # SQL Query result can contain different types of data - Int, Char, Decimal, CLOB, etc.
             # Converting all types to Char so that, when preparing JSON format, there won't be any
-            # errors.
-            for i in range(len(record)):
-                string_value = ""
-                try:
-                    string_value = str(
-                        record[i]) if record[i] is not None else ""
-                except Exception as error:
-                    print(
-                        "Unable to convert value to String; value: {}".format(
-                            record[i])
-                    )
-
-                rec.append(string_value)
-            records.append(rec)
+            # errors. Text needs no conversion.
+            records.append([to_text(value) for value in record])
         cur.close()
     except Exception as err:
         # A SQL Query could fail due to any number of reasons. Syntax could be wrong, Database could be down,
@@ -141,6 +157,20 @@ def oracle_execute_query(config, query, parameters):
     return records
 
 
+def to_text(value):
+    if value is None:
+        return ""
+
+    if isinstance(value, str):
+        return value
+
+    try:
+        return str(value)
+    except Exception:
+        print("Unable to convert value to String; value: {}".format(repr(value)))
+        return ""
+
+
 def oracle_table_metadata(config, schema, table, print_result=False):
     query = oracle_queries["get_table_ddl"]
     query_result = oracle_execute_query(
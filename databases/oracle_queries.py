@@ -55,8 +55,7 @@ oracle_queries[
     "get_primary_key"
 ] = """
 WITH temp AS (
-    SELECT 'OT' AS owner, 'REGIONS' AS table_name UNION
-    SELECT 'OT' AS owner, 'person' as table_name
+    <temp_placeholder>
 )
 SELECT 
      cols.owner
@@ -86,3 +85,122 @@ FROM
 WHERE
     UPPER(OWNER) = UPPER(:schema)
 """
+
+# ------------------------------------------------------------------------------#
+# Profile validation. One aggregate query per table: the no. of records and   #
+# statistics of each column. Placeholders are replaced in                      #
+# src/profile_validation.py                                                     #
+# ------------------------------------------------------------------------------#
+oracle_queries[
+    "profile"
+] = """
+SELECT
+    COUNT(*) AS row_count
+<aggregates>
+FROM
+    <schema>.<table>
+"""
+
+# ------------------------------------------------------------------------------#
+# Key reconciliation. All the primary key values of a table, in the binary    #
+# order of the keys. Placeholders are replaced in src/key_reconciliation.py    #
+# ------------------------------------------------------------------------------#
+oracle_queries[
+    "ordered_keys"
+] = """
+SELECT
+    <key_columns>
+FROM
+    <schema>.<table>
+ORDER BY
+    <order_by>
+"""
+
+# ------------------------------------------------------------------------------#
+# Sampling. Queries used to pick the records to be validated from the source   #
+# table. Placeholders are replaced in src/sampling.py                          #
+# ------------------------------------------------------------------------------#
+oracle_queries[
+    "sample_first"
+] = """
+SELECT * FROM <schema>.<table> WHERE ROWNUM < <rec_count>
+"""
+
+# Random blocks / pages. Reads only the sampled blocks.
+oracle_queries[
+    "sample_block"
+] = """
+SELECT * FROM <schema>.<table> SAMPLE BLOCK (<percent>) SEED (<seed>) WHERE ROWNUM <= <rec_count>
+"""
+
+# Random records.
+oracle_queries[
+    "sample_row"
+] = """
+SELECT * FROM <schema>.<table> SAMPLE (<percent>) SEED (<seed>) WHERE ROWNUM <= <rec_count>
+"""
+
+# Records from a range of primary key values, read using the primary key index.
+oracle_queries[
+    "sample_range"
+] = """
+SELECT * FROM (
+    SELECT
+        *
+    FROM
+        <schema>.<table>
+    WHERE
+        <key_column> >= :range_start
+    AND <key_column> < :range_end
+    ORDER BY
+        <key_column>
+)
+WHERE ROWNUM <= <rec_count>
+"""
+
+oracle_queries[
+    "key_range"
+] = """
+SELECT MIN(<key_column>) AS min_value, MAX(<key_column>) AS max_value FROM <schema>.<table>
+"""
+
+# Incremental validation: records changed within a watermark window, in the
+# order of the watermark & primary key. The watermark (dv_watermark) & key of the
+# last record are where the next run starts, when not all of them are read.
+# <key_filter> skips the records up to that key, see sampling.py.
+oracle_queries[
+    "sample_changed"
+] = """
+SELECT
+    *
+FROM (
+    SELECT
+        t.*
+      , <watermark_column> AS dv_watermark
+    FROM
+        <schema>.<table> t
+    WHERE
+        <watermark_column> >= :watermark_start
+    AND <watermark_column> < :watermark_end
+    <key_filter>
+    ORDER BY
+        <watermark_column>
+      , <key_columns>
+)
+WHERE
+    ROWNUM <= <rec_count>
+"""
+
+# Incremental validation: the end of the watermark window, for a watermark column.
+oracle_queries[
+    "watermark_max"
+] = """
+SELECT MAX(<watermark_column>) AS watermark FROM <schema>.<table>
+"""
+
+# Incremental validation: the end of the watermark window, for ORA_ROWSCN.
+oracle_queries[
+    "watermark_current"
+] = """
+SELECT TIMESTAMP_TO_SCN(SYSTIMESTAMP) AS watermark FROM DUAL
+"""
@@ -1,15 +1,20 @@
+import datetime
+import decimal
+import io
 import sys
 import warnings
 
 import pandas as pd
 import psycopg2
-import sqlalchemy
-from settings import SQL_ALCHEMY_ECHO_MODE
+import psycopg2.extensions
+from settings import POSTGRES_COPY_FETCH
 from sqlalchemy import exc as sa_exc
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from src.utils import print_messages
 from tabulate import tabulate
 
+from .engines import exact_decimal_column, get_engine, read_sql, read_sql_chunks
 from .postgres_queries import postgres_queries
 
 
@@ -37,33 +42,190 @@ def postgres_get_connection(config):
         sys.exit(1)
 
 
-def postgres_table_to_df(config, query, params):
+def postgres_get_engine(config):
+    """
+    Returns the shared SQLAlchemy engine for the given Postgres DB.
+
+    :param config: Dictionary containing DB connection details.
+    """
     host = config["host"]
-    port = config["port"]
     service = config["service"]
     user = config["user"]
     password = config["password"]
 
+    return get_engine(
+        config, f"postgresql+psycopg2://{user}:{password}@{host}/{service}",
+    )
+
+
+def postgres_table_to_df(config, query, params):
     try:
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=sa_exc.SAWarning)
 
-        engine = sqlalchemy.create_engine(
-            f"postgresql+psycopg2://{user}:{password}@{host}/{service}", echo=SQL_ALCHEMY_ECHO_MODE,
-        )
+        engine = postgres_get_engine(config)
 
-        if params is None:
-            df = pd.read_sql(query, engine)
-            return df
-        else:
-            df = pd.read_sql(query, engine, params=params)
-            return df
+        if POSTGRES_COPY_FETCH:
+            df = postgres_copy_to_df(engine, query, params)
+
+            if df is not None:
+                return df
+
+        return read_sql(engine, query, params)
 
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise e
 
 
+# ------------------------------------------------------------------------------#
+# COPY fetch. The result of a query is streamed with COPY (query) TO STDOUT in  #
+# CSV format & parsed by pandas' C parser, a column at a time, instead of       #
+# building a Python tuple for each row. The columns are then converted to the  #
+# types read_sql() returns for them, so the comparison doesn't change.          #
+# ------------------------------------------------------------------------------#
+COPY_NULL_MARKER = r"\N"
+
+
+def copy_to_int(col):
+    # int64, or float64 when there are nulls, as pd.read_sql() returns them.
+    return pd.to_numeric(col)
+
+
+def copy_to_float(col):
+    # Unlike pd.to_numeric(), parses NaN & Infinity.
+    return col.astype("float64")
+
+
+def copy_to_numeric(col):
+    # Decimals, kept exact as in read_sql().
+    values = col.map(decimal.Decimal, na_action="ignore").astype(object).where(col.notna(), None)
+
+    return exact_decimal_column(values)
+
+
+def copy_to_bool(col):
+    values = col.map({"t": True, "f": False})
+
+    if col.notna().all():
+        return values.astype(bool)
+
+    return values.astype(object).where(col.notna(), None)
+
+
+def copy_to_text(col):
+    return col.astype(object).where(col.notna(), None)
+
+
+def copy_to_date(col):
+    return col.map(datetime.date.fromisoformat, na_action="ignore").astype(object).where(
+        col.notna(), None
+    )
+
+
+def copy_to_timestamp(col):
+    return pd.to_datetime(col, format="ISO8601")
+
+
+# Postgres type OIDs & the conversion of their CSV text.
+COPY_CONVERTERS = {
+    16: copy_to_bool,  # boolean
+    19: copy_to_text,  # name
+    20: copy_to_int,  # bigint
+    21: copy_to_int,  # smallint
+    23: copy_to_int,  # integer
+    25: copy_to_text,  # text
+    700: copy_to_float,  # real
+    701: copy_to_float,  # double precision
+    1042: copy_to_text,  # char
+    1043: copy_to_text,  # varchar
+    1082: copy_to_date,  # date
+    1114: copy_to_timestamp,  # timestamp without time zone
+    1700: copy_to_numeric,  # numeric
+}
+
+
+def postgres_copy_to_df(engine, query, params):
+    """
+    Executes given SQL query with COPY ... TO STDOUT & returns a Pandas
+    DataFrame. Bind parameters are rendered as literals by psycopg2, COPY
+    doesn't take parameters.
+
+    :return: A DataFrame. None, when the query returns a type that isn't in
+        COPY_CONVERTERS (or a value that can't be converted), the caller falls
+        back to read_sql().
+    """
+    if isinstance(query, str):
+        query = text(query)
+
+    compiled = query.compile(dialect=engine.dialect)
+    connection = engine.raw_connection()
+
+    try:
+        cursor = connection.cursor()
+        encoding = psycopg2.extensions.encodings[connection.encoding]
+        sql = cursor.mogrify(str(compiled), compiled.construct_params(params or {}))
+        sql = sql.decode(encoding)
+
+        # Dates, timestamps & floats are written the way they're parsed below.
+        # The column types are read from an empty result, in the same round trip.
+        cursor.execute(
+            "SET DateStyle TO ISO, YMD; SET extra_float_digits TO 3; "
+            f"SELECT * FROM ({sql}) copy_query LIMIT 0"
+        )
+        columns = [(column.name, column.type_code) for column in cursor.description]
+
+        if any(type_code not in COPY_CONVERTERS for _, type_code in columns):
+            return None
+
+        buffer = io.BytesIO()
+        cursor.copy_expert(
+            f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, NULL '{COPY_NULL_MARKER}')", buffer
+        )
+        cursor.close()
+    except psycopg2.Error as err:
+        raise sa_exc.DBAPIError(str(query), params, err)
+    finally:
+        connection.close()
+
+    if buffer.getbuffer().nbytes == 0:
+        return pd.DataFrame(columns=[name for name, _ in columns])
+
+    buffer.seek(0)
+
+    # Columns are read by position, a query can return the same name twice.
+    df = pd.read_csv(
+        buffer,
+        header=None,
+        names=list(range(len(columns))),
+        dtype=str,
+        keep_default_na=False,
+        na_values=[COPY_NULL_MARKER],
+        encoding=encoding,
+    )
+
+    try:
+        for index, (_, type_code) in enumerate(columns):
+            df[index] = COPY_CONVERTERS[type_code](df[index])
+    except ValueError:
+        # For ex, infinite dates & timestamps.
+        return None
+
+    df.columns = [name for name, _ in columns]
+
+    return df
+
+
+def postgres_table_to_df_chunks(config, query, params, chunksize):
+    """
+    Executes given SQL query and yields the result as Pandas DataFrames of
+    `chunksize` records, using a server side cursor.
+    """
+    engine = postgres_get_engine(config)
+
+    return read_sql_chunks(engine, query, params, chunksize)
+
+
 def postgres_execute_query(config, query, parameters):
     """
     Executes given SQL query.
@@ -43,3 +43,116 @@ WHERE
     UPPER(a.table_schema) = UPPER(temp.table_schema)
 AND UPPER(a.table_name)   = UPPER(temp.table_name)
 """
+
+# ------------------------------------------------------------------------------#
+# Profile validation. One aggregate query per table: the no. of records and   #
+# statistics of each column. Placeholders are replaced in                      #
+# src/profile_validation.py                                                     #
+# ------------------------------------------------------------------------------#
+postgres_queries[
+    "profile"
+] = """
+SELECT
+    COUNT(*) AS row_count
+<aggregates>
+FROM
+    <schema>.<table>
+"""
+
+# ------------------------------------------------------------------------------#
+# Key reconciliation. All the primary key values of a table, in the binary    #
+# order of the keys. Placeholders are replaced in src/key_reconciliation.py    #
+# ------------------------------------------------------------------------------#
+postgres_queries[
+    "ordered_keys"
+] = """
+SELECT
+    <key_columns>
+FROM
+    <schema>.<table>
+ORDER BY
+    <order_by>
+"""
+
+# ------------------------------------------------------------------------------#
+# Sampling. Queries used to pick the records to be validated from the source   #
+# table. Placeholders are replaced in src/sampling.py                          #
+# ------------------------------------------------------------------------------#
+postgres_queries[
+    "sample_first"
+] = """
+SELECT * FROM <schema>.<table> LIMIT <rec_count>
+"""
+
+# Random blocks / pages. Reads only the sampled blocks.
+postgres_queries[
+    "sample_block"
+] = """
+SELECT * FROM <schema>.<table> TABLESAMPLE SYSTEM (<percent>) REPEATABLE (<seed>) LIMIT <rec_count>
+"""
+
+# Random records.
+postgres_queries[
+    "sample_row"
+] = """
+SELECT * FROM <schema>.<table> TABLESAMPLE BERNOULLI (<percent>) REPEATABLE (<seed>) LIMIT <rec_count>
+"""
+
+# Records from a range of primary key values, read using the primary key index.
+postgres_queries[
+    "sample_range"
+] = """
+SELECT
+    *
+FROM
+    <schema>.<table>
+WHERE
+    <key_column> >= :range_start
+AND <key_column> < :range_end
+ORDER BY
+    <key_column>
+LIMIT <rec_count>
+"""
+
+postgres_queries[
+    "key_range"
+] = """
+SELECT MIN(<key_column>) AS min_value, MAX(<key_column>) AS max_value FROM <schema>.<table>
+"""
+
+# Incremental validation: records changed within a watermark window, in the
+# order of the watermark & primary key. The watermark (dv_watermark) & key of the
+# last record are where the next run starts, when not all of them are read.
+# <key_filter> skips the records up to that key, see sampling.py.
+postgres_queries[
+    "sample_changed"
+] = """
+SELECT
+    t.*
+  , <watermark_column> AS dv_watermark
+FROM
+    <schema>.<table> t
+WHERE
+    <watermark_column> >= :watermark_start
+AND <watermark_column> < :watermark_end
+<key_filter>
+ORDER BY
+    <watermark_column>
+  , <key_columns>
+LIMIT <rec_count>
+"""
+
+# Incremental validation: the end of the watermark window, for a watermark column.
+postgres_queries[
+    "watermark_max"
+] = """
+SELECT MAX(<watermark_column>) AS watermark FROM <schema>.<table>
+"""
+
+# Incremental validation: the end of the watermark window, for xmin. Transactions
+# older than the snapshot's xmin have completed. xmin is a 32 bit transaction id.
+postgres_queries[
+    "watermark_current"
+] = """
+SELECT MOD(txid_snapshot_xmin(txid_current_snapshot()), 4294967296) AS watermark
+"""
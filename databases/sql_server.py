@@ -1,21 +1,18 @@
 import warnings
 
-import pandas as pd
 import pyodbc
-import sqlalchemy
-from settings import SQL_ALCHEMY_ECHO_MODE
+from settings import COLUMNAR_FETCH
 from sqlalchemy import exc as sa_exc
 from sqlalchemy.exc import SQLAlchemyError
 from src.utils import print_messages
 from tabulate import tabulate
 
+from .engines import get_engine, read_sql, read_sql_chunks, read_sql_columnar
 
-def sqlserver_table_to_df(config, query, params):
-    """
-    For this function to work, first download ODBC Driver from this
-    link:
-    https://docs.microsoft.com/en-us/sql/connect/odbc/download-odbc-driver-for-sql-server?view=sql-server-ver15
 
+def sqlserver_get_engine(config):
+    """
+    Returns the shared SQLAlchemy engine for the given SQL Server DB.
     """
     host = config["host"]
     port = config["port"]
@@ -23,20 +20,39 @@ def sqlserver_table_to_df(config, query, params):
     user = config["user"]
     password = config["password"]
 
+    return get_engine(
+        config,
+        f"mssql+pyodbc://{user}:{password}@{host}:{port}/{service}?driver=ODBC Driver 17 for SQL Server")
+
+
+def sqlserver_table_to_df(config, query, params):
+    """
+    For this function to work, first download ODBC Driver from this
+    link:
+    https://docs.microsoft.com/en-us/sql/connect/odbc/download-odbc-driver-for-sql-server?view=sql-server-ver15
+
+    """
     try:
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=sa_exc.SAWarning)
 
-        engine = sqlalchemy.create_engine(
-            f"mssql+pyodbc://{user}:{password}@{host}:{port}/{service}?driver=ODBC Driver 17 for SQL Server")
+        engine = sqlserver_get_engine(config)
+
+        if COLUMNAR_FETCH:
+            return read_sql_columnar(engine, query, params)
 
-        if params is None:
-            df = pd.read_sql(query, engine)
-            return df
-        else:
-            df = pd.read_sql(query, engine, params=params)
-            return df
+        return read_sql(engine, query, params)
 
     except SQLAlchemyError as e:
         error = str(e.__dict__['orig'])
         raise e
+
+
+def sqlserver_table_to_df_chunks(config, query, params, chunksize):
+    """
+    Executes given SQL query and yields the result as Pandas DataFrames of
+    `chunksize` records, using a server side cursor.
+    """
+    engine = sqlserver_get_engine(config)
+
+    return read_sql_chunks(engine, query, params, chunksize)
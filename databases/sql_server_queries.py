@@ -24,4 +24,112 @@ AND C.TABLE_NAME   = TEMP.table_name
 AND C.CONSTRAINT_NAME = T.CONSTRAINT_NAME
 ORDER BY
 	1, 2, 3
-"""
\ No newline at end of file
+"""
+
+# ------------------------------------------------------------------------------#
+# Profile validation. One aggregate query per table: the no. of records and   #
+# statistics of each column. Placeholders are replaced in                      #
+# src/profile_validation.py                                                     #
+# ------------------------------------------------------------------------------#
+sqlserver_queries[
+    "profile"
+] = """
+SELECT
+    COUNT(*) AS row_count
+<aggregates>
+FROM
+    <schema>.<table>
+"""
+
+# ------------------------------------------------------------------------------#
+# Key reconciliation. All the primary key values of a table, in the binary    #
+# order of the keys. Placeholders are replaced in src/key_reconciliation.py    #
+# ------------------------------------------------------------------------------#
+sqlserver_queries[
+    "ordered_keys"
+] = """
+SELECT
+    <key_columns>
+FROM
+    <schema>.<table>
+ORDER BY
+    <order_by>
+"""
+
+# ------------------------------------------------------------------------------#
+# Sampling. Queries used to pick the records to be validated from the source   #
+# table. Placeholders are replaced in src/sampling.py                          #
+# ------------------------------------------------------------------------------#
+sqlserver_queries[
+    "sample_first"
+] = """
+SELECT TOP <rec_count> * FROM <schema>.<table>
+"""
+
+# Random blocks / pages. Reads only the sampled blocks.
+sqlserver_queries[
+    "sample_block"
+] = """
+SELECT TOP <rec_count> * FROM <schema>.<table> TABLESAMPLE SYSTEM (<percent> PERCENT) REPEATABLE (<seed>)
+"""
+
+# Random records. SQL Server only samples pages, the records are picked using a hash of the key.
+sqlserver_queries[
+    "sample_row"
+] = """
+SELECT TOP <rec_count>
+    *
+FROM
+    <schema>.<table>
+WHERE
+    ABS(CAST(CHECKSUM(<key_columns>) AS BIGINT) + <seed>) % 1000000 < <percent> * 10000
+"""
+
+# Records from a range of primary key values, read using the primary key index.
+sqlserver_queries[
+    "sample_range"
+] = """
+SELECT TOP <rec_count>
+    *
+FROM
+    <schema>.<table>
+WHERE
+    <key_column> >= :range_start
+AND <key_column> < :range_end
+ORDER BY
+    <key_column>
+"""
+
+sqlserver_queries[
+    "key_range"
+] = """
+SELECT MIN(<key_column>) AS min_value, MAX(<key_column>) AS max_value FROM <schema>.<table>
+"""
+
+# Incremental validation: records changed within a watermark window, in the
+# order of the watermark & primary key. The watermark (dv_watermark) & key of the
+# last record are where the next run starts, when not all of them are read.
+# <key_filter> skips the records up to that key, see sampling.py.
+sqlserver_queries[
+    "sample_changed"
+] = """
+SELECT TOP <rec_count>
+    t.*
+  , <watermark_column> AS dv_watermark
+FROM
+    <schema>.<table> t
+WHERE
+    <watermark_column> >= :watermark_start
+AND <watermark_column> < :watermark_end
+<key_filter>
+ORDER BY
+    <watermark_column>
+  , <key_columns>
+"""
+
+# Incremental validation: the end of the watermark window, for a watermark column.
+sqlserver_queries[
+    "watermark_max"
+] = """
+SELECT MAX(<watermark_column>) AS watermark FROM <schema>.<table>
+"""
@@ -0,0 +1,41 @@
+import pandas as pd
+from sqlalchemy.pool import QueuePool
+
+from .engines import get_engine, read_sql_chunks
+
+
+def sqlite_get_engine(config):
+    """
+    Returns the shared SQLAlchemy engine for the given SQLite DB. The path of
+    the database file is given as the service.
+
+    :param config: Dictionary containing DB connection details.
+    """
+    service = config["service"]
+
+    # The pooled connections are used by all the validation threads.
+    return get_engine(
+        config,
+        f"sqlite:///{service}",
+        poolclass=QueuePool,
+        connect_args={"check_same_thread": False},
+    )
+
+
+def sqlite_table_to_df(config, query, params):
+    engine = sqlite_get_engine(config)
+
+    if params is None:
+        return pd.read_sql(query, engine)
+
+    return pd.read_sql(query, engine, params=params)
+
+
+def sqlite_table_to_df_chunks(config, query, params, chunksize):
+    """
+    Executes given SQL query and yields the result as Pandas DataFrames of
+    `chunksize` records. SQLite cursors don't fetch the whole result upfront.
+    """
+    engine = sqlite_get_engine(config)
+
+    return read_sql_chunks(engine, query, params, chunksize)
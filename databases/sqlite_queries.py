@@ -0,0 +1,128 @@
+sqlite_queries = {}
+
+# ------------------------------------------------------------------------------#
+# SQLite is used as a local stand-in for the Source & Target DBs, for ex. by    #
+# the benchmarks. Schema is the name of an attached database, "main" for the   #
+# database file itself.                                                         #
+# ------------------------------------------------------------------------------#
+
+# Get Primary key
+sqlite_queries[
+    "get_primary_key"
+] = """
+WITH temp AS (
+    <temp_placeholder>
+)
+SELECT
+    temp.schema_name
+  , temp.table_name
+  , p.name AS column_name
+FROM
+    temp
+  , pragma_table_info(temp.table_name, temp.schema_name) p
+WHERE
+    p.pk > 0
+ORDER BY
+    1, 2, p.pk
+"""
+
+# ------------------------------------------------------------------------------#
+# Profile validation. One aggregate query per table: the no. of records and   #
+# statistics of each column. Placeholders are replaced in                      #
+# src/profile_validation.py                                                     #
+# ------------------------------------------------------------------------------#
+sqlite_queries[
+    "profile"
+] = """
+SELECT
+    COUNT(*) AS row_count
+<aggregates>
+FROM
+    <schema>.<table>
+"""
+
+# ------------------------------------------------------------------------------#
+# Key reconciliation. All the primary key values of a table, in the binary    #
+# order of the keys. Placeholders are replaced in src/key_reconciliation.py    #
+# ------------------------------------------------------------------------------#
+sqlite_queries[
+    "ordered_keys"
+] = """
+SELECT
+    <key_columns>
+FROM
+    <schema>.<table>
+ORDER BY
+    <order_by>
+"""
+
+# ------------------------------------------------------------------------------#
+# Sampling. Queries used to pick the records to be validated from the source   #
+# table. Placeholders are replaced in src/sampling.py                          #
+# ------------------------------------------------------------------------------#
+sqlite_queries[
+    "sample_first"
+] = """
+SELECT * FROM <schema>.<table> LIMIT <rec_count>
+"""
+
+# Random records. SQLite can't sample blocks or seed RANDOM(), the records are
+# picked using a hash of the rowid.
+sqlite_queries[
+    "sample_row"
+] = """
+SELECT * FROM <schema>.<table> WHERE ((rowid + <seed>) * 2654435761) % 1000000 < <percent> * 10000 LIMIT <rec_count>
+"""
+
+sqlite_queries["sample_block"] = sqlite_queries["sample_row"]
+
+# Records from a range of primary key values, read using the primary key index.
+sqlite_queries[
+    "sample_range"
+] = """
+SELECT
+    *
+FROM
+    <schema>.<table>
+WHERE
+    <key_column> >= :range_start
+AND <key_column> < :range_end
+ORDER BY
+    <key_column>
+LIMIT <rec_count>
+"""
+
+sqlite_queries[
+    "key_range"
+] = """
+SELECT MIN(<key_column>) AS min_value, MAX(<key_column>) AS max_value FROM <schema>.<table>
+"""
+
+# Incremental validation: records changed within a watermark window, in the
+# order of the watermark & primary key. The watermark (dv_watermark) & key of the
+# last record are where the next run starts, when not all of them are read.
+# <key_filter> skips the records up to that key, see sampling.py.
+sqlite_queries[
+    "sample_changed"
+] = """
+SELECT
+    t.*
+  , <watermark_column> AS dv_watermark
+FROM
+    <schema>.<table> t
+WHERE
+    <watermark_column> >= :watermark_start
+AND <watermark_column> < :watermark_end
+<key_filter>
+ORDER BY
+    <watermark_column>
+  , <key_columns>
+LIMIT <rec_count>
+"""
+
+# Incremental validation: the end of the watermark window, for a watermark column.
+sqlite_queries[
+    "watermark_max"
+] = """
+SELECT MAX(<watermark_column>) AS watermark FROM <schema>.<table>
+"""
@@ -24,12 +24,198 @@ SRC_DB = "AdventureWorks1"
 # How many records to be validated between source & target tables
 DATA_VALIDATION_REC_COUNT = 1000
 
+# How the records to be validated are picked from the source table:
+#   - "first"      : The first DATA_VALIDATION_REC_COUNT records the DB returns.
+#   - "block"      : Random blocks (Oracle SAMPLE BLOCK, Postgres TABLESAMPLE
+#                    SYSTEM, SQL Server TABLESAMPLE SYSTEM).
+#   - "row"        : Random records (Oracle SAMPLE, Postgres TABLESAMPLE
+#                    BERNOULLI, SQL Server: hash of the primary key).
+#   - "stratified" : Records from SAMPLE_STRATA ranges of the primary key.
+#                    Needs a numeric primary key.
+# SAMPLE_PERCENT is the percentage of blocks / records sampled. Use the same
+# SAMPLE_SEED to validate the same records again.
+SAMPLING_METHOD = "first"
+SAMPLE_PERCENT = 1
+SAMPLE_SEED = 42
+SAMPLE_STRATA = 10
+
+# Sequential sampling: instead of DATA_VALIDATION_REC_COUNT records, the records
+# are validated in batches of growing size (SEQUENTIAL_FIRST_BATCH records,
+# then as many as all the previous batches), until either:
+#   - the mismatch rate of the table is below SEQUENTIAL_MAX_MISMATCH_RATE with
+#     SEQUENTIAL_CONFIDENCE (upper bound of its Clopper-Pearson interval, with
+#     the confidence split across the batches). With no differences, 0.001 at
+#     95% takes ~5400 records.
+#   - SEQUENTIAL_STOP_MISMATCHES records having differences are found.
+#   - SEQUENTIAL_MAX_RECORDS records are validated, or the table is read fully.
+# Clean tables are read less, tables having differences get more coverage. The
+# confidence holds for random records: use the "row" SAMPLING_METHOD ("block"
+# samples are clustered).
+# Not applied to incremental validation, all the changed records are validated.
+SEQUENTIAL_SAMPLING = False
+SEQUENTIAL_MAX_MISMATCH_RATE = 0.001
+SEQUENTIAL_CONFIDENCE = 0.95
+SEQUENTIAL_FIRST_BATCH = 1000
+SEQUENTIAL_STOP_MISMATCHES = 100
+SEQUENTIAL_MAX_RECORDS = 1000000
+
+# How the tables are validated:
+#   - "rows"     : DATA_VALIDATION_REC_COUNT records are read from both the DBs
+#                  and compared column by column.
+#   - "checksum" : All the records are hashed in the DBs. Only the digests of
+#                  the buckets are compared, drilling down into the buckets
+#                  that don't match.
+#   - "profile"  : One aggregate query per table in both the DBs: no. of
+#                  records and, for each column, no. of nulls, min, max & sum
+#                  (numbers) or sum of the lengths (text). No records are read.
+#   - "keys"     : All the primary key values are read from both the DBs, in
+#                  order, and merged. The keys of the records missing in the
+#                  Target table, and of the extra ones, are written to CSV files.
+VALIDATION_MODE = "rows"
+
+# Checksum validation: No. of buckets at each level, max. no. of levels, and
+# the no. of records in the mismatching buckets below which the record hashes
+# are fetched & compared.
+CHECKSUM_BUCKETS = 256
+CHECKSUM_MAX_DEPTH = 3
+CHECKSUM_LEAF_ROWS = 10000
+
+# Tables without a primary key are validated by comparing the multisets of their
+# record hashes: the no. of records of each distinct hash is computed in both
+# the DBs & compared. Extra & missing records are reported, with the values of
+# up to KEYLESS_MAX_RECORDS of them. When false, such tables are skipped.
+KEYLESS_VALIDATION = True
+KEYLESS_MAX_RECORDS = 1000
+
+# Profile validation: relative difference below which numbers (min, max, sum)
+# are taken as equal, as the DBs sum floating point numbers in their own order.
+# When PROFILE_ROW_VALIDATION is true, the tables whose profiles don't match are
+# then validated record by record, as in the "rows" mode.
+PROFILE_TOLERANCE = 1e-9
+PROFILE_ROW_VALIDATION = True
+
+# Key reconciliation: no. of primary key values read at a time from each DB, and
+# the max. no. of missing & extra keys added to the HTML report. All of them are
+# written to the CSV files.
+KEYS_CHUNK_SIZE = 100000
+KEYS_MAX_DIFFERENCES = 1000
+
+# How the Source & Target values are compared, record by record. A comparison
+# is chosen for each column from its types in both the DBs:
+#   - Integers & decimals are compared exactly. When the column is a floating
+#     point type in either DB, numbers are equal when their relative difference
+#     is no more than COMPARE_NUMBER_TOLERANCE.
+#   - Dates & times are compared in UTC, values without a time zone are taken
+#     as UTC. Dates drop the time. Values of types the DBs round are equal when
+#     they're no more than half a unit of the less precise type apart: 0.5 s
+#     for Oracle DATE, 30 s for SQL Server SMALLDATETIME, 2 ms for DATETIME.
+#   - Text: trailing spaces (CHAR padding) are ignored when
+#     COMPARE_IGNORE_TRAILING_SPACES is true, the case when COMPARE_IGNORE_CASE
+#     is true. When one of the DBs is Oracle, empty text equals null.
+COMPARE_NUMBER_TOLERANCE = 1e-12
+COMPARE_IGNORE_TRAILING_SPACES = True
+COMPARE_IGNORE_CASE = False
+
+# When set, source records are read, compared & dropped in chunks of this size,
+# so the memory used by a table doesn't depend on DATA_VALIDATION_REC_COUNT.
+# Results are written to CSV files instead of Excel. None disables streaming.
+STREAMING_CHUNK_SIZE = None
+
+# Primary key values used to look up the records in the Target DB are sent in
+# chunks of this size, as bind parameters. On Postgres, the keys are sent as
+# arrays, so a chunk can be much larger. Chunks are kept within the limits of
+# the DBs: 1000 keys on Oracle, 2000 parameters on SQL Server.
+TARGET_LOOKUP_CHUNK_SIZE = 500
+TARGET_LOOKUP_ARRAY_CHUNK_SIZE = 10000
+
+# When true, Postgres query results are read with COPY ... TO STDOUT (CSV) and
+# parsed column by column, rather than fetched row by row. Queries returning
+# types other than numbers, text, booleans, dates & timestamps (without time
+# zone) are still fetched row by row. Not used in streaming mode.
+POSTGRES_COPY_FETCH = True
+
+# When true, Oracle & SQL Server query results are fetched in batches from the
+# driver's cursor & put together a column at a time, rather than row by row
+# through SQLAlchemy. The batch size (cursor arraysize) is worked out from the
+# width of a row, so that a batch is about FETCH_BUFFER_SIZE bytes.
+COLUMNAR_FETCH = True
+FETCH_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Format of the file written for each table in data_validation_reports, with
+# the compared records: xlsx, csv or parquet (needs pyarrow). The files are
+# written by OUTPUT_WRITER_THREADS background threads, while the validation
+# threads move on to the next table. In streaming mode, a CSV file is written
+# as the chunks are compared.
+OUTPUT_FORMAT = "xlsx"
+OUTPUT_WRITER_THREADS = 2
+
+# How the column differences are added to the HTML report:
+#   - inline : In the report itself. Fine for a few thousand differences.
+#   - paged  : In files next to the report, HTML_REPORT_CHUNK_SIZE differences
+#              each. The report loads a table's files when it's selected.
+HTML_REPORT_MODE = "inline"
+HTML_REPORT_CHUNK_SIZE = 10000
+
+# Time, records, bytes & allocated blocks of each phase of a table (source
+# fetch, target fetch, merge, compare, output) are written to the summary log
+# of the table, and for all the tables to data_validation_reports:
+#   - "json"       : data_validation_metrics.json
+#   - "prometheus" : data_validation_metrics.prom, for the node exporter's
+#                    textfile collector.
+#   - None         : Not written.
+# The HTML report lists the METRICS_SLOWEST_TABLES slowest tables.
+METRICS_FORMAT = "json"
+METRICS_SLOWEST_TABLES = 10
+
 # How many data validation threads can run at the same time?
 PARALLEL_THREADS = 5
 
+# No. of processes that merge & compare the Source & Target records, while the
+# data validation threads read the next records from the DBs. Merging &
+# comparing is CPU bound, in the threads only one table is compared at a time.
+# The records are copied to & from the processes, so this pays off with many
+# threads & CPU cores. 0: compared in the threads. None: one per CPU core.
+COMPARE_PROCESSES = 0
+
+# Incremental validation: only the records changed since the last run are read
+# (up to DATA_VALIDATION_REC_COUNT of them, ignoring SAMPLING_METHOD &
+# TABLE_PARTITIONS). The watermark of each table is kept in watermarks folder.
+# Not used in checksum mode, which validates whole tables.
+INCREMENTAL_VALIDATION = False
+
+# Column telling when a record was changed (a timestamp, a sequence or a SQL
+# Server rowversion), for each table: {"SCHEMA.TABLE": "COLUMN"}. Tables not
+# listed use ORA_ROWSCN on Oracle & xmin on Postgres, which need a full scan.
+# On SQL Server, tables not listed are validated as usual.
+WATERMARK_COLUMNS = {}
+
+# A large table can be split into these many primary key ranges, which are
+# read & compared at the same time (each reads the first DATA_VALIDATION_REC_COUNT /
+# TABLE_PARTITIONS records of its range). Needs a numeric primary key. Only the
+# "first" SAMPLING_METHOD is split: "block" & "row" samples are read by a single
+# query, with stratified sampling the strata are validated TABLE_PARTITIONS at a time.
+TABLE_PARTITIONS = 1
+
+# Connection pool used for each database. One engine is shared by all the
+# threads, so the pool should be large enough for all of them.
+ENGINE_POOL_SIZE = PARALLEL_THREADS * TABLE_PARTITIONS
+ENGINE_MAX_OVERFLOW = 2
+
+# Recycle pooled connections after these many seconds.
+ENGINE_POOL_RECYCLE = 1800
+
+# Primary keys & column definitions are cached in cache/metadata_cache.json for
+# these many seconds. Run app.py with --refresh-metadata after DDL changes.
+# Set to 0 to disable the cache.
+METADATA_CACHE_TTL = 24 * 60 * 60
+
 # When true, the data validation comparison will be logged.
 DEBUG_DATA_VALIDATION = True
 
+# When false, the summary & column differences log files are not written. The
+# HTML report doesn't need them.
+WRITE_LOG_FILES = True
+
 # When set to true, interaction with DB will be logged.
 SQL_ALCHEMY_ECHO_MODE = False
 
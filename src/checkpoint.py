@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from .metadata import db_identifier
+from .metrics import TableMetrics
+from .results import ERROR, TableResult
+from .utils import get_project_root
+
+# ------------------------------------------------------------------------------#
+# Run manifest: the state of each table of the current run, so that a run that #
+# was interrupted can be resumed (app.py --resume).                             #
+#                                                                               #
+# The manifest is kept in checkpoint/run_manifest.json, with the result of the #
+# tables that are done. Their column differences are kept next to it.          #
+# ------------------------------------------------------------------------------#
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "error"
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_checkpoint_dir():
+    return os.path.join(get_project_root(), "checkpoint")
+
+
+def get_manifest_file():
+    return os.path.join(get_checkpoint_dir(), "run_manifest.json")
+
+
+def table_key(schema, table):
+    return f"{schema.upper()}.{table.upper()}"
+
+
+def start_run(tables, src_config, tgt_config, mode, resume):
+    """
+    Creates the manifest of a run, or loads the manifest of the last run when
+    resuming.
+
+    :param tables: The tables of the run. Each table is a map with keys:
+        schema, table.
+    :param mode: VALIDATION_MODE. A run is resumed only with the same DBs & mode.
+    :param resume: When true, the tables done in the last run are not validated
+        again.
+
+    :return: A dictionary of the results of the tables done in the last run,
+        keyed by (schema, table). Empty, unless resuming.
+    """
+    global _manifest
+
+    run = {
+        "src_db": db_identifier(src_config),
+        "tgt_db": db_identifier(tgt_config),
+        "mode": mode,
+    }
+
+    last_manifest = load_manifest() if resume else None
+
+    if resume and last_manifest is None:
+        print("-> No run to resume, validating all the tables.")
+
+    if last_manifest is not None and last_manifest["run"] != run:
+        print("-> The last run used other DBs or another mode, validating all the tables.")
+        last_manifest = None
+
+    checkpoint_dir = get_checkpoint_dir()
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    manifest = {"run": run, "started_at": time.time(), "tables": {}}
+    done_results = {}
+
+    for entry in tables:
+        key = table_key(entry["schema"], entry["table"])
+        last_entry = None
+
+        if last_manifest is not None:
+            last_entry = last_manifest["tables"].get(key)
+
+        if last_entry is not None and last_entry["state"] == DONE:
+            manifest["tables"][key] = last_entry
+            done_results[(entry["schema"], entry["table"])] = entry_to_result(
+                entry["schema"], entry["table"], last_entry
+            )
+        else:
+            manifest["tables"][key] = {"state": PENDING}
+
+    # Remove the column differences of the tables that are validated again.
+    for file in os.listdir(checkpoint_dir):
+        if file.endswith(".differences.pkl"):
+            key = file[: -len(".differences.pkl")]
+
+            if manifest["tables"].get(key, {}).get("state") != DONE:
+                os.remove(os.path.join(checkpoint_dir, file))
+
+    with _manifest_lock:
+        _manifest = manifest
+
+    save_manifest()
+
+    return done_results
+
+
+def load_manifest():
+    """
+    Reads the manifest of the last run, None if there isn't one.
+    """
+    manifest_file = get_manifest_file()
+
+    if not os.path.exists(manifest_file):
+        return None
+
+    try:
+        with open(manifest_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as err:
+        print(f"-> Ignoring the run manifest {manifest_file}: {err}")
+        return None
+
+
+def save_manifest():
+    """
+    Writes the manifest to the disk.
+    """
+    manifest_file = get_manifest_file()
+
+    with _manifest_lock:
+        if _manifest is None:
+            return
+
+        # Write to a temporary file first, so that a crash doesn't leave a partial file.
+        with open(manifest_file + ".tmp", "w") as f:
+            json.dump(_manifest, f, indent=1)
+
+        os.replace(manifest_file + ".tmp", manifest_file)
+
+
+def mark_table_running(schema, table):
+    set_table_entry(schema, table, {"state": RUNNING, "started_at": time.time()})
+
+
+def mark_table_finished(result):
+    """
+    Saves the result of a table: done, or error if it couldn't be validated.
+    """
+    key = table_key(result.schema, result.table)
+    differences_file = os.path.join(get_checkpoint_dir(), f"{key}.differences.pkl")
+
+    if len(result.differences) > 0:
+        result.differences.to_frame().to_pickle(differences_file)
+    elif os.path.exists(differences_file):
+        os.remove(differences_file)
+
+    entry = {
+        "state": FAILED if result.status == ERROR else DONE,
+        "finished_at": time.time(),
+        "result": {
+            "status": result.status,
+            "message": result.message,
+            "no_recs_validated": result.no_recs_validated,
+            "no_recs_having_differences": result.no_recs_having_differences,
+            "columns_having_differences": result.columns_having_differences,
+        },
+        "metrics": result.metrics.to_dict(),
+    }
+
+    set_table_entry(result.schema, result.table, entry)
+
+
+def update_table_metrics(results):
+    """
+    Saves the metrics of the tables again, once their output files are written.
+    """
+    with _manifest_lock:
+        if _manifest is None:
+            return
+
+        for result in results:
+            entry = _manifest["tables"].get(table_key(result.schema, result.table))
+
+            if entry is not None and entry["state"] == DONE:
+                entry["metrics"] = result.metrics.to_dict()
+
+    save_manifest()
+
+
+def set_table_entry(schema, table, entry):
+    with _manifest_lock:
+        if _manifest is None:
+            return
+
+        _manifest["tables"][table_key(schema, table)] = entry
+
+    save_manifest()
+
+
+def entry_to_result(schema, table, entry):
+    """
+    Rebuilds the TableResult of a table that is done, with its column
+    differences.
+    """
+    result = TableResult(schema, table, **entry["result"])
+
+    if "metrics" in entry:
+        result.metrics = TableMetrics.from_dict(entry["metrics"])
+
+    differences_file = os.path.join(
+        get_checkpoint_dir(), f"{table_key(schema, table)}.differences.pkl"
+    )
+
+    if os.path.exists(differences_file):
+        result.differences.extend(pd.read_pickle(differences_file))
+
+    return result
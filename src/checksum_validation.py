@@ -0,0 +1,767 @@
+import pandas as pd
+from databases import table_to_df
+from settings import (CHECKSUM_BUCKETS, CHECKSUM_LEAF_ROWS, CHECKSUM_MAX_DEPTH,
+                      KEYLESS_MAX_RECORDS, KEYLESS_VALIDATION, WRITE_LOG_FILES)
+from sqlalchemy.exc import SQLAlchemyError
+
+from .comparators import FLOAT_TYPES
+from .constants import ORACLE, POSTGRES, SQLSERVER
+from .metadata import get_table_columns
+from .metrics import COMPARE, SOURCE_FETCH, TARGET_FETCH
+from .results import (DIFFERENCE_COLUMNS, DIFFERENCES, ERROR, SKIPPED, TableResult,
+                      close_table_result, write_differences_log)
+from .utils import get_project_root, open_log_file, write_log_entry
+
+# ----------------------------------------------------------------------------------------------#
+# DB specific SQL expressions used to hash a record.                                            #
+#                                                                                               #
+# Every column is converted to text the same way in all the DBs (numbers without trailing       #
+# zeros, dates & times as YYYY-MM-DD HH24:MI:SS.FF6, text in UTF-8) and hashed with MD5, as a   #
+# lower case hex string. The record hash is the MD5 hash of the column hashes, concatenated     #
+# with a separator, HASH_GROUP_SIZE columns at a time for wide tables. So, the text hashed at   #
+# once stays below the 4000 bytes of an Oracle VARCHAR2, however wide the record. Oracle CLOB   #
+# columns are hashed with DBMS_CRYPTO (the user needs EXECUTE on it).                           #
+#                                                                                               #
+# The hashes can be compared across DB engines. The DBs must store text in UTF-8 (AL32UTF8 on   #
+# Oracle), SQL Server converts it with a UTF-8 collation (SQL Server 2019+).                    #
+#                                                                                               #
+# Records reported as different although they match:                                           #
+#   - Floating point numbers, each engine renders them its own way.                             #
+#   - SQL Server DATETIME values, stored in 1/300 s, they don't end in round milliseconds.     #
+# Differences that are not seen:                                                                #
+#   - Below a microsecond, in TIMESTAMP(9) or DATETIME2(7) columns.                             #
+#   - In the time zone of a value, only its local date & time is hashed.                        #
+# ----------------------------------------------------------------------------------------------#
+NULL_MARKER = "#NULL#"
+SEPARATOR = "|"
+
+# The sums of the record hashes are reduced modulo a prime, so they fit in a
+# double without losing precision.
+DIGEST_MODULUS = 4294967291
+
+# No. of column hashes (32 characters & a separator each) hashed together.
+HASH_GROUP_SIZE = 100
+
+# Max. no. of values of an IN list in Oracle. Longer lists are split into
+# several IN lists.
+IN_LIST_MAX_VALUES = 1000
+
+oracle_expressions = {
+    "number": "RTRIM(TO_CHAR({col}, 'FM99999999999999999999999999990.99999999999999999999'), '.')",
+    "datetime": "TO_CHAR(CAST({col} AS TIMESTAMP), 'YYYY-MM-DD HH24:MI:SS.FF6')",
+    # NCHAR & NVARCHAR2 are converted to the DB character set.
+    "text": "TO_CHAR({col})",
+    "float": "TO_CHAR({col})",
+    "other": "TO_CHAR({col})",
+    # CLOB & NCLOB can't be converted to a VARCHAR2, the column is hashed as it is
+    # (DBMS_CRYPTO hashes it in AL32UTF8). 2 is DBMS_CRYPTO.HASH_MD5.
+    "lob": "LOWER(RAWTOHEX(DBMS_CRYPTO.HASH(NVL(TO_CLOB({col}), TO_CLOB('" + NULL_MARKER + "')), 2)))",
+    "null": "COALESCE({expr}, '" + NULL_MARKER + "')",
+    "concat": " || '" + SEPARATOR + "' || ",
+    "md5": "LOWER(RAWTOHEX(STANDARD_HASH({expr}, 'MD5')))",
+    "hex_to_int": "TO_NUMBER(SUBSTR({expr}, {start}, 8), 'XXXXXXXX')",
+    "mod": "MOD({expr}, {modulus})",
+}
+
+postgres_expressions = {
+    "number": (
+        "CASE WHEN POSITION('.' IN {col}::TEXT) > 0 "
+        "THEN RTRIM(RTRIM({col}::TEXT, '0'), '.') ELSE {col}::TEXT END"
+    ),
+    "datetime": "TO_CHAR({col}, 'YYYY-MM-DD HH24:MI:SS.US')",
+    "text": "{col}::TEXT",
+    "float": "{col}::TEXT",
+    "other": "{col}::TEXT",
+    "null": "COALESCE({expr}, '" + NULL_MARKER + "')",
+    "concat": " || '" + SEPARATOR + "' || ",
+    "md5": "MD5({expr})",
+    "hex_to_int": "('x' || SUBSTR({expr}, {start}, 8))::BIT(32)::BIGINT",
+    "mod": "MOD({expr}, {modulus})",
+}
+
+sqlserver_expressions = {
+    # Trailing zeros (and the decimal point) are removed by turning zeros into spaces & trimming.
+    "number": (
+        "CASE WHEN CHARINDEX('.', CONVERT(VARCHAR(64), {col})) > 0 "
+        "THEN REPLACE(RTRIM(REPLACE(REPLACE(RTRIM(REPLACE(CONVERT(VARCHAR(64), {col}), '0', ' ')), "
+        "' ', '0'), '.', ' ')), ' ', '.') ELSE CONVERT(VARCHAR(64), {col}) END"
+    ),
+    "datetime": "CONVERT(VARCHAR(26), CONVERT(DATETIME2(6), {col}), 121)",
+    # NVARCHAR is hashed in UTF-16, and a plain VARCHAR turns the characters outside
+    # its code page into '?'. VARCHAR with a UTF-8 collation is hashed in UTF-8.
+    "text": "CONVERT(VARCHAR(MAX), CONVERT(NVARCHAR(MAX), {col}) COLLATE Latin1_General_100_BIN2_UTF8)",
+    # Style 3: 17 significant digits, the default style keeps only 6.
+    "float": "CONVERT(VARCHAR(32), {col}, 3)",
+    "other": "CONVERT(VARCHAR(MAX), CONVERT(NVARCHAR(MAX), {col}) COLLATE Latin1_General_100_BIN2_UTF8)",
+    "null": "COALESCE({expr}, '" + NULL_MARKER + "')",
+    "concat": " + '" + SEPARATOR + "' + ",
+    "md5": "LOWER(CONVERT(VARCHAR(32), HASHBYTES('MD5', {expr}), 2))",
+    "hex_to_int": "CONVERT(BIGINT, CONVERT(VARBINARY(4), SUBSTRING({expr}, {start}, 8), 2))",
+    "mod": "{expr} % {modulus}",
+}
+
+# ----------------------------------------------------------------------------------------------#
+# Checksum queries, the same in all the DBs. Records are hashed in the DB and grouped into      #
+# buckets on the hash of the primary key. Only the bucket digests are returned. Placeholders    #
+# are replaced with the DB specific expressions, see ChecksumQuery.                             #
+# ----------------------------------------------------------------------------------------------#
+checksum_queries = {}
+
+checksum_queries[
+    "checksum_buckets"
+] = """
+SELECT
+    bucket
+  , COUNT(*) AS row_count
+  , <digest_1_sum> AS digest_1
+  , <digest_2_sum> AS digest_2
+FROM (
+    SELECT
+        <bucket> AS bucket
+      , <parent_bucket> AS parent_bucket
+      , <digest_1> AS digest_1
+      , <digest_2> AS digest_2
+    FROM (
+        SELECT
+            <key_hash> AS key_hash
+          , <row_hash> AS row_hash
+        FROM
+            <schema>.<table>
+    ) h
+) b
+WHERE
+    <filter>
+GROUP BY
+    bucket
+"""
+
+checksum_queries[
+    "checksum_rows"
+] = """
+SELECT
+    *
+FROM (
+    SELECT
+        <bucket> AS bucket
+      , key_hash
+      , row_hash
+      , <key_columns>
+    FROM (
+        SELECT
+            <key_hash> AS key_hash
+          , <row_hash> AS row_hash
+          , <key_columns>
+        FROM
+            <schema>.<table>
+    ) h
+) b
+WHERE
+    <filter>
+"""
+
+# Keyless validation: the no. of records of each record hash.
+checksum_queries[
+    "row_hash_counts"
+] = """
+SELECT
+    row_hash
+  , COUNT(*) AS row_count
+FROM (
+    SELECT
+        <row_hash> AS row_hash
+    FROM
+        <schema>.<table>
+) h
+GROUP BY
+    row_hash
+"""
+
+# Keyless validation: the records having the given record hashes.
+checksum_queries[
+    "rows_by_hash"
+] = """
+SELECT
+    *
+FROM (
+    SELECT
+        <row_hash> AS row_hash
+      , t.*
+    FROM
+        <schema>.<table> t
+) h
+WHERE
+    row_hash IN (<row_hashes>)
+"""
+
+
+def checksum_validation_single_table(schema, table, primary_key, src_config, tgt_config):
+    """
+    Validates all the records of a table without moving them over the network.
+
+        - Each record is hashed in the DB. Records are grouped into buckets using
+          the hash of the primary key, and for each bucket, the DB returns the
+          no. of records & the sum of the record hashes.
+        - Buckets that don't match are split into CHECKSUM_BUCKETS smaller
+          buckets and compared again, up to CHECKSUM_MAX_DEPTH levels.
+        - Once the mismatching buckets hold no more than CHECKSUM_LEAF_ROWS
+          records (or the last level is reached), the primary key & record hash
+          of the records in those buckets are fetched & compared.
+
+    When the table matches, only a few KB are transferred, whatever the table size.
+    The summary & column differences are written to the same log files as the
+    record level validation.
+
+    :return: A TableResult.
+    """
+    root_dir = get_project_root()
+    log_dir = f"{root_dir}/logs"
+
+    if len(primary_key) == 0 and KEYLESS_VALIDATION:
+        return keyless_validation_single_table(schema, table, primary_key, src_config, tgt_config)
+
+    summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log")
+    table_result = TableResult(schema, table)
+    metrics = table_result.metrics
+
+    if len(primary_key) == 0:
+        msg = f"{schema}.{table} does not have primary keys,skipping data validation!"
+        return close_table_result(summary_file, table_result, SKIPPED, msg)
+
+    primary_key = [x.lower() for x in primary_key]
+
+    # ----------------------------------------------------------------------------------------------#
+    # Identify the columns present in both the tables.                                             #
+    # ----------------------------------------------------------------------------------------------#
+    try:
+        src_columns = get_hash_categories(src_config, schema, table)
+        tgt_columns = get_hash_categories(tgt_config, schema, table)
+    except SQLAlchemyError as e:
+        error = str(e).strip("\n")
+        msg = f"Error when reading the table columns: {error}"
+        return close_table_result(summary_file, table_result, ERROR, msg)
+
+    columns = [col for col in src_columns.keys() if col in tgt_columns.keys()]
+    missing_columns = [col for col in src_columns.keys() if col not in tgt_columns.keys()]
+
+    if len(columns) == 0:
+        msg = "No columns found in the Target table, skipping data validation!"
+        return close_table_result(summary_file, table_result, SKIPPED, msg)
+
+    if len(missing_columns) > 0:
+        msg = (
+            f"{schema}~{table}~0~0~~Columns not found in the Target table, "
+            f"not validated: {', '.join(missing_columns)}"
+        )
+        write_log_entry(summary_file, msg, False)
+
+    src_query = ChecksumQuery(src_config["db_engine"], schema, table, primary_key, columns, src_columns)
+    tgt_query = ChecksumQuery(tgt_config["db_engine"], schema, table, primary_key, columns, tgt_columns)
+
+    # ----------------------------------------------------------------------------------------------#
+    # Compare the bucket digests, drilling down into the buckets that don't match.                 #
+    # ----------------------------------------------------------------------------------------------#
+    try:
+        parent_buckets = None
+        parent_modulus = 1
+        no_recs_validated = None
+        mismatching_buckets = []
+
+        for depth in range(CHECKSUM_MAX_DEPTH):
+            modulus = parent_modulus * CHECKSUM_BUCKETS
+
+            with metrics.measure(SOURCE_FETCH) as counts:
+                src_df = table_to_df(src_config, src_query.buckets(modulus, parent_modulus, parent_buckets))
+                counts["rows"] = len(src_df)
+
+            with metrics.measure(TARGET_FETCH) as counts:
+                tgt_df = table_to_df(tgt_config, tgt_query.buckets(modulus, parent_modulus, parent_buckets))
+                counts["rows"] = len(tgt_df)
+
+            with metrics.measure(COMPARE) as counts:
+                mismatching_buckets, no_recs_in_buckets = compare_buckets(src_df, tgt_df)
+                counts["rows"] = len(src_df)
+
+            if no_recs_validated is None:
+                no_recs_validated = int(src_df["row_count"].map(int).sum())
+
+            msg = (
+                f"{schema}~{table}~0~0~~Level {depth + 1}: {len(mismatching_buckets)} of "
+                f"{modulus} buckets have differences."
+            )
+            write_log_entry(summary_file, msg, False)
+
+            if len(mismatching_buckets) == 0 or no_recs_in_buckets <= CHECKSUM_LEAF_ROWS:
+                break
+
+            parent_buckets = mismatching_buckets
+            parent_modulus = modulus
+
+        differences = []
+
+        if len(mismatching_buckets) > 0 and no_recs_in_buckets <= CHECKSUM_LEAF_ROWS:
+            with metrics.measure(SOURCE_FETCH) as counts:
+                src_df = table_to_df(src_config, src_query.rows(modulus, mismatching_buckets))
+                counts["rows"] = len(src_df)
+
+            with metrics.measure(TARGET_FETCH) as counts:
+                tgt_df = table_to_df(tgt_config, tgt_query.rows(modulus, mismatching_buckets))
+                counts["rows"] = len(tgt_df)
+
+            with metrics.measure(COMPARE) as counts:
+                differences = compare_row_hashes(src_df, tgt_df, primary_key)
+                counts["rows"] = len(src_df)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e)).strip("\n")
+        msg = f"Error when executing the checksum queries. {error}"
+        return close_table_result(summary_file, table_result, ERROR, msg)
+
+    # The mismatching buckets are still too large to list the records. Report the
+    # no. of records in those buckets.
+    if len(mismatching_buckets) > 0 and no_recs_in_buckets > CHECKSUM_LEAF_ROWS:
+        print(f"-> {schema:>30s} {table:>30s} {str(no_recs_in_buckets):>10s} differences found")
+
+        msg = (
+            f"{no_recs_in_buckets} records have data differences (upper bound, "
+            f"{len(mismatching_buckets)} buckets don't match)"
+        )
+        table_result.no_recs_validated = no_recs_validated
+        table_result.no_recs_having_differences = no_recs_in_buckets
+        return close_table_result(summary_file, table_result, DIFFERENCES, msg)
+
+    print(f"-> {schema:>30s} {table:>30s} {str(len(differences)):>10s} differences found")
+
+    # ----------------------------------------------------------------------------------------------#
+    # Write the column differences & the summary record.                                           #
+    # ----------------------------------------------------------------------------------------------#
+    if len(differences) > 0:
+        differences_df = pd.DataFrame(
+            differences, columns=["primary_key", "source_value", "target_value", "message"]
+        )
+        differences_df["column"] = ""
+        table_result.differences.extend(differences_df)
+
+    if WRITE_LOG_FILES:
+        write_differences_log(f"{log_dir}/{schema}_{table}_data_validation.log", table_result)
+
+    table_result.no_recs_validated = no_recs_validated
+    table_result.no_recs_having_differences = len(differences)
+    table_result.message = "NO DATA DIFFERENCES FOUND"
+
+    if len(differences) > 0:
+        table_result.status = DIFFERENCES
+        table_result.message = f"{len(differences)} records have data differences"
+
+    return close_table_result(summary_file, table_result)
+
+
+def keyless_validation_single_table(schema, table, primary_key, src_config, tgt_config):
+    """
+    Validates all the records of a table that doesn't have a primary key, by
+    comparing the multisets of the record hashes of the Source & Target tables.
+
+        - Each record is hashed in the DB, the same way as in the checksum
+          validation, and the DB returns the no. of records of each hash.
+        - The counts are compared: a hash with more records in the Source table
+          is reported as records not found in the Target table, and vice versa.
+        - The column values of up to KEYLESS_MAX_RECORDS of the hashes that
+          don't match are fetched, so that the records can be identified.
+
+    The memory used depends on the no. of distinct records, not on the no. of
+    records. Duplicated records are validated too: the counts must match.
+
+    :return: A TableResult.
+    """
+    root_dir = get_project_root()
+    log_dir = f"{root_dir}/logs"
+
+    summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log")
+    table_result = TableResult(schema, table)
+    metrics = table_result.metrics
+
+    msg = (
+        f"{schema}~{table}~0~0~~:{schema}.{table} does not have primary keys, "
+        "comparing the record hashes!"
+    )
+    write_log_entry(summary_file, msg, False)
+
+    # ----------------------------------------------------------------------------------------------#
+    # Identify the columns present in both the tables.                                             #
+    # ----------------------------------------------------------------------------------------------#
+    try:
+        src_columns = get_hash_categories(src_config, schema, table)
+        tgt_columns = get_hash_categories(tgt_config, schema, table)
+    except SQLAlchemyError as e:
+        error = str(e).strip("\n")
+        msg = f"Error when reading the table columns: {error}"
+        return close_table_result(summary_file, table_result, ERROR, msg)
+
+    columns = [col for col in src_columns.keys() if col in tgt_columns.keys()]
+    missing_columns = [col for col in src_columns.keys() if col not in tgt_columns.keys()]
+
+    if len(columns) == 0:
+        msg = "No columns found in the Target table, skipping data validation!"
+        return close_table_result(summary_file, table_result, SKIPPED, msg)
+
+    if len(missing_columns) > 0:
+        msg = (
+            f"{schema}~{table}~0~0~~Columns not found in the Target table, "
+            f"not validated: {', '.join(missing_columns)}"
+        )
+        write_log_entry(summary_file, msg, False)
+
+    try:
+        src_query = ChecksumQuery(src_config["db_engine"], schema, table, [], columns, src_columns)
+        tgt_query = ChecksumQuery(tgt_config["db_engine"], schema, table, [], columns, tgt_columns)
+    except ValueError as e:
+        return close_table_result(summary_file, table_result, SKIPPED, str(e))
+
+    # ----------------------------------------------------------------------------------------------#
+    # Compare the no. of records of each record hash, then fetch the records that don't match.     #
+    # ----------------------------------------------------------------------------------------------#
+    try:
+        with metrics.measure(SOURCE_FETCH) as counts:
+            src_df = table_to_df(src_config, src_query.hash_counts())
+            counts["rows"] = len(src_df)
+
+        with metrics.measure(TARGET_FETCH) as counts:
+            tgt_df = table_to_df(tgt_config, tgt_query.hash_counts())
+            counts["rows"] = len(tgt_df)
+
+        with metrics.measure(COMPARE) as counts:
+            hash_counts = compare_hash_counts(src_df, tgt_df)
+            no_recs_validated = int(src_df["row_count"].map(int).sum())
+            counts["rows"] = len(src_df)
+
+        # Only the counts are needed from now on.
+        del src_df, tgt_df
+
+        listed = hash_counts.head(KEYLESS_MAX_RECORDS)
+        missing_hashes = listed.index[listed["source"] > listed["target"]].tolist()
+        extra_hashes = listed.index[listed["target"] > listed["source"]].tolist()
+
+        with metrics.measure(SOURCE_FETCH) as counts:
+            src_records = read_records_by_hash(src_config, src_query, missing_hashes, columns)
+            counts["rows"] = len(src_records)
+
+        with metrics.measure(TARGET_FETCH) as counts:
+            tgt_records = read_records_by_hash(tgt_config, tgt_query, extra_hashes, columns)
+            counts["rows"] = len(tgt_records)
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e)).strip("\n")
+        msg = f"Error when executing the record hash queries. {error}"
+        return close_table_result(summary_file, table_result, ERROR, msg)
+
+    no_recs_missing = int((hash_counts["source"] - hash_counts["target"]).clip(lower=0).sum())
+    no_recs_extra = int((hash_counts["target"] - hash_counts["source"]).clip(lower=0).sum())
+    no_recs_having_differences = no_recs_missing + no_recs_extra
+
+    print(f"-> {schema:>30s} {table:>30s} {str(no_recs_having_differences):>10s} differences found")
+
+    # ----------------------------------------------------------------------------------------------#
+    # Write the record differences & the summary record.                                           #
+    # ----------------------------------------------------------------------------------------------#
+    differences = []
+
+    for row_hash, rec in listed.iterrows():
+        src_count, tgt_count = int(rec["source"]), int(rec["target"])
+
+        if src_count > tgt_count:
+            record = src_records.get(row_hash, f"row_hash = {row_hash}")
+            msg = f"{src_count - tgt_count} records not found in Target table"
+        else:
+            record = tgt_records.get(row_hash, f"row_hash = {row_hash}")
+            msg = f"{tgt_count - src_count} records not found in Source table"
+
+        differences.append((record, "", src_count, tgt_count, msg))
+
+    if len(differences) > 0:
+        table_result.differences.extend(
+            pd.DataFrame(differences, columns=DIFFERENCE_COLUMNS)
+        )
+
+    if WRITE_LOG_FILES:
+        write_differences_log(f"{log_dir}/{schema}_{table}_data_validation.log", table_result)
+
+    if len(hash_counts) > len(listed):
+        msg = (
+            f"{schema}~{table}~0~0~~{len(hash_counts)} record hashes don't match, "
+            f"the first {len(listed)} are listed."
+        )
+        write_log_entry(summary_file, msg, False)
+
+    table_result.no_recs_validated = no_recs_validated
+    table_result.no_recs_having_differences = no_recs_having_differences
+    table_result.message = "NO DATA DIFFERENCES FOUND"
+
+    if no_recs_having_differences > 0:
+        table_result.status = DIFFERENCES
+        table_result.message = (
+            f"{no_recs_missing} records not found in Target table, "
+            f"{no_recs_extra} records not found in Source table"
+        )
+
+    return close_table_result(summary_file, table_result)
+
+
+def get_hash_categories(config, schema, table):
+    """
+    Returns the category of each column of a table, as used to hash it: the
+    category of metadata.get_table_columns(), floating point columns are "float",
+    Oracle CLOB & NCLOB columns are "lob".
+
+    :return: A dictionary, column name -> category.
+    """
+    categories = {}
+
+    for column in get_table_columns(config, schema, table):
+        if column["category"] == "other" and FLOAT_TYPES.search(column["type"].upper()):
+            categories[column["name"]] = "float"
+        elif config["db_engine"] in ORACLE and column["type"].upper() in ["CLOB", "NCLOB"]:
+            categories[column["name"]] = "lob"
+        else:
+            categories[column["name"]] = column["category"]
+
+    return categories
+
+
+class ChecksumQuery:
+    """
+    Generates the checksum queries of a table for a DB engine.
+
+    :param db_engine: DB engine.
+    :param primary_key: A list of primary key column names, in lower case.
+    :param columns: Column names to be hashed, in lower case.
+    :param column_categories: A dictionary, column name -> category (number,
+        datetime, text, float, lob or other), see get_hash_categories().
+    """
+
+    def __init__(self, db_engine, schema, table, primary_key, columns, column_categories):
+        if db_engine in ORACLE:
+            self.expressions = oracle_expressions
+        elif db_engine in POSTGRES:
+            self.expressions = postgres_expressions
+        elif db_engine in SQLSERVER:
+            self.expressions = sqlserver_expressions
+        else:
+            raise ValueError(f"{db_engine} IS NOT SUPPORTED FOR CHECKSUM VALIDATION")
+
+        self.schema = schema
+        self.table = table
+        self.primary_key = primary_key
+
+        self.key_hash = None
+
+        if len(primary_key) > 0:
+            self.key_hash = self.hash_expression(primary_key, column_categories)
+
+        self.row_hash = self.hash_expression(columns, column_categories)
+
+    def hash_expression(self, columns, column_categories):
+        """
+        MD5 hash of the MD5 hashes of the columns, converted to text. Wide tables
+        are hashed HASH_GROUP_SIZE columns at a time, then the group hashes.
+        """
+        md5 = self.expressions["md5"]
+        hashes = []
+
+        for col in columns:
+            if column_categories[col] == "lob":
+                hashes.append(self.expressions["lob"].format(col=col))
+                continue
+
+            value = self.expressions[column_categories[col]].format(col=col)
+            hashes.append(md5.format(expr=self.expressions["null"].format(expr=value)))
+
+        while len(hashes) > HASH_GROUP_SIZE:
+            hashes = [
+                md5.format(expr=self.expressions["concat"].join(hashes[i:i + HASH_GROUP_SIZE]))
+                for i in range(0, len(hashes), HASH_GROUP_SIZE)
+            ]
+
+        return md5.format(expr=self.expressions["concat"].join(hashes))
+
+    def replace_placeholders(self, query, modulus, parent_modulus):
+        key_int = self.expressions["hex_to_int"].format(expr="key_hash", start=1)
+        mod = self.expressions["mod"]
+
+        return (
+            query.replace("<bucket>", mod.format(expr=key_int, modulus=modulus))
+            .replace("<parent_bucket>", mod.format(expr=key_int, modulus=parent_modulus))
+            .replace("<digest_1_sum>", mod.format(expr="SUM(digest_1)", modulus=DIGEST_MODULUS))
+            .replace("<digest_2_sum>", mod.format(expr="SUM(digest_2)", modulus=DIGEST_MODULUS))
+            .replace("<digest_1>", self.expressions["hex_to_int"].format(expr="row_hash", start=1))
+            .replace("<digest_2>", self.expressions["hex_to_int"].format(expr="row_hash", start=9))
+            .replace("<key_hash>", self.key_hash or "")
+            .replace("<row_hash>", self.row_hash)
+            .replace("<key_columns>", ", ".join(self.primary_key))
+            .replace("<schema>", self.schema)
+            .replace("<table>", self.table)
+        )
+
+    def buckets(self, modulus, parent_modulus, parent_buckets):
+        """
+        Query returning bucket, row_count, digest_1, digest_2 for the buckets of
+        the given level. Only the records in parent_buckets are included, all the
+        records when parent_buckets is None.
+        """
+        query = self.replace_placeholders(
+            checksum_queries["checksum_buckets"], modulus, parent_modulus
+        )
+
+        if parent_buckets is None:
+            return query.replace("<filter>", "1 = 1")
+
+        return query.replace("<filter>", in_list_condition("parent_bucket", parent_buckets))
+
+    def rows(self, modulus, buckets):
+        """
+        Query returning bucket, key_hash, row_hash & the primary key columns of
+        the records in the given buckets.
+        """
+        query = self.replace_placeholders(checksum_queries["checksum_rows"], modulus, 1)
+
+        return query.replace("<filter>", in_list_condition("bucket", buckets))
+
+    def hash_counts(self):
+        """
+        Query returning row_hash, row_count: the no. of records of each record hash.
+        """
+        return self.replace_placeholders(checksum_queries["row_hash_counts"], 1, 1)
+
+    def rows_by_hash(self, row_hashes):
+        """
+        Query returning row_hash & all the columns of the records having the
+        given record hashes.
+        """
+        query = self.replace_placeholders(checksum_queries["rows_by_hash"], 1, 1)
+
+        # The hashes are hex strings computed by the DBs, safe to inline.
+        return query.replace("<row_hashes>", ", ".join([f"'{h}'" for h in row_hashes]))
+
+
+def in_list_condition(column, values):
+    """
+    Condition column IN (values), as an OR of IN lists of up to
+    IN_LIST_MAX_VALUES values each. The table is still read once.
+    """
+    in_lists = [
+        f"{column} IN ({', '.join([str(v) for v in values[i:i + IN_LIST_MAX_VALUES]])})"
+        for i in range(0, len(values), IN_LIST_MAX_VALUES)
+    ]
+
+    return "(" + " OR ".join(in_lists) + ")"
+
+
+def compare_buckets(src_df, tgt_df):
+    """
+    Compares the bucket digests of the Source & Target tables.
+
+    :return: A tuple - A sorted list of the buckets that don't match, and the
+        no. of records in those buckets (the larger of Source & Target).
+    """
+    src_df.columns = [col.lower() for col in src_df.columns]
+    tgt_df.columns = [col.lower() for col in tgt_df.columns]
+
+    df = pd.merge(src_df, tgt_df, how="outer", on="bucket", suffixes=("_src", "_tgt"))
+    df = df.fillna(0)
+
+    # Depending on the DB, the numbers are returned as int, float or Decimal.
+    for col in df.columns:
+        df[col] = df[col].map(int)
+
+    mismatch = (
+        (df["row_count_src"] != df["row_count_tgt"])
+        | (df["digest_1_src"] != df["digest_1_tgt"])
+        | (df["digest_2_src"] != df["digest_2_tgt"])
+    )
+
+    df = df[mismatch]
+    no_recs = int(df[["row_count_src", "row_count_tgt"]].max(axis=1).sum())
+
+    return sorted(df["bucket"].tolist()), no_recs
+
+
+def compare_row_hashes(src_df, tgt_df, primary_key):
+    """
+    Compares the record hashes of the Source & Target tables, using the hash of
+    the primary key to match the records.
+
+    :return: A list of tuples: (primary key, source hash, target hash, message)
+    """
+    src_df.columns = [col.lower() for col in src_df.columns]
+    tgt_df.columns = [col.lower() for col in tgt_df.columns]
+
+    # Keep the key values as they are (an outer join turns integers into floats).
+    src_df = src_df.astype(object)
+    tgt_df = tgt_df.astype(object)
+
+    df = pd.merge(
+        src_df,
+        tgt_df,
+        how="outer",
+        on="key_hash",
+        suffixes=("", "_tgt"),
+        indicator=True,
+    )
+
+    df = df[(df["_merge"] != "both") | (df["row_hash"] != df["row_hash_tgt"])]
+    differences = []
+
+    for rec in df.to_dict("records"):
+        if rec["_merge"] == "left_only":
+            pk_data = "".join([f"{col} = {rec[col]}" for col in primary_key])
+            differences.append((pk_data, rec["row_hash"], None, "Record not found in Target table"))
+        elif rec["_merge"] == "right_only":
+            pk_data = "".join([f"{col} = {rec[col + '_tgt']}" for col in primary_key])
+            differences.append((pk_data, None, rec["row_hash_tgt"], "Record not found in Source table"))
+        else:
+            pk_data = "".join([f"{col} = {rec[col]}" for col in primary_key])
+            differences.append((pk_data, rec["row_hash"], rec["row_hash_tgt"], "Record hashes are different"))
+
+    differences.sort(key=lambda x: x[0])
+
+    return differences
+
+
+def compare_hash_counts(src_df, tgt_df):
+    """
+    Compares the no. of records of each record hash of the Source & Target tables.
+
+    :return: A DataFrame indexed by the record hashes that don't match, sorted,
+        with the columns source & target: the no. of records of the hash in
+        each table.
+    """
+    src_df.columns = [col.lower() for col in src_df.columns]
+    tgt_df.columns = [col.lower() for col in tgt_df.columns]
+
+    counts = pd.concat(
+        [src_df.set_index("row_hash")["row_count"], tgt_df.set_index("row_hash")["row_count"]],
+        axis=1,
+        keys=["source", "target"],
+    )
+
+    # Depending on the DB, the counts are returned as int, float or Decimal.
+    counts = counts.fillna(0).astype("int64")
+
+    return counts[counts["source"] != counts["target"]].sort_index()
+
+
+def read_records_by_hash(config, query, row_hashes, columns):
+    """
+    Reads the records having the given record hashes. The hashes are sent in
+    chunks of IN_LIST_MAX_VALUES.
+
+    :return: A dictionary, record hash -> column values of one of its records,
+        as text: col1 = value1, col2 = value2...
+    """
+    records = {}
+
+    for start in range(0, len(row_hashes), IN_LIST_MAX_VALUES):
+        chunk = row_hashes[start:start + IN_LIST_MAX_VALUES]
+        df = table_to_df(config, query.rows_by_hash(chunk))
+        df.columns = [col.lower() for col in df.columns]
+
+        for rec in df.drop_duplicates("row_hash").to_dict("records"):
+            records[rec["row_hash"]] = ", ".join([f"{col} = {rec[col]}" for col in columns])
+
+    return records
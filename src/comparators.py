@@ -0,0 +1,350 @@
+import decimal
+import re
+
+import numpy as np
+import pandas as pd
+from settings import COMPARE_IGNORE_CASE, COMPARE_IGNORE_TRAILING_SPACES, COMPARE_NUMBER_TOLERANCE
+
+from .constants import ORACLE, SQLSERVER
+from .metadata import get_table_columns
+
+# ------------------------------------------------------------------------------#
+# Comparison of the Source & Target values of a column.                         #
+#                                                                               #
+# The comparison is chosen once per column, from its types in both the DBs, and #
+# runs on the whole column. Values that don't convert to the column's kind (a   #
+# text in a number column...) are compared as they are.                         #
+# ------------------------------------------------------------------------------#
+NUMBER = "number"
+DATETIME = "datetime"
+TEXT = "text"
+GENERIC = "generic"
+
+# Floating point types are not in the "number" category, see metadata.column_category().
+FLOAT_TYPES = re.compile(r"FLOAT|DOUBLE|REAL")
+
+# Precisions of the date & time types, from the most to the least precise. None
+# is the precision of the values (microseconds or nanoseconds).
+DATETIME_PRECISIONS = [None, "3ms", "s", "min", "D"]
+
+# Dates drop the time, values are truncated to the day. The other types are
+# rounded to the nearest unit by the DBs: the values are equal when they're no
+# more than half a unit apart. SQL Server DATETIME is rounded to increments of
+# .000, .003 or .007 seconds, at most 2 ms away.
+TRUNCATED_PRECISIONS = ["D"]
+ROUNDING_TOLERANCES = {
+    "3ms": pd.Timedelta(milliseconds=2),
+    "s": pd.Timedelta(milliseconds=500),
+    "min": pd.Timedelta(seconds=30),
+}
+
+
+class ColumnComparator:
+    """
+    Compares the Source & Target values of a column.
+
+    :param kind: NUMBER, DATETIME, TEXT or GENERIC.
+    :param tolerance: Number columns: the max. relative difference of two equal
+        numbers. 0 to compare them exactly, as decimals.
+    :param precision: Datetime columns: the precision of the less precise type,
+        one of DATETIME_PRECISIONS. None to compare the values as they are. See
+        TRUNCATED_PRECISIONS & ROUNDING_TOLERANCES.
+    :param empty_as_null: Text columns: when true, empty text equals null.
+    """
+
+    def __init__(self, kind=GENERIC, tolerance=0, precision=None, empty_as_null=False):
+        self.kind = kind
+        self.tolerance = tolerance
+        self.precision = precision
+        self.empty_as_null = empty_as_null
+
+    def mismatch_mask(self, source_col, target_col):
+        """
+        :return: A tuple - a boolean numpy array, True where the values are
+            different and a dictionary of error messages keyed by row number.
+        """
+        if self.kind == GENERIC:
+            return generic_mismatch_mask(source_col, target_col)
+
+        # Values that are equal as they are, are equal once converted. Only the
+        # others (few, usually) are converted.
+        try:
+            mask = column_mismatch_mask(source_col, target_col)
+        except Exception:
+            mask = np.ones(len(source_col), dtype=bool)
+
+        if not mask.any():
+            return mask, {}
+
+        rows = np.flatnonzero(mask)
+        rows_mask, rows_messages = self.converted_mismatch_mask(
+            source_col.iloc[rows], target_col.iloc[rows]
+        )
+        mask[rows] = rows_mask
+
+        return mask, {rows[row]: message for row, message in rows_messages.items()}
+
+    def converted_mismatch_mask(self, source_col, target_col):
+        """
+        Compares the values once converted to the kind of the column.
+        """
+        if self.kind == NUMBER and self.tolerance:
+            source_values = pd.to_numeric(source_col, errors="coerce")
+            target_values = pd.to_numeric(target_col, errors="coerce")
+            mask = number_mismatch_mask(source_values, target_values, self.tolerance)
+        elif self.kind == NUMBER:
+            # Float64 would round integers & decimals of more than 15 digits.
+            source_values = source_col.map(to_decimal).astype(object)
+            target_values = target_col.map(to_decimal).astype(object)
+            mask = column_mismatch_mask(source_values, target_values)
+        elif self.kind == DATETIME:
+            source_values = self.to_datetime(source_col)
+            target_values = self.to_datetime(target_col)
+
+            if self.precision is None or self.precision in TRUNCATED_PRECISIONS:
+                mask = column_mismatch_mask(source_values, target_values)
+            else:
+                tolerance = ROUNDING_TOLERANCES[self.precision]
+                mask = datetime_mismatch_mask(source_values, target_values, tolerance)
+        else:
+            return column_mismatch_mask(self.to_text(source_col), self.to_text(target_col)), {}
+
+        # Compare the values that couldn't be converted as they are.
+        not_converted = (source_values.isna().to_numpy() & source_col.notna().to_numpy()) | (
+            target_values.isna().to_numpy() & target_col.notna().to_numpy()
+        )
+        messages = {}
+
+        if not_converted.any():
+            rows = np.flatnonzero(not_converted)
+            rows_mask, rows_messages = generic_mismatch_mask(
+                source_col.iloc[rows], target_col.iloc[rows]
+            )
+            mask[rows] = rows_mask
+            messages = {rows[row]: message for row, message in rows_messages.items()}
+
+        return mask, messages
+
+    def to_datetime(self, col):
+        # Text that isn't in the ISO format is compared as it is.
+        values = pd.to_datetime(col, errors="coerce", utc=True, format="ISO8601")
+
+        if self.precision in TRUNCATED_PRECISIONS:
+            values = values.dt.floor(self.precision)
+
+        return values
+
+    def to_text(self, col):
+        values = col.astype("string")
+
+        if COMPARE_IGNORE_TRAILING_SPACES:
+            values = values.str.rstrip(" ")
+
+        if COMPARE_IGNORE_CASE:
+            values = values.str.lower()
+
+        if self.empty_as_null:
+            values = values.mask(values.eq(""))
+
+        return values
+
+
+def build_comparators(src_config, tgt_config, schema, table):
+    """
+    Chooses the comparison of each column of a table, from its types in both
+    the DBs.
+
+    :return: A dictionary, column name (lower case) -> ColumnComparator. Columns
+        that are not in both the tables are not included.
+    """
+    src_columns = {c["name"]: c for c in get_table_columns(src_config, schema, table)}
+    tgt_columns = {c["name"]: c for c in get_table_columns(tgt_config, schema, table)}
+
+    comparators = {}
+
+    for name, src_column in src_columns.items():
+        if name not in tgt_columns:
+            continue
+
+        tgt_column = tgt_columns[name]
+        kind = comparison_kind(src_column)
+
+        if kind != comparison_kind(tgt_column):
+            comparators[name] = ColumnComparator()
+        elif kind == DATETIME:
+            precision = max(
+                datetime_precision(src_config["db_engine"], src_column["type"]),
+                datetime_precision(tgt_config["db_engine"], tgt_column["type"]),
+                key=DATETIME_PRECISIONS.index,
+            )
+            comparators[name] = ColumnComparator(DATETIME, precision=precision)
+        elif kind == TEXT:
+            # Oracle stores empty text as null.
+            empty_as_null = src_config["db_engine"] in ORACLE or tgt_config["db_engine"] in ORACLE
+            comparators[name] = ColumnComparator(TEXT, empty_as_null=empty_as_null)
+        elif kind == NUMBER:
+            # Integers & decimals are exact, floating point numbers are not.
+            is_float = FLOAT_TYPES.search(src_column["type"].upper()) or FLOAT_TYPES.search(
+                tgt_column["type"].upper()
+            )
+            tolerance = COMPARE_NUMBER_TOLERANCE if is_float else 0
+            comparators[name] = ColumnComparator(NUMBER, tolerance=tolerance)
+        else:
+            comparators[name] = ColumnComparator(kind)
+
+    return comparators
+
+
+def comparison_kind(column):
+    """
+    :param column: A column, as returned by metadata.get_table_columns().
+    """
+    if column["category"] in [NUMBER, DATETIME, TEXT]:
+        return column["category"]
+
+    if FLOAT_TYPES.search(column["type"].upper()):
+        return NUMBER
+
+    return GENERIC
+
+
+def datetime_precision(db_engine, type_name):
+    """
+    Returns the precision of a date & time type, one of DATETIME_PRECISIONS.
+    """
+    type_name = type_name.upper()
+
+    if type_name == "DATE":
+        return "s" if db_engine in ORACLE else "D"
+
+    # Rounded to the nearest minute.
+    if type_name == "SMALLDATETIME":
+        return "min"
+
+    # Rounded to increments of .000, .003 or .007 seconds.
+    if type_name == "DATETIME" and db_engine in SQLSERVER:
+        return "3ms"
+
+    return None
+
+
+def to_decimal(value):
+    """
+    Returns a number as a Decimal, None if it isn't a finite number. Floats are
+    converted from their shortest representation, so 0.1 is Decimal("0.1").
+    """
+    if isinstance(value, bool):
+        return None
+
+    try:
+        if isinstance(value, (float, np.floating)):
+            number = decimal.Decimal(repr(float(value)))
+        elif isinstance(value, (int, np.integer)):
+            number = decimal.Decimal(int(value))
+        elif isinstance(value, (decimal.Decimal, str)):
+            number = decimal.Decimal(value)
+        else:
+            return None
+    except (decimal.InvalidOperation, ValueError):
+        return None
+
+    return number if number.is_finite() else None
+
+
+def number_mismatch_mask(source_values, target_values, tolerance):
+    """
+    Compares two numeric columns: the values are equal when their relative
+    difference is no more than tolerance. Two nulls are equal.
+
+    :return: A boolean numpy array, True where the values are different.
+    """
+    source_null = source_values.isna().to_numpy()
+    target_null = target_values.isna().to_numpy()
+
+    # Equal values (infinities included), or close enough.
+    equal = source_values.eq(target_values).to_numpy(dtype=bool)
+
+    a = source_values.to_numpy(dtype="float64", na_value=np.nan)
+    b = target_values.to_numpy(dtype="float64", na_value=np.nan)
+
+    with np.errstate(invalid="ignore"):
+        equal = equal | (np.abs(a - b) <= tolerance * np.maximum(np.abs(a), np.abs(b)))
+
+    return (source_null ^ target_null) | (~equal & ~source_null & ~target_null)
+
+
+def datetime_mismatch_mask(source_values, target_values, tolerance):
+    """
+    Compares two datetime columns: the values are equal when they're no more
+    than tolerance (a Timedelta) apart. Two nulls are equal.
+
+    :return: A boolean numpy array, True where the values are different.
+    """
+    source_null = source_values.isna().to_numpy()
+    target_null = target_values.isna().to_numpy()
+
+    close = (source_values - target_values).abs() <= tolerance
+    equal = close.to_numpy(dtype=bool, na_value=False)
+
+    return (source_null ^ target_null) | (~equal & ~source_null & ~target_null)
+
+
+def column_mismatch_mask(source_col, target_col):
+    """
+    Null safe comparison of a Source & Target column. Two nulls are treated as
+    equal.
+
+    :return: A boolean numpy array, True where the values are different.
+    """
+    source_null = source_col.isna().to_numpy()
+    target_null = target_col.isna().to_numpy()
+    not_equal = source_col.ne(target_col).to_numpy(dtype=bool, na_value=True)
+
+    return (source_null ^ target_null) | (not_equal & ~source_null & ~target_null)
+
+
+def generic_mismatch_mask(source_col, target_col):
+    """
+    Compares the values of a column as they are, as a whole if possible.
+
+    :return: A tuple - a boolean numpy array, True where the values are
+        different and a dictionary of error messages keyed by row number.
+    """
+    try:
+        return column_mismatch_mask(source_col, target_col), {}
+    except Exception:
+        # Values in this column can't be compared as a whole (for ex, LOBs
+        # or arrays). Compare them one by one.
+        return column_mismatch_mask_slow(source_col, target_col)
+
+
+def column_mismatch_mask_slow(source_col, target_col):
+    """
+    Compares a Source & Target column value by value. Used when the column
+    cannot be compared with column_mismatch_mask().
+
+    :return: A tuple - a boolean numpy array, True where the values are
+    different and a dictionary of error messages keyed by row number.
+    """
+    mask = np.zeros(len(source_col), dtype=bool)
+    messages = {}
+
+    for index, (source_cell, target_cell) in enumerate(
+        zip(source_col.tolist(), target_col.tolist())
+    ):
+        try:
+            if (
+                (source_cell is None and target_cell is not None)
+                or (source_cell is not None and target_cell is None)
+                or (
+                    source_cell is not None
+                    and target_cell is not None
+                    and source_cell != target_cell
+                )
+            ):
+                mask[index] = True
+        except Exception as err:
+            mask[index] = True
+            messages[index] = str(err)
+
+    return mask, messages
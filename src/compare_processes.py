@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import settings
+from settings import COMPARE_PROCESSES
+
+# ------------------------------------------------------------------------------#
+# Compare stage: merges & compares the Source & Target records in a pool of    #
+# processes.                                                                    #
+#                                                                               #
+# The validation threads spend most of their time waiting on the DBs, which   #
+# releases the GIL. Merging & comparing is CPU bound and holds it, so with     #
+# many threads, the comparisons run one at a time. Sent to COMPARE_PROCESSES   #
+# processes, they run on as many cores.                                         #
+#                                                                               #
+# The DataFrames are pickled to & from the processes. The records read from    #
+# the DBs are mostly Python objects (text, Decimal, datetime), so this costs   #
+# about as much as a copy; it pays off when the merge & compare don't.          #
+# ------------------------------------------------------------------------------#
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def compare_processes_enabled():
+    return COMPARE_PROCESSES is None or COMPARE_PROCESSES > 0
+
+
+def load_settings(values):
+    """
+    Runs in each new process: applies the settings of the main process, which
+    may have been changed after settings.py was read (see benchmarks).
+    """
+    for name, value in values.items():
+        setattr(settings, name, value)
+
+
+def run_in_compare_process(function, *args):
+    """
+    Calls the function with the given arguments in a compare process & waits
+    for its result. The function must be defined at the top level of a module.
+    Exceptions raised by the function are raised again here.
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            values = {
+                name: getattr(settings, name) for name in dir(settings) if name.isupper()
+            }
+
+            # Processes are started fresh, not forked: the validation threads may
+            # hold locks (DB drivers, logging) when a process is created.
+            _executor = ProcessPoolExecutor(
+                max_workers=COMPARE_PROCESSES or os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=load_settings,
+                initargs=(values,),
+            )
+
+        future = _executor.submit(function, *args)
+
+    return future.result()
+
+
+def shutdown_compare_processes(cancel=False):
+    """
+    Stops the compare processes, once all the tables are compared.
+
+    :param cancel: When true, the comparisons not started yet are cancelled.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+
+    if executor is not None:
+        executor.shutdown(wait=not cancel, cancel_futures=cancel)
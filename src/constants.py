@@ -2,3 +2,6 @@
 ORACLE = ["Oracle"]
 POSTGRES = ["Postgres", "PostgreSQL", "Amazon Aurora PostgreSQL"]
 SQLSERVER = ["Microsoft SQL Server", "SQL Server", "SQLSERVER", "sqlserver"]
+
+# Local stand-in for the Source & Target DBs, used by the benchmarks.
+SQLITE = ["SQLite", "sqlite"]
@@ -1,27 +1,43 @@
+import io
 import os
 import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import numpy as np
 import pandas as pd
-from databases.oracle import oracle_table_to_df
-from databases.oracle_queries import oracle_queries
-from databases.postgres import postgres_table_to_df
-from databases.sql_server import sqlserver_table_to_df
-from databases.sql_server_queries import sqlserver_queries
-import datetime
-
-
-from settings import DATA_VALIDATION_REC_COUNT, DEBUG_DATA_VALIDATION, PARALLEL_THREADS
-from sql_formatter.core import format_sql
+from databases import table_to_df, table_to_df_chunks
+from databases.engines import dispose_engines
+from settings import (DATA_VALIDATION_REC_COUNT, DEBUG_DATA_VALIDATION, INCREMENTAL_VALIDATION,
+                      KEYLESS_VALIDATION, PARALLEL_THREADS, SAMPLING_METHOD,
+                      SEQUENTIAL_FIRST_BATCH, SEQUENTIAL_SAMPLING, STREAMING_CHUNK_SIZE,
+                      TABLE_PARTITIONS, VALIDATION_MODE, WRITE_LOG_FILES)
 from sqlalchemy.exc import SQLAlchemyError
 
-from .constants import ORACLE, POSTGRES, SQLSERVER
+from .checkpoint import (mark_table_finished, mark_table_running, start_run,
+                         update_table_metrics)
+from .checksum_validation import (checksum_validation_single_table,
+                                  keyless_validation_single_table)
+from .comparators import ColumnComparator, build_comparators
+from .compare_processes import (compare_processes_enabled, run_in_compare_process,
+                                shutdown_compare_processes)
 from .html_reports import generate_data_validation_report
-from .utils import get_project_root, print_messages
-
-
-def data_validation(tables: list, src_config: dict, tgt_config: dict) -> None:
+from .key_lookup import generate_target_lookup_queries
+from .key_reconciliation import key_reconciliation_single_table
+from .metadata import get_primary_keys, save_metadata_cache
+from .metrics import (COMPARE, MERGE, OUTPUT, PRIMARY_KEYS, SOURCE_FETCH, TARGET_FETCH,
+                      TableMetrics, frame_bytes, write_run_metrics)
+from .output_writers import submit_output, wait_for_outputs
+from .profile_validation import profile_validation_single_table
+from .results import (DIFFERENCES, ERROR, SKIPPED, TableResult, ValidationError,
+                      close_table_result, write_differences_log)
+from .sampling import (WATERMARK_ALIAS, SequentialSample, generate_changed_records_queries,
+                       generate_partition_queries, generate_source_queries, growing_batches)
+from .utils import get_project_root, open_log_file, print_messages, write_log_entry
+from .watermarks import advance_window, get_watermark_window, save_watermarks, set_watermark
+
+
+def data_validation(tables: list, src_config: dict, tgt_config: dict, resume: bool = False) -> None:
     """
     This is the Driver function that controls all data validation activity.
 
@@ -41,6 +57,9 @@ def data_validation(tables: list, src_config: dict, tgt_config: dict) -> None:
     tgt_config: Target DB config. A Dictionary that has all details needed to
                 connect to the target database.
 
+    resume:     When true, the tables done in the last run (see checkpoint.py)
+                are not validated again, their results are reused in the report.
+
     Steps:
     ------
     1. Get the list of tables that are being migrated
@@ -54,9 +73,11 @@ def data_validation(tables: list, src_config: dict, tgt_config: dict) -> None:
     root_dir = get_project_root()
     log_dir = f"{root_dir}/logs"
 
-    # Delete log files
-    for file in os.listdir(log_dir):
-        os.remove(os.path.join(log_dir, file))
+    # Delete log files. When resuming, the log files of the tables done in the
+    # last run are kept.
+    if not resume:
+        for file in os.listdir(log_dir):
+            os.remove(os.path.join(log_dir, file))
 
     # Step 1: Get the list of tables that are being migrated
     no_tables = len(tables)
@@ -68,77 +89,148 @@ def data_validation(tables: list, src_config: dict, tgt_config: dict) -> None:
         print_messages([[msg1], [msg2]], ["Error"])
         sys.exit(1)
 
-    # Step 2: Using DB catalog tables, identify primary key columns for each
-    # table from source DB.
-    df = fetch_primary_key_column_names(src_config, tables)
-
-    # This dictionary will hold the primary key data for each table
-    #  - Key: Table name
-    #  - Value: A list of primary key column names
-    primary_keys = {}
+    # Record the state of each table in the run manifest.
+    done_results = start_run(tables, src_config, tgt_config, VALIDATION_MODE, resume)
+    results = list(done_results.values())
 
-    for row in df.values.tolist():
-        schema, table, pk = row[0], row[1], row[2]
+    if len(done_results) > 0:
+        print(f"-> Resuming the last run. Tables done already: {len(done_results)}")
+        tables = [t for t in tables if (t["schema"], t["table"]) not in done_results]
 
-        if table not in primary_keys.keys():
-            primary_keys[table] = []
+    # Step 2: Using DB catalog tables, identify primary key columns for each
+    # table from source DB. Tables found in the metadata cache are not queried.
+    #  - Key: (schema, table)
+    #  - Value: A list of primary key column names
+    run_metrics = TableMetrics()
 
-        primary_keys[table].append(pk)
+    with run_metrics.measure(PRIMARY_KEYS) as counts:
+        primary_keys = get_primary_keys(src_config, tables)
+        counts["rows"] = len(tables)
 
     print(f"-> Primary keys have been identified.")
 
     print(
-        f"-> Total tables: {no_tables}."
-        f"Tables having primary keys: {len(primary_keys)}"
+        f"-> Total tables: {no_tables}. "
+        f"Tables having primary keys: {len([pk for pk in primary_keys.values() if len(pk) > 0])}"
     )
 
     # Perform data validation in parallel rather sequentially to
-    # get better performance.
-    i = 0
-    no_threads_per_cycle = PARALLEL_THREADS
-
-    if no_threads_per_cycle > no_tables:
-        no_threads_per_cycle = no_tables
-
-    while True:
-        threads = []
-
-        for j in range(no_threads_per_cycle):
-            table_id = i + j
-            schema = tables[table_id]["schema"]
-            table = tables[table_id]["table"]
+    # get better performance. The workers pick up the next table as soon as
+    # they're free, so one slow table doesn't hold up the others.
+    no_workers = max(1, min(PARALLEL_THREADS, len(tables)))
+    processed_tables = len(done_results)
+    table_results = []
+
+    if VALIDATION_MODE == "checksum":
+        validation_function = checksum_validation_single_table
+    elif VALIDATION_MODE == "profile":
+        validation_function = profile_validation_single_table
+    elif VALIDATION_MODE == "keys":
+        validation_function = key_reconciliation_single_table
+    else:
+        validation_function = data_validation_single_table
 
-            t = threading.Thread(
-                target=data_validation_single_table,
-                args=(
+    # The pooled DB connections & the compare processes are closed however the
+    # loop ends: an error or an interrupt doesn't leave them open.
+    try:
+        with ThreadPoolExecutor(
+            max_workers=no_workers, thread_name_prefix="data_validation"
+        ) as executor:
+            futures = {}
+
+            for entry in tables:
+                schema = entry["schema"]
+                table = entry["table"]
+
+                future = executor.submit(
+                    validate_table,
+                    validation_function,
                     schema,
                     table,
-                    primary_keys[table] if table in primary_keys.keys() else [],
+                    primary_keys.get((schema.upper(), table.upper()), []),
                     src_config,
                     tgt_config,
-                ),
-            )
-            t.start()
+                )
+                futures[future] = (schema, table)
 
-            threads.append(t)
+            recorded = set()
 
-        # Wait for the threads to complete
-        for t in threads:
-            t.join()
+            def record_result(future):
+                """
+                Records the result of a table in the run manifest. An unexpected
+                error in one table must not stop the others.
+                """
+                schema, table = futures[future]
 
-        i += no_threads_per_cycle
+                try:
+                    result = future.result()
+                except Exception as err:
+                    error = str(err).strip("\n")
+                    print(f"-> Error when validating {schema}.{table}: {error}")
 
-        if (no_tables - i) < no_threads_per_cycle:
-            no_threads_per_cycle = no_tables - i
+                    summary_file = open_log_file(
+                        f"{log_dir}/{schema}_{table}_data_validation_summary.log", "a"
+                    )
+                    result = TableResult(schema, table)
+                    msg = f"Error when validating the table. {error}"
+                    close_table_result(summary_file, result, ERROR, msg)
+
+                table_results.append(result)
+                mark_table_finished(result)
+                recorded.add(future)
+
+            try:
+                for future in as_completed(futures):
+                    processed_tables += 1
+                    record_result(future)
+
+                    if processed_tables % no_workers == 0 and processed_tables < no_tables:
+                        print(
+                            f"-> {processed_tables} tables have been processed. Remaining tables: "
+                            f"{no_tables - processed_tables}"
+                        )
+            except KeyboardInterrupt:
+                # Don't start the tables still waiting. The ones running are finished
+                # and recorded, a second interrupt stops waiting for them.
+                print("-> Interrupted, finishing the tables running.")
+                executor.shutdown(wait=False, cancel_futures=True)
 
-        if i >= no_tables:
-            print(f"-> All tables [{no_tables}] have been processed.")
-            break
-        else:
-            print(
-                f"-> {i} tables have been processed. Remaining tables: "
-                f"{no_tables - i}"
-            )
+                for future in futures:
+                    if future not in recorded and not future.cancelled():
+                        record_result(future)
+
+                shutdown_compare_processes(cancel=True)
+
+                # As below: the tables recorded as done have their output files written,
+                # a table whose file couldn't be written is an error & is run again.
+                wait_for_outputs()
+
+                for result in table_results:
+                    if result.status == ERROR:
+                        mark_table_finished(result)
+
+                print("-> Run app.py with --resume to continue with the tables left.")
+                raise
+    finally:
+        shutdown_compare_processes()
+        dispose_engines()
+
+    print(f"-> All tables [{no_tables}] have been processed.")
+
+    # Wait for the output files still being written. A table whose file
+    # couldn't be written is now an error.
+    wait_for_outputs()
+
+    for result in table_results:
+        if result.status == ERROR:
+            mark_table_finished(result)
+
+    update_table_metrics(table_results)
+
+    results += table_results
+
+    run_metrics.stop()
+    metrics_file = write_run_metrics(results, run_metrics)
 
     print("-> Data validation completed.")
     data_validation_report_dir = f"{root_dir}/data_validation_reports"
@@ -147,19 +239,35 @@ def data_validation(tables: list, src_config: dict, tgt_config: dict) -> None:
         f"{os.path.abspath(data_validation_report_dir)}"
     )
 
-    if DEBUG_DATA_VALIDATION:
+    if DEBUG_DATA_VALIDATION and WRITE_LOG_FILES:
         print(
             f"-> Column level differences have been captured @ "
             f"{os.path.abspath(log_dir)}"
         )
 
-    # Generate data to for HTML report
-    summary_rows, col_differences, counts = generate_html_data()
+    if metrics_file is not None:
+        print(f"-> Metrics of each phase have been written to {os.path.abspath(metrics_file)}")
+
+    # The HTML report is generated from the results returned by the tables,
+    # the log files are not read back.
+    results.sort(key=lambda result: (result.schema, result.table))
+    generate_data_validation_report(results, run_metrics)
 
-    if len(col_differences) > 0:
-        col_differences.sort(key=lambda entry: entry[0] + entry[1] + entry[3])
+    # Keep the column definitions read during this run for the next run.
+    save_metadata_cache()
 
-    generate_data_validation_report(summary_rows, col_differences, counts)
+    if INCREMENTAL_VALIDATION and VALIDATION_MODE != "checksum":
+        save_watermarks()
+
+
+def validate_table(validation_function, schema, table, primary_key, src_config, tgt_config):
+    """
+    Runs the validation function for a table, recording in the run manifest
+    that the table is running.
+    """
+    mark_table_running(schema, table)
+
+    return validation_function(schema, table, primary_key, src_config, tgt_config)
 
 
 def data_validation_single_table(schema, table, primary_key, src_config, tgt_config):
@@ -169,15 +277,43 @@ def data_validation_single_table(schema, table, primary_key, src_config, tgt_con
         - Connects to the source DB & extracts data.
         - Then, connects to the target DB, extracts data.
         - Compares data from both sources.
-        - Finally, writes the result to a spreadsheet.
+        - Finally, queues the result to be written to a file (OUTPUT_FORMAT).
+
+    When STREAMING_CHUNK_SIZE is set, the source data is read in chunks using a
+    server side cursor. Each chunk is looked up in the target DB, compared and
+    dropped before the next one is read. So, the memory used doesn't depend on
+    the number of records validated. The result is written to a CSV file, one
+    chunk at a time.
+
+    When TABLE_PARTITIONS is more than 1 and SAMPLING_METHOD is "first", the
+    primary key range is split into partitions that are read & compared at the
+    same time. Their results are merged into a single summary & output file.
+
+    When INCREMENTAL_VALIDATION is true, only the records changed since the
+    table's last validation are read. See watermarks.py.
+
+    When SEQUENTIAL_SAMPLING is true, the source records are read in batches of
+    growing size, until the mismatch rate of the table is known well enough.
+    See sampling.SequentialSample.
+
+    When the table doesn't have a primary key and KEYLESS_VALIDATION is true,
+    the record hashes of the whole table are compared instead. See
+    keyless_validation_single_table().
+
+    :return: A TableResult.
     """
     root_dir = get_project_root()
     log_dir = f"{root_dir}/logs"
 
+    # Tables without primary keys are validated by comparing their record hashes.
+    if len(primary_key) == 0 and KEYLESS_VALIDATION:
+        return keyless_validation_single_table(schema, table, primary_key, src_config, tgt_config)
+
     # ----------------------------------------------------------------------------------------------#
     # Generate summary file                                                                         #
     # ----------------------------------------------------------------------------------------------#
-    summary_file = open(f"{log_dir}/{schema}_{table}_data_validation_summary.log", "w")
+    summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log")
+    table_result = TableResult(schema, table)
 
     no_pk_cols = len(primary_key)
 
@@ -185,12 +321,8 @@ def data_validation_single_table(schema, table, primary_key, src_config, tgt_con
     # At this point, we are not validating tables that don't have primary keys                      #
     # ----------------------------------------------------------------------------------------------#
     if no_pk_cols == 0:
-        msg = (
-            f"{schema}~{table}~0~0~~{schema}.{table} does not have primary keys,"
-            "skipping data validation!"
-        )
-        write_log_entry(summary_file, msg, True)
-        return
+        msg = f"{schema}.{table} does not have primary keys,skipping data validation!"
+        return close_table_result(summary_file, table_result, SKIPPED, msg)
     else:
         msg = (
             f"{schema}~{table}~0~0~~:{schema}.{table} has {no_pk_cols} columns "
@@ -198,97 +330,390 @@ def data_validation_single_table(schema, table, primary_key, src_config, tgt_con
         )
         write_log_entry(summary_file, msg, False)
 
+    primary_key = [x.lower() for x in primary_key]
+
     # ----------------------------------------------------------------------------------------------#
-    # Read source table
+    # Prepare the queries to read the source table, one for each partition.                        #
     # ----------------------------------------------------------------------------------------------#
+    window = None
+    changed_only = False
+
     try:
-        source_df = read_data_from_source_db(src_config, schema, table)
+        if INCREMENTAL_VALIDATION:
+            window = get_watermark_window(src_config, schema, table)
+            changed_only = window is not None and window["start"] is not None
+
+        if changed_only:
+            source_queries = generate_changed_records_queries(
+                src_config, schema, table, primary_key, window
+            )
+
+            msg = (
+                f"{schema}~{table}~0~0~~Validating the records changed since the last run: "
+                f"{window['column']} >= {window['start']} and < {window['end']}"
+            )
+
+            if window["start_key"] is not None:
+                msg += f", after the key {window['start_key']}"
+
+            write_log_entry(summary_file, msg, False)
+        else:
+            source_queries = generate_source_queries(src_config, schema, table, primary_key)
+
+        # Random samples are kept as they are, a partition reads the first records of its range.
+        if (
+            TABLE_PARTITIONS > 1
+            and SAMPLING_METHOD == "first"
+            and len(source_queries) == 1
+            and not changed_only
+        ):
+            partition_queries = generate_partition_queries(
+                src_config, schema, table, primary_key, TABLE_PARTITIONS
+            )
+
+            if partition_queries is not None:
+                source_queries = partition_queries
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
-        msg = (
-            f"{schema}~{table}~0~0~~Error when reading data from Source table: {error}"
-        )
-        write_log_entry(summary_file, msg, True)
-        return
+        msg = f"Error when reading data from Source table: {error}"
+        return close_table_result(summary_file, table_result, ERROR, msg)
 
-    if len(source_df) == 0:
-        msg = (
-            f"{schema}~{table}~0~0~~{schema}.{table} does not have data in source DB,"
-            " skipping data validation!"
+    # ----------------------------------------------------------------------------------------------#
+    # Choose the comparison of each column, from its types in both the DBs.                        #
+    # ----------------------------------------------------------------------------------------------#
+    try:
+        comparators = build_comparators(src_config, tgt_config, schema, table)
+    except SQLAlchemyError as e:
+        error = str(e).strip("\n")
+        msg = f"{schema}~{table}~0~0~~Column types not read, values are compared as they are: {error}"
+        write_log_entry(summary_file, msg, False)
+        comparators = {}
+
+    csv_file_location = f"{root_dir}/data_validation_reports/{schema}_{table}.csv"
+
+    if STREAMING_CHUNK_SIZE and os.path.exists(csv_file_location):
+        os.remove(csv_file_location)
+
+    output = {"csv_file_location": csv_file_location, "lock": threading.Lock()}
+
+    # Shared by the partitions, they stop reading together. All the changed records are validated.
+    sample = SequentialSample(len(source_queries)) if SEQUENTIAL_SAMPLING and not changed_only else None
+
+    def validate(source_query):
+        query, params = source_query
+
+        return validate_partition(
+            schema, table, primary_key, src_config, tgt_config, query, params, output,
+            table_result.metrics, comparators, sample,
         )
-        write_log_entry(summary_file, msg, True)
-        return
+
+    if TABLE_PARTITIONS > 1 and len(source_queries) > 1:
+        with ThreadPoolExecutor(
+            max_workers=TABLE_PARTITIONS, thread_name_prefix=f"{schema}.{table}"
+        ) as executor:
+            results = list(executor.map(validate, source_queries))
     else:
+        results = [validate(source_query) for source_query in source_queries]
+
+    # ----------------------------------------------------------------------------------------------#
+    # Merge the results of the partitions.                                                         #
+    # ----------------------------------------------------------------------------------------------#
+    no_recs_validated = 0
+    no_target_recs = 0
+    no_recs_having_differences = 0
+    columns_having_differences = set()
+    formatted_dfs = []
+    last_watermark = None
+    last_key = None
+    error = None
+
+    for result in results:
+        summary_file.write(result["log"])
+
+        for differences in result["differences"]:
+            table_result.differences.extend(differences)
+
+        if result["error"] is not None:
+            error = result["error"]
+            break
+
+        no_recs_validated += result["no_recs_validated"]
+        no_target_recs += result["no_target_recs"]
+        no_recs_having_differences += result["no_recs_having_differences"]
+        columns_having_differences |= result["columns_having_differences"]
+        formatted_dfs += result["formatted_dfs"]
+
+        if result["last_watermark"] is not None:
+            last_watermark = result["last_watermark"]
+            last_key = result["last_key"]
+
+    if DEBUG_DATA_VALIDATION and WRITE_LOG_FILES:
+        write_differences_log(f"{log_dir}/{schema}_{table}_data_validation.log", table_result)
+
+    if error is not None:
+        return close_table_result(summary_file, table_result, ERROR, error)
+
+    if no_recs_validated == 0:
+        msg = f"{schema}.{table} does not have data in source DB, skipping data validation!"
+
+        if changed_only:
+            msg = "No records changed since the last run, skipping data validation!"
+            set_watermark(src_config, schema, table, window)
+
+        return close_table_result(summary_file, table_result, SKIPPED, msg)
+
+    if no_target_recs == 0:
+        msg = "No data found in target DB, skipping data validation!"
+        return close_table_result(summary_file, table_result, SKIPPED, msg)
+
+    print(
+        f"-> {schema:>30s} {table:>30s} {str(no_recs_having_differences):>10s} "
+        "differences found"
+    )
+
+    # ----------------------------------------------------------------------------------------------#
+    # Write a Summary record.
+    # ----------------------------------------------------------------------------------------------#
+    table_result.message = "NO DATA DIFFERENCES FOUND"
+
+    if no_recs_having_differences > 0:
+        table_result.status = DIFFERENCES
+        table_result.message = f"{no_recs_having_differences} records have data differences"
+
+    # Table, no. of records validated, no. of records having differences,
+    # Columns having differences
+    table_result.no_recs_validated = no_recs_validated
+    table_result.no_recs_having_differences = no_recs_having_differences
+    table_result.columns_having_differences = list(columns_having_differences)
+
+    # The changed records didn't all fit, the next run starts from the last one validated.
+    if changed_only and no_recs_validated >= DATA_VALIDATION_REC_COUNT and last_watermark is not None:
+        window = advance_window(window, last_watermark, last_key)
+
         msg = (
-            f"{schema}~{table}~0~0~~{len(source_df)} records have been fetched from "
-            "the Source table!"
+            f"{schema}~{table}~0~0~~{DATA_VALIDATION_REC_COUNT} or more records changed, the "
+            f"next run starts after {window['column']} = {window['end']}, key {window['end_key']}"
         )
         write_log_entry(summary_file, msg, False)
 
+    close_table_result(summary_file, table_result)
+
+    # The next run validates the records changed after this window.
+    if window is not None:
+        set_watermark(src_config, schema, table, window)
+
+    # The file is written by the output stage, this thread is free for the next table.
+    if not STREAMING_CHUNK_SIZE:
+        submit_output(formatted_dfs, schema, table, table_result)
+
+    return table_result
+
+
+def validate_partition(
+    schema, table, primary_key, src_config, tgt_config, query, params, output, metrics,
+    comparators, sample=None,
+):
+    """
+    Reads the source records returned by the query, fetches the matching target
+    records & compares them. Log entries are collected in memory, so that the
+    partitions of a table can run at the same time.
+
+    :param primary_key: A list of primary key column names, in lower case.
+    :param query: Query to read the source records.
+    :param params: Parameters of the query, can be None.
+    :param output: A dictionary with keys: csv_file_location & lock. In streaming
+        mode, the compared records are appended to the CSV file.
+    :param metrics: TableMetrics of the table, the phases are added to it.
+    :param comparators: A dictionary, column name -> ColumnComparator.
+    :param sample: A SequentialSample, when the records are read in batches of
+        growing size until it stops. None to read all the records of the query.
+
+    :return: A dictionary with keys:
+        - log: Summary log entries.
+        - differences: A list of DataFrames with the column differences, when
+          DEBUG_DATA_VALIDATION is true. See find_column_differences().
+        - error: The error message, when the partition couldn't be validated.
+          Otherwise, None.
+        - no_recs_validated, no_target_recs, no_recs_having_differences
+        - columns_having_differences: A set of column names.
+        - formatted_dfs: A list of DataFrames with the compared records. Empty
+          in streaming mode.
+        - last_watermark: The watermark of the last record read, when the query
+          returns it (WATERMARK_ALIAS). Otherwise, None.
+        - last_key: The primary key values of that record, a list.
+    """
+    log = io.StringIO()
+
+    result = {
+        "error": None,
+        "differences": [],
+        "no_recs_validated": 0,
+        "no_target_recs": 0,
+        "no_recs_having_differences": 0,
+        "columns_having_differences": set(),
+        "formatted_dfs": [],
+        "last_watermark": None,
+        "last_key": None,
+    }
+
+    source_dfs = []
+
+    try:
+        # ------------------------------------------------------------------------------------------#
+        # Read source table
+        # ------------------------------------------------------------------------------------------#
+        if sample is not None:
+            source_dfs = growing_batches(
+                metrics.measure_chunks(
+                    SOURCE_FETCH,
+                    read_source_query(src_config, query, params, SEQUENTIAL_FIRST_BATCH),
+                ),
+                SEQUENTIAL_FIRST_BATCH,
+            )
+        elif STREAMING_CHUNK_SIZE:
+            source_dfs = metrics.measure_chunks(
+                SOURCE_FETCH, read_source_query(src_config, query, params, STREAMING_CHUNK_SIZE)
+            )
+        else:
+            with metrics.measure(SOURCE_FETCH) as counts:
+                source_dfs = [read_source_query(src_config, query, params)]
+                counts["rows"] = len(source_dfs[0])
+                counts["bytes"] = frame_bytes(source_dfs[0])
+
+        for source_df in source_dfs:
+            # Another partition has stopped sampling.
+            if sample is not None and sample.stopped:
+                break
+
+            if len(source_df) == 0:
+                continue
+
+            # Records changed since the last run come with their watermark, in order.
+            watermark_columns = [col for col in source_df.columns if col.lower() == WATERMARK_ALIAS]
+
+            if len(watermark_columns) > 0:
+                last_record = source_df.iloc[-1]
+                columns = {col.lower(): col for col in source_df.columns}
+
+                result["last_watermark"] = last_record[watermark_columns[0]]
+                result["last_key"] = [last_record[columns[col]] for col in primary_key]
+                source_df = source_df.drop(columns=watermark_columns)
+
+            msg = (
+                f"{schema}~{table}~0~0~~{len(source_df)} records have been fetched from "
+                "the Source table!"
+            )
+            write_log_entry(log, msg, False)
+
+            (
+                formatted_df,
+                chunk_target_recs,
+                chunk_recs_having_differences,
+                chunk_columns_having_differences,
+                differences,
+            ) = compare_source_chunk(
+                source_df, schema, table, primary_key, tgt_config, log, metrics, comparators
+            )
+
+            if DEBUG_DATA_VALIDATION:
+                result["differences"].append(differences)
+
+            result["no_recs_validated"] += len(formatted_df)
+            result["no_target_recs"] += chunk_target_recs
+            result["no_recs_having_differences"] += chunk_recs_having_differences
+            result["columns_having_differences"] |= chunk_columns_having_differences
+
+            # In streaming mode, write the records as they're compared.
+            if STREAMING_CHUNK_SIZE:
+                if chunk_target_recs > 0:
+                    with output["lock"], metrics.measure(OUTPUT) as counts:
+                        csv_file_location = output["csv_file_location"]
+                        file_exists = os.path.exists(csv_file_location)
+
+                        formatted_df.to_csv(
+                            csv_file_location,
+                            mode="a" if file_exists else "w",
+                            header=not file_exists,
+                            index=False,
+                        )
+                        counts["rows"] = len(formatted_df)
+            else:
+                result["formatted_dfs"].append(formatted_df)
+
+            # Sequential sampling: stop reading, once the mismatch rate is known well enough.
+            if sample is not None:
+                reason = sample.add(len(formatted_df), chunk_recs_having_differences)
+
+                if reason is not None:
+                    write_log_entry(log, f"{schema}~{table}~0~0~~Sampling stopped: {reason}.", False)
+
+                if sample.stopped:
+                    break
+
+    except SQLAlchemyError as e:
+        error = str(e.__dict__["orig"])
+        result["error"] = f"Error when reading data from Source table: {error}"
+    except ValidationError as err:
+        result["error"] = str(err)
+    finally:
+        # Stop reading the source table, if it hasn't been read fully.
+        if hasattr(source_dfs, "close"):
+            source_dfs.close()
+
+    result["log"] = log.getvalue()
+
+    return result
+
+
+def compare_source_chunk(
+    source_df, schema, table, primary_key, tgt_config, summary_file, metrics, comparators
+):
+    """
+    Fetches the target records for the given source records & compares them.
+
+    :param source_df: Source records.
+    :param primary_key: A list of primary key column names, in lower case.
+    :param metrics: TableMetrics of the table, the phases are added to it.
+    :param comparators: A dictionary, column name -> ColumnComparator.
+
+    :raises ValidationError: When the records can't be compared.
+
+    :return: A tuple:
+            - Source & Target records, with the result of the comparison.
+            - No. of records fetched from the Target table.
+            - No. of records having differences.
+            - A set of column names having differences.
+            - A DataFrame with the column differences.
+    """
     # ----------------------------------------------------------------------------------------------#
     # Step 4: Capture the primary key data.
     # ----------------------------------------------------------------------------------------------#
     try:
-        primary_key = [x.lower() for x in primary_key]
-
         # Converting the column names to lower case.
         columns = source_df.columns
         new_columns = []
         [new_columns.append(col.lower()) for col in columns]
         source_df.columns = new_columns
 
-        pk_values = source_df[primary_key].values.tolist()
-    
+        pk_values = source_df[primary_key].astype(object).values.tolist()
+
         msg = f"{schema}~{table}~0~0~~Primary Key data has been captured from Source table DataFrame"
         write_log_entry(summary_file, msg, False)
     except Exception as err:
         err_str = str(err)
-        msg = f"{schema}~{table}~0~0~~Error identifying primary key data from Source table. {err_str}"
-        write_log_entry(summary_file, msg, True)
-        return
+        raise ValidationError(f"Error identifying primary key data from Source table. {err_str}")
 
     # ----------------------------------------------------------------------------------------------#
     # Step 5: Prepare a query to fetch the data from target DB.
     # ----------------------------------------------------------------------------------------------#
-    query = "WITH temp AS ("
-    for index, sample_pk_value in enumerate(pk_values):
-        if index > 0:
-            query += " UNION "
-
-        # If it is a composite primary key, after zipping, the value looks like
-        # this:  [ (c1, v1), (c2, v2), (c3, v3) ]
-        sinle_pk_entry = zip(primary_key, sample_pk_value)
-        q = "SELECT "
-        i = 0
-        for col in sinle_pk_entry:
-            i += 1
-            k, v = col[0], col[1]
-
-            if i > 1:
-                q += ", "
-
-            if type(v) == str:
-                q += f"'{v}' AS {k}"
-
-            elif isinstance(v, datetime.date):
-                q += f"TO_DATE('{v}', 'YYYY-MM-DD') AS {k}"
-            else:
-                q += f"{v} AS {k}"
-
-        query += q
-
-    query += ") "
-    query += f"SELECT a.* FROM {schema}.{table} a, temp WHERE "
-
-    for i in range(no_pk_cols):
-        if i > 0:
-            query += " AND "
-
-        query += f"a.{primary_key[i]} = temp.{primary_key[i]}"
+    queries = generate_target_lookup_queries(
+        tgt_config["db_engine"], schema, table, primary_key, pk_values
+    )
 
     msg = (
-        f"{schema}~{table}~0~0~~Query generated to execute on Target DB.\n"
-        f"{format_sql(query)}"
+        f"{schema}~{table}~0~0~~Query generated to execute on Target DB. It is "
+        f"executed {len(queries)} time(s), once for each chunk of primary key values.\n"
+        f"{format_query(queries[0][0])}"
     )
     write_log_entry(summary_file, msg, False)
 
@@ -296,25 +721,25 @@ def data_validation_single_table(schema, table, primary_key, src_config, tgt_con
     # Step 6: Get data from target table using the primary key data.                                #
     # ----------------------------------------------------------------------------------------------#
     try:
-        target_df = read_data_from_target_db(tgt_config, query)
+        with metrics.measure(TARGET_FETCH) as counts:
+            target_dfs = [
+                read_data_from_target_db(tgt_config, query, params)
+                for query, params in queries
+            ]
+            target_df = pd.concat(target_dfs, ignore_index=True)
+            counts["rows"] = len(target_df)
+            counts["bytes"] = frame_bytes(target_df)
     except SQLAlchemyError as e:
         error = str(e.__dict__["orig"])
         error = error.strip("\n")
         write_log_entry(summary_file, error, False)
-        msg = f"{schema}~{table}~0~0~~Error when executing the query on Target DB."
-        write_log_entry(summary_file, msg, True)
-        return
-
-    if len(target_df) == 0:
-        msg = f"{schema}~{table}~0~0~~No data found in target DB, skipping data validation!"
-        write_log_entry(summary_file, msg, True)
-        return
-    else:
-        msg = (
-            f"{schema}~{table}~0~0~~{len(target_df)} records have been fetched from the"
-            "Target table!"
-        )
-        write_log_entry(summary_file, msg, False)
+        raise ValidationError("Error when executing the query on Target DB.")
+
+    msg = (
+        f"{schema}~{table}~0~0~~{len(target_df)} records have been fetched from the"
+        "Target table!"
+    )
+    write_log_entry(summary_file, msg, False)
 
     # ----------------------------------------------------------------------------------------------#
     # Step 7: Compare the data between source & target tables.  We're going to combine              #
@@ -331,437 +756,241 @@ def data_validation_single_table(schema, table, primary_key, src_config, tgt_con
         target_table_pk = []
         [target_table_pk.append("tgt_" + col.lower()) for col in primary_key]
 
-        combined_df = pd.merge(
-            source_df,
-            target_df,
-            how="left",
-            left_on=primary_key,
-            right_on=target_table_pk,
-        )
-
-        combined_df = combined_df.replace({np.nan: None})
-
-        # Now that, we have Source & Target DB data in a single Dataframe
-        # Compare the records and check if they're same or not.
-        formatted_df = compare_data(
-            combined_df, schema, table, columns, primary_key, summary_file
-        )
+        # CPU bound, sent to a compare process when COMPARE_PROCESSES is set.
+        if compare_processes_enabled():
+            compared = run_in_compare_process(
+                merge_and_compare, source_df, target_df, columns, primary_key, target_table_pk,
+                comparators,
+            )
+        else:
+            compared = merge_and_compare(
+                source_df, target_df, columns, primary_key, target_table_pk, comparators
+            )
 
-        excel_file_location = (
-            f"{root_dir}/data_validation_reports/{schema}_{table}.xlsx"
+        formatted_df, no_recs_having_differences, columns_having_differences, differences, phases = (
+            compared
         )
 
-        formatted_df.to_excel(
-            excel_file_location, sheet_name=f"{schema}_{table}", index=False
-        )
+        for phase, entry in phases.items():
+            metrics.add(phase, **entry)
+    except ValidationError:
+        raise
     except Exception as err:
         error = str(err).strip("\n")
-        msg = (
-            f"{schema}~{table}~0~0~~Error when comparing Source & Target Table. {error}"
-        )
-        write_log_entry(summary_file, msg, True)
-        return
+        raise ValidationError(f"Error when comparing Source & Target Table. {error}")
+
+    return (
+        formatted_df,
+        len(target_df),
+        no_recs_having_differences,
+        columns_having_differences,
+        differences,
+    )
 
 
-def compare_data(df, schema, table, columns, primary_key, summary_file):
-    """
-    Source & Target data is present in same DF. Compare individual columns.
+def merge_and_compare(source_df, target_df, columns, primary_key, target_table_pk, comparators):
     """
-    no_cols_to_compare = len(columns)
-    differences = {}
-    no_recs_having_differences = 0
-
-    primary_key_indexes = []
-
-    # ----------------------------------------------------------------------------------------------#
-    # We know the Primary key column names, But, What we need is their
-    # Indices in the column list.
-    # ----------------------------------------------------------------------------------------------#
-    for k in primary_key:
-        i = columns.tolist().index(k)
-        primary_key_indexes.append(i)
+    Merges the Source & Target records on the primary key & compares them. Runs
+    in a compare process when COMPARE_PROCESSES is set, so it only takes &
+    returns values that can be pickled.
 
-    formatted_recs = []
-    columns_having_differences = set()
+    :param target_table_pk: The primary key column names of target_df.
+    :param comparators: A dictionary, column name -> ColumnComparator.
 
-    # ----------------------------------------------------------------------------------------------#
-    # Loop through each row in the Dataframe.
-    # ----------------------------------------------------------------------------------------------#
-    try:
-        for index, rec in enumerate(df.values.tolist()):
-            no_cols_having_differences = 0
-            pk = ""
+    :raises ValidationError: When the columns can't be compared.
 
-            for i in primary_key_indexes:
-                pk += f"{columns[i]} = {rec[i]}"
+    :return: A tuple: the values returned by compare_data(), and the phases
+        measured, as in TableMetrics.phases.
+    """
+    metrics = TableMetrics()
 
-            decision = "MATCH"
+    with metrics.measure(MERGE) as counts:
+        combined_df = pd.merge(
+            source_df,
+            target_df,
+            how="left",
+            left_on=primary_key,
+            right_on=target_table_pk,
+        )
 
-            # --------------------------------------------------------------------------------------#
-            # Compare all the columns in the record.
-            # --------------------------------------------------------------------------------------#
-            for i in range(no_cols_to_compare):
-                source_cell = rec[i]
-                target_cell = rec[i + no_cols_to_compare]
+        combined_df = combined_df.replace({np.nan: None})
+        counts["rows"] = len(combined_df)
 
-                try:
-                    if (
-                        (source_cell is None and target_cell is not None)
-                        or (source_cell is not None and target_cell is None)
-                        or (
-                            source_cell is not None
-                            and target_cell is not None
-                            and source_cell != target_cell
-                        )
-                    ):
-                        no_cols_having_differences += 1
-
-                        if index not in differences.keys():
-                            differences[index] = []
-
-                        differences[index].append(
-                            {
-                                "primary_key": pk,
-                                "column": columns[i],
-                                "source_value": source_cell,
-                                "target_value": target_cell,
-                                "message": "",
-                            }
-                        )
+    # Now that, we have Source & Target DB data in a single Dataframe
+    # Compare the records and check if they're same or not.
+    with metrics.measure(COMPARE) as counts:
+        formatted_df, no_recs_having_differences, columns_having_differences, differences = (
+            compare_data(combined_df, columns, primary_key, comparators)
+        )
+        counts["rows"] = len(combined_df)
+
+    return (
+        formatted_df,
+        no_recs_having_differences,
+        columns_having_differences,
+        differences,
+        metrics.to_dict()["phases"],
+    )
 
-                        # Store the column that has difference
-                        columns_having_differences.add(columns[i])
-                        decision = "NO MATCH"
-                except Exception as err:
-                    no_cols_having_differences += 1
-
-                    if index not in differences.keys():
-                        differences[index] = []
-
-                    differences[index].append(
-                        {
-                            "primary_key": pk,
-                            "column": columns[i],
-                            "source_value": source_cell,
-                            "target_value": target_cell,
-                            "message": str(err),
-                        }
-                    )
 
-                    columns_having_differences.add(columns[i])
-                    decision = "NO MATCH"
+def compare_data(df, columns, primary_key, comparators):
+    """
+    Source & Target data is present in same DF. Compare individual columns.
 
-            # --------------------------------------------------------------------------------------#
-            # If there are differences in a record, increment the counter.
-            # --------------------------------------------------------------------------------------#
-            if no_cols_having_differences > 0:
-                no_recs_having_differences += 1
+    :raises ValidationError: When the columns can't be compared.
 
-            rec.append(decision)
-            formatted_recs.append(rec)
+    :return: A tuple:
+        - The DataFrame, with a new column "result" (MATCH / NO MATCH)
+        - No. of records having differences.
+        - A set of column names having differences.
+        - A DataFrame with the column differences. See find_column_differences().
+    """
+    try:
+        mismatched_rows, differences, columns_having_differences = find_column_differences(
+            df, columns, primary_key, comparators
+        )
     except Exception as err:
         error = str(err)
-        msg = f"{schema}~{table}~0~0~~Error when comparing data. {error}"
-        write_log_entry(summary_file, msg, True)
-        return
+        raise ValidationError(f"Error when comparing data. {error}")
+
+    no_recs_having_differences = int(mismatched_rows.sum())
 
     # --------------------------------------------------------------------------------------#
     # Create a new dataframe from the old DataFrame. Only difference is that
     # a new column "result" is added.
     # --------------------------------------------------------------------------------------#
-    formatted_df_cols = df.columns.tolist()
-    formatted_df_cols.append("result")
-    formatted_df = pd.DataFrame(formatted_recs, columns=formatted_df_cols)
-
-    print(
-        f"-> {schema:>30s} {table:>30s} {str(no_recs_having_differences):>10s} "
-        "differences found"
-    )
-
-    # --------------------------------------------------------------------------------------#
-    # Write a Summary record.
-    # --------------------------------------------------------------------------------------#
-    msg = "NO DATA DIFFERENCES FOUND"
-
-    if no_recs_having_differences > 0:
-        msg = f"{no_recs_having_differences} records have data differences"
-
-    # Table, no. of records validated, no. of records having differences,
-    # Columns having differences
-    line1 = (
-        f"{schema}~"
-        f"{table}~"
-        f"{len(df)}~"
-        f"{no_recs_having_differences}~"
-        f"{','.join(list(columns_having_differences))}~"
-        f"{msg}"
+    formatted_df = df.copy()
+    formatted_df.insert(
+        len(formatted_df.columns),
+        "result",
+        np.where(mismatched_rows, "NO MATCH", "MATCH"),
+        allow_duplicates=True,
     )
-    write_log_entry(summary_file, line1, True)
 
-    # --------------------------------------------------------------------------------------#
-    # Write Column differences
-    # --------------------------------------------------------------------------------------#
-    if DEBUG_DATA_VALIDATION:
-        root_dir = get_project_root()
-        log_dir = f"{root_dir}/logs"
-
-        log_file = open(f"{log_dir}/{schema}_{table}_data_validation.log", "w")
-
-        for row_no, col_diff_list in differences.items():
-            col_diff_list.sort(key=lambda x: x["column"])
-
-            for col_diff in col_diff_list:
-                pk_data = col_diff_list[0]["primary_key"]
-                col_name = col_diff["column"]
-                src_value = str(col_diff["source_value"])
-                tgt_value = str(col_diff["target_value"])
-                msg = col_diff["message"]
-
-                log_file.write(
-                    f"{schema}~{table}~{pk_data}~{col_name}~{src_value}~{tgt_value}~{msg}\n"
-                )
-
-        log_file.close()
-
-    return formatted_df
+    return formatted_df, no_recs_having_differences, columns_having_differences, differences
 
 
-def generate_db_specific_inline_view(db_engine, tables):
+def find_column_differences(df, columns, primary_key, comparators):
     """
-
-    :param db_engine: Specifies a database engine (Oracle, PostgreSQL, etc.)
-    :param tables: A list of tables to be included in the inline view. Each table is a map
-    with the following keys: schema, table.
-
-    :return: A string containing the inline view.
+    Compares the Source & Target columns of a combined DataFrame, one column at a
+    time. The first len(columns) columns of the DataFrame are the Source columns,
+    the next len(columns) columns are the matching Target columns.
+
+    :param df: DataFrame having both Source & Target data.
+    :param columns: Column names of the table.
+    :param primary_key: A list of primary key column names.
+    :param comparators: A dictionary, column name -> ColumnComparator. Columns
+        not in it are compared as they are.
+
+    :return: A tuple with three elements:
+        - A boolean numpy array, True for the records having differences.
+        - A DataFrame with one row per column difference. Columns: row,
+          primary_key, column, source_value, target_value, message.
+        - A set of column names having differences.
     """
-    inline_view = ""
-
-    for index, table in enumerate(tables):
-        if index > 0:
-            inline_view += " UNION "
-
-        if db_engine in ORACLE:
-            inline_view += f"SELECT '{table['schema']}' AS owner, '{table['table']}' AS table_name FROM DUAL "
-        elif db_engine in POSTGRES:
-            inline_view += f"SELECT '{table['schema']}' AS owner, '{table['table']}' AS table_name "
-        elif db_engine in SQLSERVER:
-            inline_view += f"SELECT '{table['schema']}' AS schema_name, '{table['table']}' AS table_name "
-
-    return inline_view
-
-
-def fetch_primary_key_column_names(src_config, tables):
-    """
-    Identify primary key column names from the Source DB.
+    no_cols_to_compare = len(columns)
+    no_recs = len(df)
 
-    :param src_config: A dictionary containing the Source DB connection details.
-    :param tables: A list of tables to be validated
+    # ----------------------------------------------------------------------------------------------#
+    # We know the Primary key column names, But, What we need is their
+    # Indices in the column list.
+    # ----------------------------------------------------------------------------------------------#
+    primary_key_indexes = [columns.tolist().index(k) for k in primary_key]
 
-    :return: A Pandas DataFrame containing the primary key column names.
-    """
-    db_engine = src_config["db_engine"]
-    primary_keys_query = ""
+    mismatched_rows = np.zeros(no_recs, dtype=bool)
+    columns_having_differences = set()
+    column_differences = []
+    pk_data = None
+
+    for i in range(no_cols_to_compare):
+        source_col = df.iloc[:, i]
+        target_col = df.iloc[:, i + no_cols_to_compare]
+
+        comparator = comparators.get(columns[i]) or ColumnComparator()
+        mask, messages = comparator.mismatch_mask(source_col, target_col)
+
+        if not mask.any():
+            continue
+
+        # Primary key data is needed only for the records having differences,
+        # compute it the first time a difference is found.
+        if pk_data is None:
+            pk_data = pd.Series([""] * no_recs, index=df.index, dtype=object)
+
+            for k in primary_key_indexes:
+                pk_data = pk_data + f"{columns[k]} = " + df.iloc[:, k].astype(str)
+
+        rows = np.flatnonzero(mask)
+        mismatched_rows[rows] = True
+        columns_having_differences.add(columns[i])
+
+        column_differences.append(
+            pd.DataFrame(
+                {
+                    "row": rows,
+                    "primary_key": pk_data.to_numpy()[rows],
+                    "column": columns[i],
+                    "source_value": source_col.to_numpy()[rows],
+                    "target_value": target_col.to_numpy()[rows],
+                    "message": [messages.get(row, "") for row in rows],
+                }
+            )
+        )
 
-    if db_engine in ORACLE:
-        primary_keys_query = oracle_queries["get_primary_key"]
-    elif db_engine in SQLSERVER:
-        primary_keys_query = sqlserver_queries["get_primary_key"]
+    if len(column_differences) > 0:
+        differences = pd.concat(column_differences, ignore_index=True)
+        differences = differences.sort_values(
+            ["row", "column"], kind="stable", ignore_index=True
+        )
     else:
-        print(f"{db_engine} IS NOT SUPPORTED AS SOURCE DB AT THE MOMENT")
-        sys.exit(1)
+        differences = pd.DataFrame(
+            columns=[
+                "row",
+                "primary_key",
+                "column",
+                "source_value",
+                "target_value",
+                "message",
+            ]
+        )
 
-    inline_view = generate_db_specific_inline_view(db_engine, tables)
-    query = primary_keys_query.replace("<temp_placeholder>", inline_view)
+    return mismatched_rows, differences, columns_having_differences
 
-    # Execute the query
-    try:
-        if db_engine in ORACLE:
-            df = oracle_table_to_df(src_config, query, None)
-        elif db_engine in SQLSERVER:
-            df = sqlserver_table_to_df(src_config, query, None)
 
-        return df
-    except SQLAlchemyError as e:
-        error = str(e.__dict__["orig"])
-        print(f"-> Unable to fetch primary key column names: {error}")
-        print(f"-> This is the query used to find primary key columns: \n{query}")
-        sys.exit(1)
-
-
-def read_data_from_source_db(src_config, schema, table):
-    """
-    Read Data from Source Database. It could be Oracle, SQL Server or Postgress
-    at the moment.
+def read_source_query(src_config, query, params, chunksize=None):
     """
-    db_engine = src_config["db_engine"]
+    Executes a query on the Source Database.
 
-    # Oracle
-    if db_engine in ORACLE:
-        try:
-            query = f"SELECT * FROM {schema}.{table} WHERE ROWNUM < {DATA_VALIDATION_REC_COUNT}"
-            source_df = oracle_table_to_df(src_config, query, None)
-
-            return source_df
-        except SQLAlchemyError as e:
-            raise e
-
-    # SQL Server
-    if db_engine in SQLSERVER:
-        try:
-            query = f"SELECT TOP {DATA_VALIDATION_REC_COUNT} * FROM {schema}.{table}"
-            source_df = sqlserver_table_to_df(src_config, query, None)
-
-            return source_df
-        except SQLAlchemyError as e:
-            raise e
-
-    # Postgres
-    if db_engine in POSTGRES:
-        try:
-            query = f"SELECT * FROM {schema}.{table} LIMIT {DATA_VALIDATION_REC_COUNT}"
-            source_df = postgres_table_to_df(src_config, query, None)
+    :param chunksize: When set, returns an iterator of DataFrames, each having
+        up to chunksize records, read using a server side cursor.
+    """
+    if chunksize:
+        return table_to_df_chunks(src_config, query, params, chunksize)
 
-            return source_df
-        except SQLAlchemyError as e:
-            raise e
+    return table_to_df(src_config, query, params)
 
 
-def read_data_from_target_db(tgt_config, query):
-    """ """
-    db_engine = tgt_config["db_engine"]
+def read_data_from_target_db(tgt_config, query, params=None):
+    """
+    Executes a query on the Target Database & returns the result as a DataFrame.
 
+    :param tgt_config: A dictionary containing the Target DB connection details.
+    :param query: SQL query to be executed.
+    :param params: Bind parameters, if any.
+    """
     try:
-        if db_engine in POSTGRES:
-            target_df = postgres_table_to_df(tgt_config, query, None)
-            return target_df
-        elif db_engine in SQLSERVER:
-            target_df = sqlserver_table_to_df(tgt_config, query, None)
-            return target_df
-        elif db_engine in ORACLE:
-            target_df = oracle_table_to_df(tgt_config, query, None)
-            return target_df
+        target_df = table_to_df(tgt_config, query, params)
+        return target_df
 
     except SQLAlchemyError as e:
         raise e
 
 
-def write_log_entry(file, entry, close_file):
-    """ """
-    file.write(entry + "\n")
-
-    if close_file:
-        file.close()
-
-
-def generate_html_data():
+def format_query(query):
     """
-    Reads the log files and generates the data for HTML report.
-
-    Two types of log files are present:
-        1. The summary log files
-        2. The column level differences log files
-
-    The summary log files contain the summary of the data validation.
-
-    The column level differences log files show the Source data, Target data, primary key
-    of a record if any differences are found.
-
-    Returns:
-        Two lists.
+    Formats a query for the log. sql_formatter is imported here, as it's needed
+    only when a table is validated.
     """
-    # Summary log files
-    summary_rows = []
-    col_differences = []
-
-    total_tables = 0
-    skip_tables = 0
-    error_tables = 0
-    complete_match_tables = 0
-    tables_with_differences = 0
-    cols_with_differences = 0
-
-    # From summary files, pick the last record. It tells the summary:
-    #       - The number of records compared
-    #       - Difference in number of records
-    #       - Column names, etc.
-    root_dir = get_project_root()
-    log_dir = f"{root_dir}/logs"
+    from sql_formatter.core import format_sql
 
-    for file in os.listdir(log_dir):
-        file_full_path = os.path.join(log_dir, file)
-
-        if "summary" in file:
-            with open(file_full_path, "r") as f:
-                lines = f.readlines()
-
-                if len(lines) == 0:
-                    print(f"Summary file {file_full_path} is empty.")
-                else:
-                    trailor_record = lines[-1].strip("\n")
-
-                    try:
-                        (
-                            sch,
-                            tbl,
-                            no_records_validated,
-                            no_records_differences,
-                            columns,
-                            msg,
-                        ) = trailor_record.split("~")
-
-                        summary_rows.append(
-                            [
-                                sch,
-                                tbl,
-                                no_records_validated,
-                                no_records_differences,
-                                columns,
-                                msg,
-                            ]
-                        )
-                    except Exception as error:
-                        print(f"Error in parsing summary file {file_full_path}")
-                        print(f"Error: {error}")
-                        print(f"Trailor record: {trailor_record}")
-
-                total_tables += 1
-
-                if msg == "NO DATA DIFFERENCES FOUND":
-                    complete_match_tables += 1
-                elif "records have data differences" in msg:
-                    tables_with_differences += 1
-                elif "skip" in msg.lower():
-                    skip_tables += 1
-                elif "error" in msg.lower():
-                    error_tables += 1
-
-        # Each record of the column differences has this format:
-        # Schema, Table, Primary Key, column name, Source value, Target value.
-        elif "data_validation" in file and "summary" not in file:
-            with open(file_full_path, "r") as f:
-                lines = f.readlines()
-
-                for line in lines:
-                    if len(line.strip()) == 0:
-                        continue
-                    try:
-                        sch, tbl, pk, col, src, tgt, msg = line.split("~")
-                        sch = sch.strip()
-                        tbl = tbl.strip()
-                        pk = pk.strip()
-                        col = col.strip()
-
-                        col_differences.append([sch, tbl, pk, col, src, tgt, msg])
-                    except Exception as err:
-                        print("Error @ generate_html_data() while processing {line}")
-                        print(err)
-
-    counts = {}
-    counts["total_tables"] = total_tables
-    counts["skip_tables"] = skip_tables
-    counts["error_tables"] = error_tables
-    counts["complete_match_tables"] = complete_match_tables
-    counts["tables_with_differences"] = tables_with_differences
-
-    return (summary_rows, col_differences, counts)
+    return format_sql(str(query))
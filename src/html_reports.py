@@ -1,6 +1,12 @@
+import json
 import os
 from cgitb import html
+from html import escape
 
+from settings import HTML_REPORT_CHUNK_SIZE, HTML_REPORT_MODE, METRICS_SLOWEST_TABLES
+
+from .metrics import PHASES
+from .results import DIFFERENCES, ERROR, MATCH, SKIPPED
 from .utils import get_current_time, get_project_root
 
 
@@ -55,32 +61,41 @@ def generate_table_metadata_compare_report(df, src_db_config, tgt_db_config):
     print(f"-> HTML report generated: {os.path.abspath(html_report)}")
 
 
-def generate_data_validation_report(summary_rows, col_differences, counts):
+def generate_data_validation_report(results, run_metrics=None):
     """
     Writes a HTML report for Data validation.
 
-    :param summary_rows: List of Lists
-    :param col_differences: List of Lists
-    :param counts: A dictionary containing the counts of the differences.
+    The report is written to the file piece by piece. With HTML_REPORT_MODE
+    "paged", the column differences are written to files next to the report,
+    HTML_REPORT_CHUNK_SIZE differences each, and the report loads them when a
+    table is selected.
+
+    :param results: A list of TableResult, one for each table validated.
+    :param run_metrics: TableMetrics of the phases run once for all the tables.
 
     :return: None
     """
     root_dir = get_project_root()
 
+    counts = {}
+    counts["total_tables"] = len(results)
+    counts["skip_tables"] = len([r for r in results if r.status == SKIPPED])
+    counts["error_tables"] = len([r for r in results if r.status == ERROR])
+    counts["complete_match_tables"] = len([r for r in results if r.status == MATCH])
+    counts["tables_with_differences"] = len([r for r in results if r.status == DIFFERENCES])
+
     # ---------------------------------------------------------------------------------------------#
     # Process summary rows
     # ---------------------------------------------------------------------------------------------#
-    html_summary_table_data = ""
-
-    for row in summary_rows:
-        (schema, table, no_records_validated, no_records_differences, columns, msg,) = (
-            row[0],
-            row[1],
-            row[2],
-            row[3],
-            row[4],
-            row[5],
-        )
+    html_summary_table_data = []
+
+    for result in results:
+        schema = result.schema
+        table = result.table
+        no_records_validated = result.no_recs_validated
+        no_records_differences = result.no_recs_having_differences
+        columns = result.columns_having_differences
+        msg = result.message
 
         html_row = "<tr>"
         html_row += f"<td>{schema}</td>"
@@ -89,10 +104,10 @@ def generate_data_validation_report(summary_rows, col_differences, counts):
         html_row += f"<td>{no_records_differences}</td>"
 
         # If there are no differences, this attribute can be empty.
-        if len(columns.strip()) > 0:
+        if len(columns) > 0:
             ul = "<ul>"
 
-            for col in columns.split(","):
+            for col in columns:
                 ul += f"<li>{col}</li>"
 
             ul += "</ul>"
@@ -103,7 +118,7 @@ def generate_data_validation_report(summary_rows, col_differences, counts):
 
         # Append message.
         # Identify appropriate color class for the message.
-        if "no data differences found" in msg.lower():
+        if result.status == MATCH:
             html_row += f"<td class='bg-success text-light'>{msg}</td>"
         elif "no data found" in msg.lower():
             html_row += f"<td class='bg-info'>{msg}</td>"
@@ -111,15 +126,11 @@ def generate_data_validation_report(summary_rows, col_differences, counts):
             html_row += f"<td class='bg-warning'>{msg}</td>"
 
         html_row += "</tr>"
-        html_summary_table_data += html_row
-
-    # ----------------------------------------------------------------------------------------------#
-    # Now, Process column level differences.
-    # ----------------------------------------------------------------------------------------------#
-    html_col_diff_data = generate_html_table_rows(col_differences)
+        html_summary_table_data.append(html_row)
 
     # ----------------------------------------------------------------------------------------------#
     # Read HTML template for this report. Replace the placeholders with data.
+    # The column differences can be large, they're written to the file later.
     # ----------------------------------------------------------------------------------------------#
     html_template = ""
     template_path = os.path.join(root_dir, "src", "html", "layout_2.html")
@@ -127,33 +138,39 @@ def generate_data_validation_report(summary_rows, col_differences, counts):
     with open(template_path) as template:
         html_template = template.read()
 
-    # Replace the table data in the HTML template.
     html_template = html_template.replace(
-        "summary_placeholder_data", html_summary_table_data
+        "total_tables_validated_count", str(counts["total_tables"])
     )
 
     html_template = html_template.replace(
-        "column_differences_placeholder_data", html_col_diff_data
+        "complete_match_tables_count", str(counts["complete_match_tables"])
     )
 
     html_template = html_template.replace(
-        "total_tables_validated_count", str(counts["total_tables"])
+        "tables_with_differences_count", str(counts["tables_with_differences"])
     )
 
     html_template = html_template.replace(
-        "complete_match_tables_count", str(counts["complete_match_tables"])
+        "skip_tables_count", str(counts["skip_tables"])
     )
 
     html_template = html_template.replace(
-        "tables_with_differences_count", str(counts["tables_with_differences"])
+        "error_tables_count", str(counts["error_tables"])
     )
 
+    # Replace the table data in the HTML template.
     html_template = html_template.replace(
-        "skip_tables_count", str(counts["skip_tables"])
+        "summary_placeholder_data", "".join(html_summary_table_data)
+    )
+
+    slowest_tables, slowest_phases = performance_rows(results, run_metrics)
+
+    html_template = html_template.replace(
+        "slowest_tables_placeholder_data", generate_html_table_rows(slowest_tables)
     )
 
     html_template = html_template.replace(
-        "error_tables_count", str(counts["error_tables"])
+        "slowest_phases_placeholder_data", generate_html_table_rows(slowest_phases)
     )
 
     current_time = get_current_time()
@@ -165,18 +182,163 @@ def generate_data_validation_report(summary_rows, col_differences, counts):
         f"data_validation_report_{current_time}.html",
     )
 
+    head, tail = html_template.split("column_differences_placeholder_data")
+    differences_loader = ""
+
     with open(html_report, "w") as report:
-        report.write(html_template)
+        report.write(head)
+
+        # ------------------------------------------------------------------------------------------#
+        # Now, Process column level differences, sorted by column within each table.
+        # ------------------------------------------------------------------------------------------#
+        if HTML_REPORT_MODE == "paged":
+            differences_loader = write_differences_files(results, html_report)
+        else:
+            for result in results:
+                for rows in table_differences(result):
+                    report.write(generate_html_table_rows(rows))
+
+        report.write(tail.replace("column_differences_loader_placeholder", differences_loader))
 
     print(f"-> HTML report generated: {os.path.abspath(html_report)}")
 
 
+def performance_rows(results, run_metrics):
+    """
+    Returns the rows of the Performance section of the report:
+        - The METRICS_SLOWEST_TABLES slowest tables: schema, table, seconds,
+          no. of records validated & the slowest phase.
+        - The phases, slowest first, with their time added up over all the
+          tables: phase, seconds, % of the time, records, MB.
+    """
+    slowest_tables = []
+
+    for result in sorted(results, key=lambda r: r.metrics.seconds, reverse=True)[
+        :METRICS_SLOWEST_TABLES
+    ]:
+        phase = result.metrics.slowest_phase()
+        phase_seconds = result.metrics.phases[phase]["seconds"] if phase is not None else 0
+
+        slowest_tables.append(
+            [
+                result.schema,
+                result.table,
+                f"{result.metrics.seconds:.3f}",
+                result.no_recs_validated,
+                f"{phase} ({phase_seconds:.3f}s)" if phase is not None else "",
+            ]
+        )
+
+    phases = {}
+    all_metrics = [result.metrics for result in results]
+
+    if run_metrics is not None:
+        all_metrics.append(run_metrics)
+
+    for metrics in all_metrics:
+        for phase, entry in metrics.to_dict()["phases"].items():
+            total = phases.setdefault(phase, {"seconds": 0.0, "rows": 0, "bytes": 0})
+            total["seconds"] += entry["seconds"]
+            total["rows"] += entry["rows"]
+            total["bytes"] += entry["bytes"]
+
+    total_seconds = sum(total["seconds"] for total in phases.values())
+    slowest_phases = []
+
+    for phase in sorted(phases, key=lambda p: (-phases[p]["seconds"], PHASES.index(p))):
+        total = phases[phase]
+
+        slowest_phases.append(
+            [
+                phase,
+                f"{total['seconds']:.3f}",
+                f"{100 * total['seconds'] / total_seconds:.1f}" if total_seconds > 0 else "",
+                total["rows"],
+                f"{total['bytes'] / 1024 / 1024:.1f}",
+            ]
+        )
+
+    return slowest_tables, slowest_phases
+
+
+def table_differences(result):
+    """
+    Yields the column differences of a table, sorted by column, as lists of
+    rows: schema, table, primary key, column, source value, target value,
+    message. Each list has up to HTML_REPORT_CHUNK_SIZE rows.
+    """
+    if len(result.differences) == 0:
+        return
+
+    differences = result.differences.to_frame()
+    differences = differences.sort_values("column", kind="stable")
+
+    for start in range(0, len(differences), HTML_REPORT_CHUNK_SIZE):
+        chunk = differences.iloc[start : start + HTML_REPORT_CHUNK_SIZE]
+
+        yield [
+            [result.schema, result.table] + list(row)
+            for row in chunk.itertuples(index=False, name=None)
+        ]
+
+
+def write_differences_files(results, html_report):
+    """
+    Writes the column differences of the tables to a folder next to the
+    report, HTML_REPORT_CHUNK_SIZE differences in each file.
+
+    Each file holds a JSON array of rows (primary key, column, source value,
+    target value, message), wrapped in a call to loadDifferences(). Browsers
+    don't let a page opened from the disk fetch() a JSON file, but it can load
+    a script.
+
+    :return: The script that loads the files, for the report.
+    """
+    files_dir = os.path.splitext(html_report)[0] + "_files"
+    files_dir_name = os.path.basename(files_dir)
+
+    if not os.path.exists(files_dir):
+        os.mkdir(files_dir)
+
+    differences_index = {}
+
+    for result in results:
+        key = f"{result.schema}.{result.table}"
+        files = []
+
+        for index, rows in enumerate(table_differences(result)):
+            file_name = f"{result.schema}_{result.table}_{index}.js"
+            rows = [[escape(str(cell)) for cell in row[2:]] for row in rows]
+
+            with open(os.path.join(files_dir, file_name), "w") as differences_file:
+                differences_file.write(f"loadDifferences({json.dumps(key)}, ")
+                json.dump(rows, differences_file, separators=(",", ":"))
+                differences_file.write(");\n")
+
+            files.append(f"{files_dir_name}/{file_name}")
+
+        if len(files) > 0:
+            differences_index[key] = {
+                "schema": result.schema,
+                "table": result.table,
+                "count": len(result.differences),
+                "files": files,
+            }
+
+    template_path = os.path.join(get_project_root(), "src", "html", "column_differences_loader.html")
+
+    with open(template_path) as template:
+        loader = template.read()
+
+    return loader.replace("differences_index_placeholder", json.dumps(differences_index))
+
+
 def generate_html_table_rows(l):
     """
     Takes a List of lists & returns a set of HTML Rows.
 
     """
-    html_table_data = ""
+    html_rows = []
 
     for row in l:
         html_row = "<tr>"
@@ -185,6 +347,6 @@ def generate_html_table_rows(l):
             html_row += f"<td>{cell}</td>"
 
         html_row += "</tr>"
-        html_table_data += html_row
+        html_rows.append(html_row)
 
-    return html_table_data
+    return "".join(html_rows)
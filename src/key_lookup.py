@@ -0,0 +1,161 @@
+import numpy as np
+from settings import TARGET_LOOKUP_ARRAY_CHUNK_SIZE, TARGET_LOOKUP_CHUNK_SIZE
+from sqlalchemy import text
+
+from .constants import ORACLE, POSTGRES, SQLITE, SQLSERVER
+
+# SQL Server does not accept more than 2100 parameters in a single statement.
+SQLSERVER_MAX_PARAMETERS = 2000
+
+# Oracle does not accept more than 1000 values (or rows of values) in an IN list.
+ORACLE_MAX_IN_LIST = 1000
+
+# SQLite releases before 3.32 don't accept more than 999 parameters.
+SQLITE_MAX_PARAMETERS = 999
+
+
+def generate_target_lookup_queries(db_engine, schema, table, primary_key, pk_values):
+    """
+    Prepares the queries to fetch the records from the Target table, for the
+    given primary key values.
+
+    Key values are passed as bind parameters, never as literals, in fixed size
+    chunks. The Target DB sees the same statement for all the chunks (and for
+    all the tables having the same key columns) and can reuse the plan.
+
+        - Postgres: Each key column is passed as an array and expanded using
+          UNNEST(). A chunk can hold a large number of keys.
+        - Others: IN list for single column keys. For composite keys, a row
+          value IN list (Oracle) or an OR of AND conditions (SQL Server). The
+          last chunk is padded by repeating its last key, to keep the number
+          of bind parameters the same.
+
+    :param db_engine: Target DB engine.
+    :param schema: Schema name.
+    :param table: Table name.
+    :param primary_key: A list of primary key column names.
+    :param pk_values: A list of primary key values. Each entry is a list with
+        one value for each primary key column.
+
+    :return: A list of tuples - (query, parameters). Query is a SQLAlchemy
+        TextClause, parameters is a dictionary.
+    """
+    pk_values = [[to_bind_value(v) for v in entry] for entry in pk_values]
+
+    chunk_size = min(lookup_chunk_size(db_engine, len(primary_key)), len(pk_values))
+    queries = []
+
+    for start in range(0, len(pk_values), chunk_size):
+        chunk = pk_values[start : start + chunk_size]
+
+        if db_engine in POSTGRES:
+            query, params = generate_array_lookup_query(schema, table, primary_key, chunk)
+        else:
+            chunk = chunk + [chunk[-1]] * (chunk_size - len(chunk))
+            query, params = generate_in_list_lookup_query(
+                db_engine, schema, table, primary_key, chunk
+            )
+
+        queries.append((query, params))
+
+    return queries
+
+
+def lookup_chunk_size(db_engine, no_key_columns):
+    """
+    Returns the no. of keys looked up by a query: TARGET_LOOKUP_CHUNK_SIZE (or
+    TARGET_LOOKUP_ARRAY_CHUNK_SIZE on Postgres), within the limits of the DB
+    engine on the IN list & the no. of parameters of a statement.
+    """
+    if db_engine in POSTGRES:
+        return TARGET_LOOKUP_ARRAY_CHUNK_SIZE
+
+    chunk_size = TARGET_LOOKUP_CHUNK_SIZE
+
+    if db_engine in ORACLE:
+        chunk_size = min(chunk_size, ORACLE_MAX_IN_LIST)
+
+    if db_engine in SQLSERVER:
+        chunk_size = min(chunk_size, SQLSERVER_MAX_PARAMETERS // no_key_columns)
+
+    if db_engine in SQLITE:
+        chunk_size = min(chunk_size, SQLITE_MAX_PARAMETERS // no_key_columns)
+
+    return max(chunk_size, 1)
+
+
+def generate_array_lookup_query(schema, table, primary_key, chunk):
+    """
+    Postgres: SELECT a.* FROM schema.table a WHERE (a.c1, a.c2) IN
+    (SELECT * FROM UNNEST(:k0, :k1) AS temp(c1, c2))
+    """
+    params = {}
+    arrays = []
+
+    for i, col in enumerate(primary_key):
+        params[f"k{i}"] = [entry[i] for entry in chunk]
+        arrays.append(f":k{i}")
+
+    cols = ", ".join([f"a.{col}" for col in primary_key])
+
+    query = (
+        f"SELECT a.* FROM {schema}.{table} a WHERE ({cols}) IN "
+        f"(SELECT * FROM UNNEST({', '.join(arrays)}) AS temp({', '.join(primary_key)}))"
+    )
+
+    return text(query), params
+
+
+def generate_in_list_lookup_query(db_engine, schema, table, primary_key, chunk):
+    """
+    Oracle, SQL Server: SELECT a.* FROM schema.table a WHERE <key> IN (...)
+    """
+    params = {}
+
+    for index, entry in enumerate(chunk):
+        for i, value in enumerate(entry):
+            params[f"k{index}_{i}"] = value
+
+    if len(primary_key) == 1:
+        binds = ", ".join([f":k{index}_0" for index in range(len(chunk))])
+        where_clause = f"a.{primary_key[0]} IN ({binds})"
+
+    elif db_engine in SQLSERVER:
+        # SQL Server doesn't support row value constructors in IN lists.
+        conditions = []
+
+        for index in range(len(chunk)):
+            condition = " AND ".join(
+                [f"a.{col} = :k{index}_{i}" for i, col in enumerate(primary_key)]
+            )
+            conditions.append(f"({condition})")
+
+        where_clause = " OR ".join(conditions)
+
+    else:
+        cols = ", ".join([f"a.{col}" for col in primary_key])
+        rows = []
+
+        for index in range(len(chunk)):
+            binds = ", ".join([f":k{index}_{i}" for i in range(len(primary_key))])
+            rows.append(f"({binds})")
+
+        where_clause = f"({cols}) IN ({', '.join(rows)})"
+
+    query = f"SELECT a.* FROM {schema}.{table} a WHERE {where_clause}"
+
+    return text(query), params
+
+
+def to_bind_value(value):
+    """
+    Converts Pandas & Numpy scalars to plain Python objects, so that the DB
+    drivers can bind them.
+    """
+    if hasattr(value, "to_pydatetime"):
+        return value.to_pydatetime()
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
@@ -0,0 +1,369 @@
+import decimal
+import os
+from bisect import bisect_right
+
+import pandas as pd
+from databases import table_to_df_chunks
+from settings import KEYLESS_VALIDATION, KEYS_CHUNK_SIZE, KEYS_MAX_DIFFERENCES, WRITE_LOG_FILES
+from sqlalchemy.exc import SQLAlchemyError
+
+from .checksum_validation import keyless_validation_single_table
+from .constants import ORACLE, POSTGRES, SQLITE, SQLSERVER
+from .metadata import get_table_columns
+from .metrics import COMPARE, OUTPUT, SOURCE_FETCH, TARGET_FETCH
+from .results import (DIFFERENCE_COLUMNS, DIFFERENCES, ERROR, SKIPPED, TableResult,
+                      ValidationError, close_table_result, write_differences_log)
+from .sampling import get_queries
+from .utils import get_project_root, open_log_file, write_log_entry
+
+# ----------------------------------------------------------------------------------------------#
+# DB specific ORDER BY expressions of the primary key columns.                                  #
+#                                                                                               #
+# The keys read from both the DBs are merged, so they must come in the same order: the order   #
+# Python compares them in. Text keys are sorted by their code points (binary collation), not  #
+# by the collation of the column. Keys that don't come in that order are reported as an error. #
+# ----------------------------------------------------------------------------------------------#
+oracle_order_by = {
+    "text": "NLSSORT({col}, 'NLS_SORT=BINARY')",
+    "default": "{col}",
+}
+
+postgres_order_by = {
+    "text": '{col} COLLATE "C"',
+    "default": "{col}",
+}
+
+sqlserver_order_by = {
+    "text": "{col} COLLATE Latin1_General_BIN2",
+    "default": "{col}",
+}
+
+sqlite_order_by = {
+    "text": "{col}",
+    "default": "{col}",
+}
+
+
+def key_reconciliation_single_table(schema, table, primary_key, src_config, tgt_config):
+    """
+    Finds the records missing in the Target table & the extra records, by their
+    primary key. All the records of the table are checked, their values aren't
+    compared.
+
+        - The primary key values are read from both the DBs in order, through a
+          server side cursor, KEYS_CHUNK_SIZE at a time.
+        - The two streams are merged: the keys up to the last key read from both
+          the DBs are compared, the others are kept for the next chunk. So, no
+          more than two chunks of each DB are held in memory.
+        - The missing & extra keys are appended to CSV files in
+          data_validation_reports as they're found.
+
+    :return: A TableResult.
+    """
+    if len(primary_key) == 0 and KEYLESS_VALIDATION:
+        return keyless_validation_single_table(schema, table, primary_key, src_config, tgt_config)
+
+    root_dir = get_project_root()
+    log_dir = f"{root_dir}/logs"
+
+    summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log")
+    table_result = TableResult(schema, table)
+    metrics = table_result.metrics
+
+    if len(primary_key) == 0:
+        msg = f"{schema}.{table} does not have primary keys,skipping data validation!"
+        return close_table_result(summary_file, table_result, SKIPPED, msg)
+
+    primary_key = [x.lower() for x in primary_key]
+
+    output_files = {
+        "missing": f"{root_dir}/data_validation_reports/{schema}_{table}_missing_in_target.csv",
+        "extra": f"{root_dir}/data_validation_reports/{schema}_{table}_extra_in_target.csv",
+    }
+
+    for file_location in output_files.values():
+        if os.path.exists(file_location):
+            os.remove(file_location)
+
+    counts = {"source": 0, "target": 0, "missing": 0, "extra": 0}
+    differences = []
+
+    def write_keys(kind, keys):
+        """
+        Appends the missing or extra keys of a window to their CSV file, and keeps
+        the first KEYS_MAX_DIFFERENCES of them for the report.
+        """
+        counts[kind] += len(keys)
+
+        with metrics.measure(OUTPUT) as output_counts:
+            file_location = output_files[kind]
+            file_exists = os.path.exists(file_location)
+
+            pd.DataFrame(keys, columns=primary_key).to_csv(
+                file_location, mode="a" if file_exists else "w", header=not file_exists, index=False
+            )
+            output_counts["rows"] = len(keys)
+
+        if kind == "missing":
+            msg = "Record not found in Target table"
+        else:
+            msg = "Record not found in Source table"
+
+        for key in keys[: max(0, KEYS_MAX_DIFFERENCES - len(differences))]:
+            pk_data = ", ".join([f"{col} = {value}" for col, value in zip(primary_key, key)])
+            differences.append((pk_data, "", None, None, msg))
+
+    try:
+        src_query = generate_ordered_keys_query(src_config, schema, table, primary_key)
+        tgt_query = generate_ordered_keys_query(tgt_config, schema, table, primary_key)
+
+        msg = f"{schema}~{table}~0~0~~Query generated to read the keys from Source table.\n{src_query}"
+        write_log_entry(summary_file, msg, False)
+
+        src_keys = KeyStream(
+            metrics.measure_chunks(
+                SOURCE_FETCH, table_to_df_chunks(src_config, src_query, None, KEYS_CHUNK_SIZE)
+            ),
+            "Source",
+        )
+        tgt_keys = KeyStream(
+            metrics.measure_chunks(
+                TARGET_FETCH, table_to_df_chunks(tgt_config, tgt_query, None, KEYS_CHUNK_SIZE)
+            ),
+            "Target",
+        )
+
+        try:
+            for src_window, tgt_window in merge_key_streams(src_keys, tgt_keys):
+                counts["source"] += len(src_window)
+                counts["target"] += len(tgt_window)
+
+                with metrics.measure(COMPARE) as compare_counts:
+                    missing_keys, extra_keys = compare_keys(src_window, tgt_window)
+                    compare_counts["rows"] = len(src_window)
+
+                if len(missing_keys) > 0:
+                    write_keys("missing", missing_keys)
+
+                if len(extra_keys) > 0:
+                    write_keys("extra", extra_keys)
+        finally:
+            src_keys.close()
+            tgt_keys.close()
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e)).strip("\n")
+        msg = f"Error when reading the primary keys. {error}"
+        return close_table_result(summary_file, table_result, ERROR, msg)
+    except (ValidationError, ValueError) as err:
+        return close_table_result(summary_file, table_result, ERROR, str(err))
+
+    no_recs_having_differences = counts["missing"] + counts["extra"]
+
+    print(f"-> {schema:>30s} {table:>30s} {str(no_recs_having_differences):>10s} differences found")
+
+    # ----------------------------------------------------------------------------------------------#
+    # Write the missing & extra keys & the summary record.                                         #
+    # ----------------------------------------------------------------------------------------------#
+    if len(differences) > 0:
+        table_result.differences.extend(pd.DataFrame(differences, columns=DIFFERENCE_COLUMNS))
+
+    if WRITE_LOG_FILES:
+        write_differences_log(f"{log_dir}/{schema}_{table}_data_validation.log", table_result)
+
+    msg = (
+        f"{schema}~{table}~0~0~~{counts['source']} records in Source table, "
+        f"{counts['target']} records in Target table."
+    )
+    write_log_entry(summary_file, msg, False)
+
+    table_result.no_recs_validated = counts["source"]
+    table_result.no_recs_having_differences = no_recs_having_differences
+    table_result.message = "NO DATA DIFFERENCES FOUND"
+
+    if no_recs_having_differences > 0:
+        table_result.status = DIFFERENCES
+        table_result.message = (
+            f"{counts['missing']} records not found in Target table, "
+            f"{counts['extra']} records not found in Source table"
+        )
+
+    return close_table_result(summary_file, table_result)
+
+
+def get_order_by(db_engine):
+    if db_engine in ORACLE:
+        return oracle_order_by
+
+    if db_engine in POSTGRES:
+        return postgres_order_by
+
+    if db_engine in SQLSERVER:
+        return sqlserver_order_by
+
+    if db_engine in SQLITE:
+        return sqlite_order_by
+
+    raise ValueError(f"{db_engine} IS NOT SUPPORTED FOR KEY RECONCILIATION")
+
+
+def generate_ordered_keys_query(config, schema, table, primary_key):
+    """
+    Generates the query reading the primary key values of a table, in order.
+
+    :param primary_key: A list of primary key column names, in lower case.
+    """
+    order_by = get_order_by(config["db_engine"])
+    categories = {c["name"]: c["category"] for c in get_table_columns(config, schema, table)}
+
+    order_by_columns = [
+        order_by.get(categories.get(col), order_by["default"]).format(col=col) for col in primary_key
+    ]
+
+    return (
+        get_queries(config["db_engine"])["ordered_keys"]
+        .replace("<key_columns>", ", ".join(primary_key))
+        .replace("<order_by>", ", ".join(order_by_columns))
+        .replace("<schema>", schema)
+        .replace("<table>", table)
+    )
+
+
+def normalize_keys(df):
+    """
+    Returns the keys of a DataFrame as a list of tuples. Integral numbers
+    (Decimal, float) are converted to int, so that the keys compare the same
+    way whichever DB they come from.
+    """
+    for col in df.columns:
+        if df[col].dtype.kind == "f" and df[col].notna().all() and (df[col] % 1 == 0).all():
+            df[col] = df[col].astype("int64")
+        elif df[col].dtype == object:
+            df[col] = df[col].map(normalize_key_value)
+
+    return list(df.itertuples(index=False, name=None))
+
+
+def normalize_key_value(value):
+    if isinstance(value, decimal.Decimal) and value.is_finite() and value % 1 == 0:
+        return int(value)
+
+    return value
+
+
+class KeyStream:
+    """
+    The primary key values read from a DB, as tuples, a chunk at a time.
+
+    :param chunks: An iterator of DataFrames, with the primary key columns.
+    :param name: Source or Target, for the error messages.
+    """
+
+    def __init__(self, chunks, name):
+        self.chunks = chunks
+        self.name = name
+        self.keys = []
+        self.position = 0
+        self.last_key = None
+        self.exhausted = False
+
+    def __len__(self):
+        return len(self.keys) - self.position
+
+    def fill(self):
+        """
+        Reads the next chunk, once all the keys read so far are taken.
+
+        :raises ValidationError: When the keys aren't in order.
+        """
+        while len(self) == 0 and not self.exhausted:
+            try:
+                df = next(self.chunks)
+            except StopIteration:
+                self.exhausted = True
+                self.keys, self.position = [], 0
+                return
+
+            self.set_keys(normalize_keys(df))
+
+    def set_keys(self, keys):
+        """
+        Keeps the keys of a new chunk. The merge relies on their order, it's
+        checked first.
+
+        :raises ValidationError: When the keys aren't in order.
+        """
+        try:
+            in_order = all(a < b for a, b in zip(keys, keys[1:]))
+
+            if self.last_key is not None and len(keys) > 0:
+                in_order = in_order and self.last_key < keys[0]
+        except TypeError:
+            in_order = False
+
+        if not in_order:
+            raise ValidationError(
+                f"The primary keys of the {self.name} table are not returned in binary order, "
+                "they can't be reconciled."
+            )
+
+        self.keys, self.position = keys, 0
+
+        if len(keys) > 0:
+            self.last_key = keys[-1]
+
+    def take(self, bound=None):
+        """
+        Removes & returns the keys up to bound (included), all of them when
+        bound is None.
+        """
+        end = len(self.keys) if bound is None else bisect_right(self.keys, bound, self.position)
+        keys = self.keys[self.position:end]
+        self.position = end
+
+        return keys
+
+    def peek_last(self):
+        return self.keys[-1]
+
+    def close(self):
+        if hasattr(self.chunks, "close"):
+            self.chunks.close()
+
+
+def merge_key_streams(src_keys, tgt_keys):
+    """
+    Merges two streams of keys in the same order. Yields windows of keys: a
+    tuple (Source keys, Target keys), both up to the same key. A key missing
+    from a window of one stream isn't in that stream at all.
+    """
+    while True:
+        src_keys.fill()
+        tgt_keys.fill()
+
+        if len(src_keys) == 0 and len(tgt_keys) == 0:
+            return
+
+        if len(src_keys) == 0:
+            yield [], tgt_keys.take()
+        elif len(tgt_keys) == 0:
+            yield src_keys.take(), []
+        else:
+            # Keys after this one may not have been read yet from the other DB.
+            bound = min(src_keys.peek_last(), tgt_keys.peek_last())
+            yield src_keys.take(bound), tgt_keys.take(bound)
+
+
+def compare_keys(src_keys, tgt_keys):
+    """
+    Compares the keys of a window.
+
+    :return: A tuple - The sorted lists of the keys missing in the Target keys,
+        and of the extra keys.
+    """
+    src_set = set(src_keys)
+    tgt_set = set(tgt_keys)
+
+    missing_keys = [key for key in src_keys if key not in tgt_set]
+    extra_keys = [key for key in tgt_keys if key not in src_set]
+
+    return missing_keys, extra_keys
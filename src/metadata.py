@@ -0,0 +1,305 @@
+import json
+import os
+import sys
+import threading
+import time
+
+from databases import table_columns, table_to_df
+from databases.oracle_queries import oracle_queries
+from databases.sql_server_queries import sqlserver_queries
+from databases.sqlite_queries import sqlite_queries
+from settings import METADATA_CACHE_TTL
+from sqlalchemy import types as sqltypes
+from sqlalchemy.exc import SQLAlchemyError
+
+from .constants import ORACLE, POSTGRES, SQLITE, SQLSERVER
+from .utils import get_project_root
+
+# ------------------------------------------------------------------------------#
+# On disk cache of table metadata: primary key columns, column names & types.   #
+#                                                                               #
+# Entries are keyed by (engine, host, port, db, schema, table) and expire after #
+# METADATA_CACHE_TTL seconds. Use --refresh-metadata (or call                   #
+# invalidate_metadata_cache()) after changing the DDL of a table.               #
+# ------------------------------------------------------------------------------#
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache_file():
+    return os.path.join(get_project_root(), "cache", "metadata_cache.json")
+
+
+def load_metadata_cache():
+    """
+    Reads the cache file. Entries that have expired are dropped.
+    """
+    global _cache
+
+    with _cache_lock:
+        if _cache is not None:
+            return _cache
+
+        _cache = {}
+        cache_file = get_cache_file()
+
+        if METADATA_CACHE_TTL and os.path.exists(cache_file):
+            try:
+                with open(cache_file, "r") as f:
+                    entries = json.load(f)
+
+                now = time.time()
+
+                for key, entry in entries.items():
+                    if now - entry["cached_at"] < METADATA_CACHE_TTL:
+                        _cache[key] = entry
+            except (OSError, ValueError) as err:
+                print(f"-> Ignoring the metadata cache {cache_file}: {err}")
+
+        return _cache
+
+
+def save_metadata_cache():
+    """
+    Writes the cache to the disk.
+    """
+    if not METADATA_CACHE_TTL or _cache is None:
+        return
+
+    cache_file = get_cache_file()
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+    with _cache_lock:
+        # Write to a temporary file first, so that a crash doesn't leave a partial file.
+        with open(cache_file + ".tmp", "w") as f:
+            json.dump(_cache, f, indent=1, default=str)
+
+        os.replace(cache_file + ".tmp", cache_file)
+
+
+def invalidate_metadata_cache(config=None, tables=None):
+    """
+    Removes entries from the cache.
+
+    :param config: When given, only the entries of this DB are removed.
+    :param tables: When given, only the entries of these tables are removed.
+        Each table is a map with keys: schema, table.
+
+    With no arguments, the whole cache is removed.
+    """
+    cache = load_metadata_cache()
+
+    with _cache_lock:
+        if config is None and tables is None:
+            cache.clear()
+        else:
+            for key in list(cache.keys()):
+                entry = cache[key]
+
+                if config is not None and entry["db"] != db_identifier(config):
+                    continue
+
+                if tables is not None and not any(
+                    entry["schema"] == t["schema"].upper() and entry["table"] == t["table"].upper()
+                    for t in tables
+                ):
+                    continue
+
+                del cache[key]
+
+    save_metadata_cache()
+
+
+def db_identifier(config):
+    return f"{config['db_engine']}|{config['host']}|{config['port']}|{config['service']}"
+
+
+def cache_key(config, schema, table):
+    return f"{db_identifier(config)}|{schema.upper()}|{table.upper()}"
+
+
+def get_cache_entry(config, schema, table):
+    """
+    Returns the cache entry of a table, creating an empty one if needed.
+    Must be called with _cache_lock held.
+    """
+    key = cache_key(config, schema, table)
+
+    if key not in _cache:
+        _cache[key] = {
+            "db": db_identifier(config),
+            "schema": schema.upper(),
+            "table": table.upper(),
+            "cached_at": time.time(),
+        }
+
+    return _cache[key]
+
+
+def get_primary_keys(src_config, tables):
+    """
+    Returns the primary key column names of the tables. Catalog tables are
+    queried only for the tables that are not in the cache.
+
+    :param src_config: A dictionary containing the Source DB connection details.
+    :param tables: A list of tables. Each table is a map with keys: schema, table.
+
+    :return: A dictionary.
+        - Key: (schema, table), in upper case.
+        - Value: A list of primary key column names. Empty, if the table doesn't
+          have a primary key.
+    """
+    cache = load_metadata_cache()
+    primary_keys = {}
+    tables_to_fetch = []
+
+    with _cache_lock:
+        for entry in tables:
+            key = cache_key(src_config, entry["schema"], entry["table"])
+
+            if key in cache and "primary_key" in cache[key]:
+                primary_keys[(entry["schema"].upper(), entry["table"].upper())] = cache[key]["primary_key"]
+            else:
+                tables_to_fetch.append(entry)
+
+    if len(tables) > len(tables_to_fetch):
+        print(f"-> Primary keys of {len(tables) - len(tables_to_fetch)} tables found in the metadata cache.")
+
+    if len(tables_to_fetch) == 0:
+        return primary_keys
+
+    df = fetch_primary_key_column_names(src_config, tables_to_fetch)
+
+    fetched = {}
+
+    for row in df.values.tolist():
+        schema, table, pk = row[0], row[1], row[2]
+        fetched.setdefault((schema.upper(), table.upper()), []).append(pk)
+
+    with _cache_lock:
+        for entry in tables_to_fetch:
+            schema, table = entry["schema"].upper(), entry["table"].upper()
+            pk = fetched.get((schema, table), [])
+
+            primary_keys[(schema, table)] = pk
+
+            cache_entry = get_cache_entry(src_config, schema, table)
+            cache_entry["primary_key"] = pk
+
+    save_metadata_cache()
+
+    return primary_keys
+
+
+def get_table_columns(config, schema, table):
+    """
+    Returns the columns of a table, from the cache if possible.
+
+    :return: A list of dictionaries with keys:
+        - name: Column name, in lower case.
+        - type: Column type, as reported by SQLAlchemy.
+        - category: number, datetime, text or other. See column_category().
+    """
+    cache = load_metadata_cache()
+    key = cache_key(config, schema, table)
+
+    with _cache_lock:
+        if key in cache and "columns" in cache[key]:
+            return cache[key]["columns"]
+
+    columns = [
+        {
+            "name": col["name"].lower(),
+            "type": str(col["type"]),
+            "category": column_category(col["type"]),
+        }
+        for col in table_columns(config, schema, table)
+    ]
+
+    with _cache_lock:
+        get_cache_entry(config, schema, table)["columns"] = columns
+
+    return columns
+
+
+def column_category(sa_type):
+    """
+    Maps a SQLAlchemy type to a category: number, datetime, text or other.
+    """
+    # Float is a subclass of Numeric, but isn't converted to text the same way
+    # by all the DBs.
+    if isinstance(sa_type, sqltypes.Float):
+        return "other"
+
+    if isinstance(sa_type, (sqltypes.Integer, sqltypes.Numeric)):
+        return "number"
+
+    if isinstance(sa_type, (sqltypes.DateTime, sqltypes.Date)):
+        return "datetime"
+
+    if isinstance(sa_type, sqltypes.String):
+        return "text"
+
+    return "other"
+
+
+def generate_db_specific_inline_view(db_engine, tables):
+    """
+
+    :param db_engine: Specifies a database engine (Oracle, PostgreSQL, etc.)
+    :param tables: A list of tables to be included in the inline view. Each table is a map
+    with the following keys: schema, table.
+
+    :return: A string containing the inline view.
+    """
+    inline_view = ""
+
+    for index, table in enumerate(tables):
+        if index > 0:
+            inline_view += " UNION "
+
+        if db_engine in ORACLE:
+            inline_view += f"SELECT '{table['schema']}' AS owner, '{table['table']}' AS table_name FROM DUAL "
+        elif db_engine in POSTGRES:
+            inline_view += f"SELECT '{table['schema']}' AS owner, '{table['table']}' AS table_name "
+        elif db_engine in SQLSERVER or db_engine in SQLITE:
+            inline_view += f"SELECT '{table['schema']}' AS schema_name, '{table['table']}' AS table_name "
+
+    return inline_view
+
+
+def fetch_primary_key_column_names(src_config, tables):
+    """
+    Identify primary key column names from the Source DB.
+
+    :param src_config: A dictionary containing the Source DB connection details.
+    :param tables: A list of tables to be validated
+
+    :return: A Pandas DataFrame containing the primary key column names.
+    """
+    db_engine = src_config["db_engine"]
+    primary_keys_query = ""
+
+    if db_engine in ORACLE:
+        primary_keys_query = oracle_queries["get_primary_key"]
+    elif db_engine in SQLSERVER:
+        primary_keys_query = sqlserver_queries["get_primary_key"]
+    elif db_engine in SQLITE:
+        primary_keys_query = sqlite_queries["get_primary_key"]
+    else:
+        print(f"{db_engine} IS NOT SUPPORTED AS SOURCE DB AT THE MOMENT")
+        sys.exit(1)
+
+    inline_view = generate_db_specific_inline_view(db_engine, tables)
+    query = primary_keys_query.replace("<temp_placeholder>", inline_view)
+
+    # Execute the query
+    try:
+        df = table_to_df(src_config, query, None)
+
+        return df
+    except SQLAlchemyError as e:
+        error = str(e.__dict__["orig"])
+        print(f"-> Unable to fetch primary key column names: {error}")
+        print(f"-> This is the query used to find primary key columns: \n{query}")
+        sys.exit(1)
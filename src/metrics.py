@@ -0,0 +1,249 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from settings import METRICS_FORMAT
+
+from .utils import get_project_root
+
+# ------------------------------------------------------------------------------#
+# Metrics of the phases of a table: wall time, records, bytes & allocated       #
+# blocks.                                                                       #
+#                                                                               #
+# A phase can run more than once for a table (chunks, partitions), its metrics #
+# are added up. Partitions run at the same time, so the time of a phase can be #
+# more than the time of the table.                                              #
+#                                                                               #
+# Allocated blocks is the change in the no. of memory blocks allocated by the  #
+# Python process (sys.getallocatedblocks). Tables validated at the same time   #
+# add to each other's counts, take it as a rough figure.                        #
+# ------------------------------------------------------------------------------#
+PRIMARY_KEYS = "primary_keys"
+SOURCE_FETCH = "source_fetch"
+TARGET_FETCH = "target_fetch"
+MERGE = "merge"
+COMPARE = "compare"
+OUTPUT = "output"
+
+PHASES = [PRIMARY_KEYS, SOURCE_FETCH, TARGET_FETCH, MERGE, COMPARE, OUTPUT]
+
+
+class TableMetrics:
+    """
+    Metrics of the phases of a table (or of the run, for the phases that are
+    not run for each table).
+    """
+
+    def __init__(self, seconds=0.0, phases=None):
+        self.started_at = time.perf_counter()
+        self.seconds = seconds
+        self.phases = phases or {}
+        self.lock = threading.Lock()
+
+    def add(self, phase, seconds, rows=0, bytes=0, allocated_blocks=0):
+        with self.lock:
+            entry = self.phases.setdefault(
+                phase, {"seconds": 0.0, "rows": 0, "bytes": 0, "allocated_blocks": 0}
+            )
+            entry["seconds"] += seconds
+            entry["rows"] += rows
+            entry["bytes"] += bytes
+            entry["allocated_blocks"] += allocated_blocks
+
+    @contextmanager
+    def measure(self, phase):
+        """
+        Measures the code in the with block as the given phase. The block sets
+        the no. of records & bytes it processed in the dictionary it's given.
+
+            with metrics.measure(COMPARE) as counts:
+                ...
+                counts["rows"] = len(df)
+        """
+        counts = {"rows": 0, "bytes": 0}
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+
+        try:
+            yield counts
+        finally:
+            self.add(
+                phase,
+                time.perf_counter() - start,
+                counts["rows"],
+                counts["bytes"],
+                sys.getallocatedblocks() - blocks,
+            )
+
+    def measure_chunks(self, phase, chunks):
+        """
+        Yields the DataFrames of an iterator, measuring the time taken to read
+        each of them as the given phase.
+        """
+        iterator = iter(chunks)
+
+        try:
+            while True:
+                with self.measure(phase) as counts:
+                    try:
+                        df = next(iterator)
+                    except StopIteration:
+                        return
+
+                    counts["rows"] = len(df)
+                    counts["bytes"] = frame_bytes(df)
+
+                yield df
+        finally:
+            # Stop the query, if the caller stops reading early.
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def stop(self):
+        """
+        Sets the wall time of the table: from the creation of the metrics
+        until now.
+        """
+        self.seconds = time.perf_counter() - self.started_at
+
+    def slowest_phase(self):
+        """
+        Returns the name of the phase that took the longest, None if there isn't one.
+        """
+        with self.lock:
+            if len(self.phases) == 0:
+                return None
+
+            return max(self.phases, key=lambda phase: self.phases[phase]["seconds"])
+
+    def summary_entry(self):
+        """
+        Describes the phases in a line, for the summary log of the table.
+        """
+        with self.lock:
+            phases = [
+                f"{phase} {entry['seconds']:.3f}s ({entry['rows']} records, "
+                f"{entry['bytes'] / 1024 / 1024:.1f} MB)"
+                for phase, entry in sorted(self.phases.items(), key=lambda e: PHASES.index(e[0]))
+            ]
+
+        return f"Completed in {self.seconds:.3f}s. " + ", ".join(phases)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "seconds": self.seconds,
+                "phases": {phase: dict(entry) for phase, entry in self.phases.items()},
+            }
+
+    @classmethod
+    def from_dict(cls, value):
+        return cls(value["seconds"], value["phases"])
+
+
+def frame_bytes(df):
+    """
+    Returns the memory used by a DataFrame, including the values of text
+    (object) columns.
+    """
+    return int(df.memory_usage(index=False, deep=True).sum())
+
+
+def write_run_metrics(results, run_metrics):
+    """
+    Writes the metrics of all the tables to data_validation_reports, in
+    METRICS_FORMAT. The file is replaced at each run.
+
+    :param results: A list of TableResult.
+    :param run_metrics: TableMetrics of the phases that are run once for all
+        the tables (primary keys).
+
+    :return: The location of the file, None if METRICS_FORMAT is None.
+    """
+    if METRICS_FORMAT is None:
+        return None
+
+    if METRICS_FORMAT == "json":
+        extension = "json"
+        content = json.dumps(
+            {
+                "run": run_metrics.to_dict(),
+                "tables": [
+                    {
+                        "schema": result.schema,
+                        "table": result.table,
+                        "status": result.status,
+                        "no_recs_validated": result.no_recs_validated,
+                        **result.metrics.to_dict(),
+                    }
+                    for result in results
+                ],
+            },
+            indent=1,
+        )
+    elif METRICS_FORMAT == "prometheus":
+        extension = "prom"
+        content = prometheus_metrics(results, run_metrics)
+    else:
+        raise ValueError(f"Unknown metrics format: {METRICS_FORMAT}")
+
+    metrics_file = os.path.join(
+        get_project_root(), "data_validation_reports", f"data_validation_metrics.{extension}"
+    )
+
+    # The textfile collector may read the file at any time, replace it at once.
+    with open(metrics_file + ".tmp", "w") as f:
+        f.write(content)
+
+    os.replace(metrics_file + ".tmp", metrics_file)
+
+    return metrics_file
+
+
+def prometheus_metrics(results, run_metrics):
+    """
+    Returns the metrics in the Prometheus text format.
+    """
+    lines = [
+        "# HELP data_validation_table_seconds Time taken to validate a table, output excluded.",
+        "# TYPE data_validation_table_seconds gauge",
+    ]
+
+    for result in results:
+        labels = prometheus_labels(schema=result.schema, table=result.table, status=result.status)
+        lines.append(f"data_validation_table_seconds{{{labels}}} {result.metrics.seconds}")
+
+    metrics = [
+        ("seconds", "Time spent in a phase."),
+        ("rows", "Records processed in a phase."),
+        ("bytes", "Bytes of the records processed in a phase."),
+        ("allocated_blocks", "Change in the memory blocks allocated during a phase."),
+    ]
+
+    for name, description in metrics:
+        lines.append(f"# HELP data_validation_phase_{name} {description}")
+        lines.append(f"# TYPE data_validation_phase_{name} gauge")
+
+        for phase, entry in run_metrics.to_dict()["phases"].items():
+            labels = prometheus_labels(schema="", table="", phase=phase)
+            lines.append(f"data_validation_phase_{name}{{{labels}}} {entry[name]}")
+
+        for result in results:
+            for phase, entry in result.metrics.to_dict()["phases"].items():
+                labels = prometheus_labels(schema=result.schema, table=result.table, phase=phase)
+                lines.append(f"data_validation_phase_{name}{{{labels}}} {entry[name]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def prometheus_labels(**labels):
+    values = []
+
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        values.append(f'{name}="{value}"')
+
+    return ",".join(values)
@@ -0,0 +1,157 @@
+import datetime
+import decimal
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from settings import OUTPUT_FORMAT, OUTPUT_WRITER_THREADS
+
+from .metrics import OUTPUT
+from .results import ERROR
+from .utils import get_project_root, open_log_file, write_log_entry
+
+# ------------------------------------------------------------------------------#
+# Output stage: writes the compared records of each table to a file in         #
+# data_validation_reports.                                                      #
+#                                                                               #
+# The files are written by a few background threads, so the validation threads #
+# move on to the next table as soon as the comparison is done.                  #
+# ------------------------------------------------------------------------------#
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def write_xlsx(df, file_location, sheet_name):
+    """
+    Writes the DataFrame to an Excel file, using openpyxl's write-only mode.
+    The rows are streamed to the file, the workbook isn't built in memory.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet(sheet_name[:31])
+
+    sheet.append([str(col) for col in df.columns])
+
+    for row in df.itertuples(index=False, name=None):
+        sheet.append([to_cell_value(value) for value in row])
+
+    wb.save(file_location)
+
+
+def write_csv(df, file_location, sheet_name):
+    df.to_csv(file_location, index=False)
+
+
+def write_parquet(df, file_location, sheet_name):
+    """
+    Writes the DataFrame to a Parquet file. Needs pyarrow (or fastparquet).
+    Values of mixed types are written as text.
+    """
+    df = df.copy()
+
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].map(lambda value: None if value is None else str(value))
+
+    df.to_parquet(file_location, index=False)
+
+
+# Output formats (OUTPUT_FORMAT) & their writers. A writer takes the DataFrame,
+# the file location & a sheet name, which only some formats use.
+OUTPUT_WRITERS = {
+    "xlsx": write_xlsx,
+    "csv": write_csv,
+    "parquet": write_parquet,
+}
+
+
+def to_cell_value(value):
+    """
+    Converts a value to a type openpyxl can write. Nulls become empty cells,
+    other unsupported values are written as text.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if value is None or value is pd.NaT:
+        return None
+
+    if isinstance(value, float) and math.isnan(value):
+        return None
+
+    # Excel doesn't support time zones.
+    if isinstance(value, (datetime.datetime, datetime.time)) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+
+    if isinstance(
+        value,
+        (str, bool, int, float, decimal.Decimal, datetime.date, datetime.time, datetime.timedelta),
+    ):
+        return value
+
+    return str(value)
+
+
+def submit_output(formatted_dfs, schema, table, table_result):
+    """
+    Queues the compared records of a table to be written in OUTPUT_FORMAT.
+    Returns immediately.
+
+    :param formatted_dfs: A list of DataFrames with the compared records.
+    :param table_result: TableResult of the table. Its status is set to ERROR,
+        when the file can't be written.
+    """
+    global _executor
+
+    if OUTPUT_FORMAT not in OUTPUT_WRITERS:
+        raise ValueError(f"Unknown output format: {OUTPUT_FORMAT}")
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=OUTPUT_WRITER_THREADS, thread_name_prefix="output_writer"
+            )
+
+        _executor.submit(write_output, formatted_dfs, schema, table, table_result)
+
+
+def write_output(formatted_dfs, schema, table, table_result):
+    """
+    Writes the compared records of a table. Runs on an output writer thread.
+    """
+    root_dir = get_project_root()
+    file_location = f"{root_dir}/data_validation_reports/{schema}_{table}.{OUTPUT_FORMAT}"
+
+    try:
+        with table_result.metrics.measure(OUTPUT) as counts:
+            formatted_df = pd.concat(formatted_dfs, ignore_index=True)
+            OUTPUT_WRITERS[OUTPUT_FORMAT](formatted_df, file_location, f"{schema}_{table}")
+            counts["rows"] = len(formatted_df)
+            counts["bytes"] = os.path.getsize(file_location)
+    except Exception as err:
+        error = str(err).strip("\n")
+
+        table_result.status = ERROR
+        table_result.message = f"Error when writing the output file. {error}"
+
+        summary_file = open_log_file(
+            f"{root_dir}/logs/{schema}_{table}_data_validation_summary.log", "a"
+        )
+        write_log_entry(summary_file, table_result.summary_entry(), True)
+
+
+def wait_for_outputs():
+    """
+    Waits until all the queued files are written & stops the writer threads.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+
+    if executor is not None:
+        executor.shutdown(wait=True)
@@ -0,0 +1,351 @@
+import math
+import numbers
+
+import pandas as pd
+from databases import table_to_df
+from settings import PROFILE_ROW_VALIDATION, PROFILE_TOLERANCE, WRITE_LOG_FILES
+from sqlalchemy.exc import SQLAlchemyError
+
+from .constants import ORACLE, POSTGRES, SQLITE, SQLSERVER
+from .metadata import get_table_columns
+from .metrics import COMPARE, SOURCE_FETCH, TARGET_FETCH
+from .results import (DIFFERENCE_COLUMNS, DIFFERENCES, ERROR, MATCH, SKIPPED, TableResult,
+                      close_table_result, write_differences_log)
+from .sampling import get_queries
+from .utils import get_project_root, open_log_file, write_log_entry
+
+# ----------------------------------------------------------------------------------------------#
+# Statistics computed for each column category (see metadata.column_category). Floating point  #
+# & other columns only get the no. of nulls: their min, max & sum depend on the DB engine, or  #
+# can't be computed (LOBs, XML...). Min & max of text depend on the collation, the sum of the   #
+# lengths is used instead. Trailing spaces are not counted: CHAR & NCHAR values are padded in   #
+# Oracle & SQL Server, not once converted to text in Postgres.                                  #
+# ----------------------------------------------------------------------------------------------#
+PROFILE_STATISTICS = {
+    "number": ["nulls", "min", "max", "sum"],
+    "datetime": ["nulls", "min", "max"],
+    "text": ["nulls", "length"],
+    "other": ["nulls"],
+}
+
+STATISTIC_NAMES = {
+    "row_count": "No. of records",
+    "nulls": "No. of nulls",
+    "min": "Min. value",
+    "max": "Max. value",
+    "sum": "Sum",
+    "length": "Sum of the lengths",
+}
+
+# DB specific SQL expressions of the statistics.
+oracle_aggregates = {
+    "nulls": "COUNT(*) - COUNT({col})",
+    "min": "MIN({col})",
+    "max": "MAX({col})",
+    "sum": "SUM({col})",
+    "length": "SUM(LENGTH(RTRIM({col})))",
+}
+
+postgres_aggregates = {
+    "nulls": "COUNT(*) - COUNT({col})",
+    "min": "MIN({col})",
+    "max": "MAX({col})",
+    "sum": "SUM({col})",
+    "length": "SUM(LENGTH(RTRIM({col}::TEXT)))",
+}
+
+sqlserver_aggregates = {
+    "nulls": "COUNT_BIG(*) - COUNT_BIG({col})",
+    "min": "MIN({col})",
+    "max": "MAX({col})",
+    # SUM of an INT column is an INT, and overflows.
+    "sum": "SUM(CONVERT(FLOAT, {col}))",
+    # LEN ignores trailing spaces.
+    "length": "SUM(CONVERT(BIGINT, LEN(CONVERT(NVARCHAR(MAX), {col}))))",
+}
+
+sqlite_aggregates = {
+    "nulls": "COUNT(*) - COUNT({col})",
+    "min": "MIN({col})",
+    "max": "MAX({col})",
+    "sum": "SUM({col})",
+    "length": "SUM(LENGTH(RTRIM({col})))",
+}
+
+# Max. no. of statistics computed by a profile query. Oracle doesn't accept more
+# than 1000 expressions in a select list, wide tables are profiled by several
+# queries.
+PROFILE_MAX_AGGREGATES = 900
+
+
+def profile_validation_single_table(schema, table, primary_key, src_config, tgt_config):
+    """
+    Compares the profiles of the Source & Target tables, without reading their
+    records. An aggregate query is run in each DB (several for wide tables),
+    returning the no. of records and the statistics of each column
+    (PROFILE_STATISTICS).
+
+    When the profiles don't match and PROFILE_ROW_VALIDATION is true, the table
+    is then validated record by record (data_validation_single_table). The
+    profile differences are added to the column differences of its result.
+
+    :return: A TableResult.
+    """
+    root_dir = get_project_root()
+    log_dir = f"{root_dir}/logs"
+
+    table_result = TableResult(schema, table)
+    metrics = table_result.metrics
+
+    try:
+        columns, statistics = get_profile_statistics(src_config, tgt_config, schema, table)
+        src_queries = generate_profile_queries(src_config["db_engine"], schema, table, columns, statistics)
+        tgt_queries = generate_profile_queries(tgt_config["db_engine"], schema, table, columns, statistics)
+
+        with metrics.measure(SOURCE_FETCH) as counts:
+            src_profile = read_profile(src_config, src_queries)
+            counts["rows"] = len(src_queries)
+
+        with metrics.measure(TARGET_FETCH) as counts:
+            tgt_profile = read_profile(tgt_config, tgt_queries)
+            counts["rows"] = len(tgt_queries)
+
+        with metrics.measure(COMPARE) as counts:
+            differences = compare_profiles(src_profile, tgt_profile, columns, statistics)
+            counts["rows"] = 1
+    except SQLAlchemyError as e:
+        error = str(e.__dict__.get("orig", e)).strip("\n")
+        msg = f"Error when executing the profile queries. {error}"
+        summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log")
+        return close_table_result(summary_file, table_result, ERROR, msg)
+    except ValueError as err:
+        summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log")
+        return close_table_result(summary_file, table_result, SKIPPED, str(err))
+
+    differences_df = pd.DataFrame(differences, columns=DIFFERENCE_COLUMNS)
+    columns_having_differences = sorted(set(col for col in differences_df["column"] if col != ""))
+
+    # ----------------------------------------------------------------------------------------------#
+    # The profiles don't match, find the records having differences.                               #
+    # ----------------------------------------------------------------------------------------------#
+    if len(differences) > 0 and PROFILE_ROW_VALIDATION:
+        # Imported here, data_validation imports this module.
+        from .data_validation import data_validation_single_table
+
+        result = data_validation_single_table(schema, table, primary_key, src_config, tgt_config)
+        result.differences.extend(differences_df)
+
+        for phase, entry in metrics.to_dict()["phases"].items():
+            result.metrics.add(phase, **entry)
+
+        metrics.stop()
+        result.metrics.seconds += metrics.seconds
+
+        # The profile differences stand, whatever the records show: for ex, the
+        # extra records of the Target table are not read by the record validation.
+        profile_message = f"The profiles don't match, {len(differences)} statistics are different"
+
+        if result.status == MATCH:
+            result.message = (
+                f"{profile_message}. The {result.no_recs_validated} records validated match"
+            )
+        else:
+            result.message = f"{profile_message}. {result.message}"
+
+        if result.status != ERROR:
+            result.status = DIFFERENCES
+        result.columns_having_differences = sorted(
+            set(result.columns_having_differences) | set(columns_having_differences)
+        )
+
+        if WRITE_LOG_FILES:
+            write_differences_log(f"{log_dir}/{schema}_{table}_data_validation.log", result)
+
+        summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log", "a")
+        write_log_entry(summary_file, result.summary_entry(), True)
+
+        return result
+
+    print(f"-> {schema:>30s} {table:>30s} {str(len(differences)):>10s} differences found")
+
+    # ----------------------------------------------------------------------------------------------#
+    # Write the profile differences & the summary record.                                          #
+    # ----------------------------------------------------------------------------------------------#
+    summary_file = open_log_file(f"{log_dir}/{schema}_{table}_data_validation_summary.log")
+    table_result.differences.extend(differences_df)
+
+    if WRITE_LOG_FILES:
+        write_differences_log(f"{log_dir}/{schema}_{table}_data_validation.log", table_result)
+
+    msg = (
+        f"{schema}~{table}~0~0~~Profile of {len(columns)} columns compared: "
+        f"{len(differences)} statistics are different."
+    )
+    write_log_entry(summary_file, msg, False)
+
+    table_result.no_recs_validated = int(src_profile["row_count"])
+    table_result.columns_having_differences = columns_having_differences
+    table_result.message = "NO DATA DIFFERENCES FOUND"
+
+    if len(differences) > 0:
+        table_result.status = DIFFERENCES
+        table_result.message = f"The profiles don't match, {len(differences)} statistics are different"
+
+    return close_table_result(summary_file, table_result)
+
+
+def get_profile_statistics(src_config, tgt_config, schema, table):
+    """
+    Returns the columns present in both the tables & the statistics to be
+    computed for each of them: those of its category in both the DBs.
+
+    :raises ValueError: When the tables don't have columns in common.
+
+    :return: A tuple - A list of column names, and a list of lists of statistics.
+    """
+    src_columns = {c["name"]: c["category"] for c in get_table_columns(src_config, schema, table)}
+    tgt_columns = {c["name"]: c["category"] for c in get_table_columns(tgt_config, schema, table)}
+
+    columns = [col for col in src_columns.keys() if col in tgt_columns.keys()]
+
+    if len(columns) == 0:
+        raise ValueError("No columns found in the Target table, skipping data validation!")
+
+    statistics = []
+
+    for col in columns:
+        tgt_statistics = PROFILE_STATISTICS[tgt_columns[col]]
+        statistics.append(
+            [stat for stat in PROFILE_STATISTICS[src_columns[col]] if stat in tgt_statistics]
+        )
+
+    return columns, statistics
+
+
+def get_aggregates(db_engine):
+    if db_engine in ORACLE:
+        return oracle_aggregates
+
+    if db_engine in POSTGRES:
+        return postgres_aggregates
+
+    if db_engine in SQLSERVER:
+        return sqlserver_aggregates
+
+    if db_engine in SQLITE:
+        return sqlite_aggregates
+
+    raise ValueError(f"{db_engine} IS NOT SUPPORTED FOR PROFILE VALIDATION")
+
+
+def generate_profile_queries(db_engine, schema, table, columns, statistics):
+    """
+    Generates the profile queries of a table, each computing up to
+    PROFILE_MAX_AGGREGATES statistics (all the statistics of a column are in
+    the same query). The statistic stat of the i-th column is returned as
+    p<i>_<stat>, column names may be too long for an alias.
+
+    :return: A list of queries.
+    """
+    aggregates = get_aggregates(db_engine)
+    query_lines = [[]]
+
+    for i, (col, col_statistics) in enumerate(zip(columns, statistics)):
+        lines = [f"  , {aggregates[stat].format(col=col)} AS p{i}_{stat}" for stat in col_statistics]
+
+        if len(query_lines[-1]) + len(lines) > PROFILE_MAX_AGGREGATES:
+            query_lines.append([])
+
+        query_lines[-1] += lines
+
+    return [
+        get_queries(db_engine)["profile"]
+        .replace("<aggregates>", "\n".join(lines))
+        .replace("<schema>", schema)
+        .replace("<table>", table)
+        for lines in query_lines
+    ]
+
+
+def read_profile(config, queries):
+    """
+    Runs the profile queries.
+
+    :return: A dictionary, alias -> value.
+    """
+    profile = {}
+
+    for query in queries:
+        df = table_to_df(config, query)
+        df.columns = [col.lower() for col in df.columns]
+
+        profile.update(df.astype(object).iloc[0].to_dict())
+
+    return profile
+
+
+def compare_profiles(src_profile, tgt_profile, columns, statistics):
+    """
+    Compares the profiles of the Source & Target tables.
+
+    :return: A list of tuples, one per statistic that doesn't match: (primary key,
+        column, source value, target value, message). The primary key is empty.
+    """
+    differences = []
+
+    if not same_count(src_profile["row_count"], tgt_profile["row_count"]):
+        differences.append(
+            ("", "", src_profile["row_count"], tgt_profile["row_count"], "No. of records is different")
+        )
+
+    for i, (col, col_statistics) in enumerate(zip(columns, statistics)):
+        for stat in col_statistics:
+            src_value = src_profile[f"p{i}_{stat}"]
+            tgt_value = tgt_profile[f"p{i}_{stat}"]
+
+            if stat in ["nulls", "length"]:
+                same = same_count(src_value, tgt_value)
+            elif isinstance(src_value, numbers.Number) and isinstance(tgt_value, numbers.Number):
+                same = same_number(src_value, tgt_value)
+            else:
+                same = same_datetime(src_value, tgt_value)
+
+            if not same:
+                differences.append(
+                    ("", col, src_value, tgt_value, f"{STATISTIC_NAMES[stat]} is different")
+                )
+
+    return differences
+
+
+def is_null(value):
+    return value is None or value is pd.NaT or (isinstance(value, float) and math.isnan(value))
+
+
+def same_count(src_value, tgt_value):
+    # The sum of the lengths is null, when all the values are null.
+    src_value = 0 if is_null(src_value) else int(src_value)
+    tgt_value = 0 if is_null(tgt_value) else int(tgt_value)
+
+    return src_value == tgt_value
+
+
+def same_number(src_value, tgt_value):
+    if is_null(src_value) or is_null(tgt_value):
+        return is_null(src_value) and is_null(tgt_value)
+
+    if src_value == tgt_value:
+        return True
+
+    return math.isclose(float(src_value), float(tgt_value), rel_tol=PROFILE_TOLERANCE)
+
+
+def same_datetime(src_value, tgt_value):
+    if is_null(src_value) or is_null(tgt_value):
+        return is_null(src_value) and is_null(tgt_value)
+
+    # The DB drivers return dates as date, datetime or text.
+    try:
+        return pd.Timestamp(src_value) == pd.Timestamp(tgt_value)
+    except (ValueError, TypeError):
+        return str(src_value) == str(tgt_value)
@@ -0,0 +1,132 @@
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .metrics import TableMetrics
+from .utils import write_log_entry
+
+# ------------------------------------------------------------------------------#
+# Result of the validation of a table.                                          #
+#                                                                               #
+# Each table task returns a TableResult. The HTML report is generated from      #
+# these objects, the log files are only written for the user to read.           #
+# ------------------------------------------------------------------------------#
+
+# Status of a table
+MATCH = "match"
+DIFFERENCES = "differences"
+SKIPPED = "skipped"
+ERROR = "error"
+
+DIFFERENCE_COLUMNS = ["primary_key", "column", "source_value", "target_value", "message"]
+
+
+class ValidationError(Exception):
+    """
+    Raised when a table, or a partition of it, can't be validated. The message
+    is reported in the summary of the table.
+    """
+
+
+class ColumnDifferences:
+    """
+    Column level differences of a table. They are kept column wise, as the
+    DataFrames produced by the comparison, rather than as a line (or an
+    object) per difference.
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def __len__(self):
+        return sum(len(chunk) for chunk in self.chunks)
+
+    def extend(self, df):
+        """
+        Adds the differences in the DataFrame. It must have the columns in
+        DIFFERENCE_COLUMNS, other columns are dropped.
+        """
+        if len(df) > 0:
+            self.chunks.append(df[DIFFERENCE_COLUMNS].reset_index(drop=True))
+
+    def rows(self):
+        """
+        Yields the differences as tuples, in the order of DIFFERENCE_COLUMNS.
+        """
+        for chunk in self.chunks:
+            yield from chunk.itertuples(index=False, name=None)
+
+    def to_frame(self):
+        """
+        Returns all the differences as a single DataFrame.
+        """
+        if len(self.chunks) == 0:
+            return pd.DataFrame(columns=DIFFERENCE_COLUMNS)
+
+        return pd.concat(self.chunks, ignore_index=True)
+
+
+@dataclass
+class TableResult:
+    """
+    Summary, counts, column differences & metrics of a table.
+    """
+
+    schema: str
+    table: str
+    status: str = MATCH
+    message: str = ""
+    no_recs_validated: int = 0
+    no_recs_having_differences: int = 0
+    columns_having_differences: list = field(default_factory=list)
+    differences: ColumnDifferences = field(default_factory=ColumnDifferences)
+    metrics: TableMetrics = field(default_factory=TableMetrics)
+
+    def summary_entry(self):
+        """
+        The last entry of the summary log file.
+        """
+        return (
+            f"{self.schema}~"
+            f"{self.table}~"
+            f"{self.no_recs_validated}~"
+            f"{self.no_recs_having_differences}~"
+            f"{','.join(self.columns_having_differences)}~"
+            f"{self.message}"
+        )
+
+
+def close_table_result(summary_file, result, status=None, message=None):
+    """
+    Sets the status & message of the result, writes the metrics & summary
+    entries & closes the summary file.
+
+    :return: The result.
+    """
+    if status is not None:
+        result.status = status
+
+    if message is not None:
+        result.message = message
+
+    result.metrics.stop()
+
+    write_log_entry(
+        summary_file, f"{result.schema}~{result.table}~0~0~~{result.metrics.summary_entry()}", False
+    )
+    write_log_entry(summary_file, result.summary_entry(), True)
+
+    return result
+
+
+def write_differences_log(file_location, result):
+    """
+    Writes the column differences of a table to a log file, one line per
+    difference: schema~table~primary key~column~source value~target value~message
+    """
+    with open(file_location, "w") as log_file:
+        for pk_data, col_name, src_value, tgt_value, msg in result.differences.rows():
+            log_file.write(
+                f"{result.schema}~{result.table}~{pk_data}~{col_name}~"
+                f"{src_value}~{tgt_value}~{msg}\n"
+            )
@@ -0,0 +1,410 @@
+import decimal
+import math
+import random
+import threading
+
+import pandas as pd
+from databases import table_to_df
+from databases.oracle_queries import oracle_queries
+from databases.postgres_queries import postgres_queries
+from databases.sql_server_queries import sqlserver_queries
+from databases.sqlite_queries import sqlite_queries
+from settings import (DATA_VALIDATION_REC_COUNT, SAMPLE_PERCENT, SAMPLE_SEED, SAMPLE_STRATA,
+                      SAMPLING_METHOD, SEQUENTIAL_CONFIDENCE, SEQUENTIAL_FIRST_BATCH,
+                      SEQUENTIAL_MAX_MISMATCH_RATE, SEQUENTIAL_MAX_RECORDS, SEQUENTIAL_SAMPLING,
+                      SEQUENTIAL_STOP_MISMATCHES)
+from sqlalchemy import text
+
+from .constants import ORACLE, POSTGRES, SQLITE, SQLSERVER
+
+
+def generate_source_queries(src_config, schema, table, primary_key, method=None):
+    """
+    Prepares the queries to read the records to be validated from the Source table.
+
+    Sampling methods (SAMPLING_METHOD):
+        - first      : The first records the DB returns.
+        - block      : Random blocks (Oracle SAMPLE BLOCK, Postgres TABLESAMPLE
+                       SYSTEM, SQL Server TABLESAMPLE SYSTEM).
+        - row        : Random records (Oracle SAMPLE, Postgres TABLESAMPLE
+                       BERNOULLI, SQL Server: a hash of the primary key).
+        - stratified : The primary key range is split into SAMPLE_STRATA ranges.
+                       From a random point in each range, the next records are
+                       read using the primary key index.
+
+    None of them sort the table. SAMPLE_PERCENT & SAMPLE_SEED control the
+    sample, so a run can be reproduced. Up to sample_rec_count() records are read.
+
+    :param primary_key: A list of primary key column names. Can be empty.
+    :param method: Sampling method, defaults to SAMPLING_METHOD.
+
+    :return: A list of tuples - (query, parameters). Parameters can be None.
+    """
+    db_engine = src_config["db_engine"]
+    queries = get_queries(db_engine)
+    method = method or SAMPLING_METHOD
+
+    if method == "stratified":
+        if len(primary_key) > 0:
+            stratified_queries = generate_range_queries(
+                src_config, schema, table, primary_key[0], SAMPLE_STRATA, True
+            )
+
+            if stratified_queries is not None:
+                return stratified_queries
+
+        print(
+            f"-> {schema}.{table}: Stratified sampling needs a numeric primary key, "
+            "reading the first records instead."
+        )
+        method = "first"
+
+    if method not in ["first", "block", "row"]:
+        raise ValueError(f"Unknown sampling method: {method}")
+
+    query = replace_placeholders(queries[f"sample_{method}"], schema, table, sample_rec_count())
+    query = query.replace(
+        "<key_columns>", ", ".join(primary_key) if len(primary_key) > 0 else "*"
+    )
+
+    return [(query, None)]
+
+
+def generate_changed_records_queries(src_config, schema, table, primary_key, window):
+    """
+    Prepares the query to read up to DATA_VALIDATION_REC_COUNT records changed
+    within the watermark window, in (watermark, primary key) order. The
+    watermark of each record is returned as the column WATERMARK_ALIAS. See
+    watermarks.get_watermark_window().
+
+    When the window starts from a key (the last record validated by the last
+    run), the records having the start watermark are read after that key. So,
+    many records sharing one watermark are read over several runs.
+
+    :param primary_key: A list of primary key column names.
+
+    :return: A list of tuples - (query, parameters).
+    """
+    queries = get_queries(src_config["db_engine"])
+    params = {"watermark_start": window["start"], "watermark_end": window["end"]}
+    key_filter = ""
+
+    if window.get("start_key") is not None:
+        # (watermark, key) > (start, start key), spelled out: not all the DBs
+        # compare row values.
+        key_conditions = []
+
+        for i, column in enumerate(primary_key):
+            conditions = [f"{primary_key[j]} = :key_{j}" for j in range(i)]
+            conditions.append(f"{column} > :key_{i}")
+            key_conditions.append("(" + " AND ".join(conditions) + ")")
+
+            params[f"key_{i}"] = window["start_key"][i]
+
+        key_filter = (
+            "AND (<watermark_column> > :watermark_start OR (<watermark_column> = :watermark_start "
+            "AND (" + " OR ".join(key_conditions) + ")))"
+        )
+
+    query = replace_placeholders(
+        queries["sample_changed"], schema, table, DATA_VALIDATION_REC_COUNT
+    )
+    query = query.replace("<key_filter>", key_filter).replace("<key_columns>", ", ".join(primary_key))
+    query = text(query.replace("<watermark_column>", window["column"]))
+
+    return [(query, params)]
+
+
+# Column of the sample_changed queries holding the watermark of each record.
+WATERMARK_ALIAS = "dv_watermark"
+
+
+def generate_partition_queries(src_config, schema, table, primary_key, no_partitions):
+    """
+    Splits the range of values of the first primary key column into partitions,
+    and prepares a query to read sample_rec_count() / no_partitions
+    records from the start of each partition.
+
+    :return: A list of tuples - (query, parameters). None, if the table doesn't
+        have a numeric primary key.
+    """
+    if len(primary_key) == 0:
+        return None
+
+    return generate_range_queries(
+        src_config, schema, table, primary_key[0], no_partitions, False
+    )
+
+
+def generate_range_queries(src_config, schema, table, key_column, no_ranges, random_start):
+    """
+    Splits the range of values of the key column into no_ranges ranges and
+    prepares a query for each range. Each query reads up to
+    sample_rec_count() / no_ranges records, in key order.
+
+    :param random_start: When true, records are read from a random point within
+        the range (using SAMPLE_SEED). Otherwise, from the start of the range.
+
+    :return: A list of tuples - (query, parameters). None, if the key column
+        isn't numeric.
+    """
+    queries = get_queries(src_config["db_engine"])
+
+    query = replace_placeholders(queries["key_range"], schema, table, 0)
+    query = query.replace("<key_column>", key_column)
+
+    df = table_to_df(src_config, query, None)
+    min_value, max_value = [to_number(v) for v in df.values.tolist()[0]]
+
+    if min_value is None or max_value is None:
+        return None
+
+    rec_count = math.ceil(sample_rec_count() / no_ranges)
+    width = (max_value - min_value) / no_ranges
+
+    range_query = replace_placeholders(queries["sample_range"], schema, table, rec_count)
+    range_query = text(range_query.replace("<key_column>", key_column))
+
+    rng = random.Random(SAMPLE_SEED)
+    range_queries = []
+
+    for i in range(no_ranges):
+        range_start = min_value + i * width
+        range_end = min_value + (i + 1) * width
+
+        # The last range includes the max. value.
+        if i == no_ranges - 1:
+            range_end = max_value + 1
+
+        start = range_start
+
+        if random_start:
+            start = range_start + rng.random() * (range_end - range_start)
+
+        # Integer keys: round the boundaries the same way, so the ranges don't overlap.
+        if isinstance(min_value, int) and isinstance(max_value, int):
+            start = math.ceil(start)
+            range_end = math.ceil(range_end)
+
+        range_queries.append((range_query, {"range_start": start, "range_end": range_end}))
+
+    return range_queries
+
+
+def sample_rec_count():
+    """
+    Returns the max. no. of records read from the Source table.
+    """
+    if SEQUENTIAL_SAMPLING:
+        return SEQUENTIAL_MAX_RECORDS
+
+    return DATA_VALIDATION_REC_COUNT
+
+
+def get_queries(db_engine):
+    """
+    Returns the dictionary of queries for the DB engine.
+    """
+    if db_engine in ORACLE:
+        return oracle_queries
+
+    if db_engine in POSTGRES:
+        return postgres_queries
+
+    if db_engine in SQLSERVER:
+        return sqlserver_queries
+
+    if db_engine in SQLITE:
+        return sqlite_queries
+
+    raise ValueError(f"{db_engine} IS NOT SUPPORTED AS SOURCE DB AT THE MOMENT")
+
+
+def replace_placeholders(query, schema, table, rec_count):
+    return (
+        query.replace("<schema>", schema)
+        .replace("<table>", table)
+        .replace("<rec_count>", str(rec_count))
+        .replace("<percent>", str(SAMPLE_PERCENT))
+        .replace("<seed>", str(SAMPLE_SEED))
+    )
+
+
+def to_number(value):
+    """
+    Returns the value as an int or float, None if it isn't a number.
+    """
+    if isinstance(value, bool):
+        return None
+
+    if isinstance(value, int):
+        return value
+
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+
+    if isinstance(value, float) and not math.isnan(value):
+        return value
+
+    if hasattr(value, "item"):
+        return to_number(value.item())
+
+    return None
+
+
+# ------------------------------------------------------------------------------#
+# Sequential sampling. The records are validated in batches of growing size,   #
+# until the mismatch rate of the table is known well enough (SEQUENTIAL_*).     #
+# ------------------------------------------------------------------------------#
+class SequentialSample:
+    """
+    The no. of records validated & having differences so far, in all the
+    partitions of a table. Decides when to stop reading the Source table.
+
+    The stop condition is checked after each batch. So that the mismatch rate
+    is below SEQUENTIAL_MAX_MISMATCH_RATE with SEQUENTIAL_CONFIDENCE over all
+    the checks, each check uses 1 - SEQUENTIAL_CONFIDENCE divided by the max.
+    no. of checks (Bonferroni correction).
+
+    :param no_queries: No. of queries (partitions) reading the Source table.
+    """
+
+    def __init__(self, no_queries=1):
+        self.no_recs_validated = 0
+        self.no_recs_having_differences = 0
+        self.confidence = 1 - (1 - SEQUENTIAL_CONFIDENCE) / max_looks(no_queries)
+        self.stopped = False
+        self.lock = threading.Lock()
+
+    def add(self, no_recs_validated, no_recs_having_differences):
+        """
+        Adds the counts of a batch.
+
+        :return: The reason to stop sampling, the first time it is reached.
+            Otherwise, None.
+        """
+        with self.lock:
+            if self.stopped:
+                return None
+
+            self.no_recs_validated += no_recs_validated
+            self.no_recs_having_differences += no_recs_having_differences
+
+            reason = stop_reason(
+                self.no_recs_validated, self.no_recs_having_differences, self.confidence
+            )
+            self.stopped = reason is not None
+
+            return reason
+
+
+def max_looks(no_queries):
+    """
+    Returns the max. no. of times the stop condition is checked for a table:
+    once per batch of each query. The batches of a query double in size, from
+    SEQUENTIAL_FIRST_BATCH to SEQUENTIAL_MAX_RECORDS records.
+    """
+    ratio = max(SEQUENTIAL_MAX_RECORDS / SEQUENTIAL_FIRST_BATCH, 1)
+
+    return no_queries * (math.ceil(math.log2(ratio)) + 1)
+
+
+def stop_reason(no_recs_validated, no_recs_having_differences, confidence):
+    """
+    Returns why sampling can stop after no_recs_validated records, None if it
+    can't yet.
+
+    :param confidence: Confidence of this check, see SequentialSample.
+    """
+    if no_recs_having_differences >= SEQUENTIAL_STOP_MISMATCHES:
+        return (
+            f"{no_recs_having_differences} records having differences found in "
+            f"{no_recs_validated} records"
+        )
+
+    upper_bound = mismatch_rate_upper_bound(
+        no_recs_validated, no_recs_having_differences, confidence
+    )
+
+    if upper_bound < SEQUENTIAL_MAX_MISMATCH_RATE:
+        return (
+            f"the mismatch rate is below {SEQUENTIAL_MAX_MISMATCH_RATE:g} with "
+            f"{SEQUENTIAL_CONFIDENCE:.0%} confidence, {no_recs_having_differences} records "
+            f"having differences found in {no_recs_validated} records"
+        )
+
+    return None
+
+
+def mismatch_rate_upper_bound(n, k, confidence):
+    """
+    Upper bound of the one sided Clopper-Pearson interval of the mismatch rate,
+    with k records having differences in n records: the rate p for which the
+    probability of finding k differences or fewer is 1 - confidence.
+    """
+    if n == 0 or k >= n:
+        return 1.0
+
+    alpha = 1 - confidence
+
+    if k == 0:
+        return 1 - alpha ** (1 / n)
+
+    # The probability decreases as p grows, find p by bisection.
+    low, high = k / n, 1.0
+
+    for _ in range(60):
+        p = (low + high) / 2
+
+        if binomial_cdf(k, n, p) > alpha:
+            low = p
+        else:
+            high = p
+
+    return high
+
+
+def binomial_cdf(k, n, p):
+    """
+    Probability of k or fewer successes in n trials of probability p.
+    """
+    log_p, log_q = math.log(p), math.log1p(-p)
+    log_n = math.lgamma(n + 1)
+    probability = 0.0
+
+    for i in range(k + 1):
+        log_combinations = log_n - math.lgamma(i + 1) - math.lgamma(n - i + 1)
+        probability += math.exp(log_combinations + i * log_p + (n - i) * log_q)
+
+    return min(1.0, probability)
+
+
+def growing_batches(chunks, first_batch):
+    """
+    Yields the DataFrames of an iterator, concatenated into batches of growing
+    size: first_batch records, then as many as all the previous batches, so the
+    no. of records read doubles with each batch. The last one may be smaller.
+    """
+    batch_size = first_batch
+    batch = []
+    no_recs = 0
+    no_recs_read = 0
+
+    try:
+        for df in chunks:
+            batch.append(df)
+            no_recs += len(df)
+
+            if no_recs >= batch_size:
+                yield batch[0] if len(batch) == 1 else pd.concat(batch, ignore_index=True)
+
+                no_recs_read += no_recs
+                batch_size = no_recs_read
+                batch, no_recs = [], 0
+
+        if no_recs > 0:
+            yield batch[0] if len(batch) == 1 else pd.concat(batch, ignore_index=True)
+    finally:
+        # Stop the query, if the caller stops reading early.
+        if hasattr(chunks, "close"):
+            chunks.close()
@@ -4,7 +4,9 @@ from datetime import datetime
 from pathlib import Path
 
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles.borders import Border, Side
+from settings import WRITE_LOG_FILES
 from tabulate import tabulate
 
 
@@ -47,9 +49,10 @@ def write_to_excel_file(list1, list2):
 
         return
 
-    wb = openpyxl.Workbook()
-    sheet = wb["Sheet"]  # Default sheet name is 'Sheet'
-    sheet.title = "structure_comparison"
+    # Write-only mode streams the rows to the file, rather than keeping a cell
+    # object for every cell in memory.
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet("structure_comparison")
     sheet.sheet_properties.tabColor = "1072BA"
 
     thin_border = Border(
@@ -70,16 +73,18 @@ def write_to_excel_file(list1, list2):
         + ".xlsx"
     )
 
-    for i in range(len(list1)):
-        for j in range(len(list1[i])):
-            sheet.cell(row=i + 1, column=j + 1).value = list1[i][j]
-            sheet.cell(row=i + 1, column=j + 1).border = thin_border
+    def bordered_cell(value):
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.border = thin_border
+        return cell
 
-        k = len(list1[i]) + 1
+    # list1 & list2 are written side by side, with an empty column in between.
+    for i in range(len(list1)):
+        row = [bordered_cell(value) for value in list1[i]]
+        row.append(None)
+        row += [bordered_cell(value) for value in list2[i]]
 
-        for j in range(len(list2[i])):
-            sheet.cell(row=i + 1, column=k + j + 1).value = list2[i][j]
-            sheet.cell(row=i + 1, column=k + j + 1).border = thin_border
+        sheet.append(row)
 
     wb.save(target_file)
 
@@ -113,6 +118,31 @@ def print_messages(messages, headers):
     )
 
 
+def write_log_entry(file, entry, close_file):
+    """
+    Writes an entry to a log file.
+
+    :param file: File object.
+    :param entry: Log entry.
+    :param close_file: When true, the file is closed after writing the entry.
+    """
+    file.write(entry + "\n")
+
+    if close_file:
+        file.close()
+
+
+def open_log_file(file_location, mode="w"):
+    """
+    Opens a log file for writing. When WRITE_LOG_FILES is false, the entries
+    are discarded.
+    """
+    if not WRITE_LOG_FILES:
+        return open(os.devnull, mode)
+
+    return open(file_location, mode)
+
+
 def get_tables_to_validate() -> list:
     """
     This function reads the "tables.txt" file in the project root folder and returns
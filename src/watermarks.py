@@ -0,0 +1,219 @@
+import datetime
+import json
+import os
+import threading
+import time
+
+from databases import table_to_df
+from settings import WATERMARK_COLUMNS
+
+from .constants import ORACLE, POSTGRES
+from .key_lookup import to_bind_value
+from .metadata import cache_key, db_identifier
+from .sampling import get_queries, replace_placeholders
+from .utils import get_project_root
+
+# ------------------------------------------------------------------------------#
+# Watermarks of the tables validated incrementally.                             #
+#                                                                               #
+# A run validates the records changed within [last watermark, current          #
+# watermark). The current watermark is saved when the table is validated, and  #
+# it's where the next run starts. When not all the changed records could be    #
+# read, the watermark & primary key of the last one are saved instead, and the #
+# next run reads the records after them (in watermark, key order).             #
+#                                                                               #
+# Entries are keyed by the Source DB & (schema, table), and kept in            #
+# watermarks/watermarks.json.                                                   #
+# ------------------------------------------------------------------------------#
+_watermarks = None
+_watermarks_lock = threading.Lock()
+
+# Pseudo columns used when no column is listed in WATERMARK_COLUMNS.
+ORACLE_WATERMARK_COLUMN = "ORA_ROWSCN"
+POSTGRES_WATERMARK_COLUMN = "(xmin::text)::bigint"
+
+
+def get_watermarks_file():
+    return os.path.join(get_project_root(), "watermarks", "watermarks.json")
+
+
+def load_watermarks():
+    """
+    Reads the watermarks file.
+    """
+    global _watermarks
+
+    with _watermarks_lock:
+        if _watermarks is not None:
+            return _watermarks
+
+        _watermarks = {}
+        watermarks_file = get_watermarks_file()
+
+        if os.path.exists(watermarks_file):
+            try:
+                with open(watermarks_file, "r") as f:
+                    _watermarks = json.load(f)
+            except (OSError, ValueError) as err:
+                print(f"-> Ignoring the watermarks {watermarks_file}: {err}")
+
+        return _watermarks
+
+
+def save_watermarks():
+    """
+    Writes the watermarks to the disk.
+    """
+    if _watermarks is None:
+        return
+
+    watermarks_file = get_watermarks_file()
+    os.makedirs(os.path.dirname(watermarks_file), exist_ok=True)
+
+    with _watermarks_lock:
+        # Write to a temporary file first, so that a crash doesn't leave a partial file.
+        with open(watermarks_file + ".tmp", "w") as f:
+            json.dump(_watermarks, f, indent=1)
+
+        os.replace(watermarks_file + ".tmp", watermarks_file)
+
+
+def get_watermark_column(src_config, schema, table):
+    """
+    Returns the column (or expression) that tells when a record was changed:
+    the column listed in WATERMARK_COLUMNS, ORA_ROWSCN on Oracle, xmin on
+    Postgres. None, if the table can't be validated incrementally.
+    """
+    column = WATERMARK_COLUMNS.get(f"{schema.upper()}.{table.upper()}")
+
+    if column is not None:
+        return column
+
+    db_engine = src_config["db_engine"]
+
+    if db_engine in ORACLE:
+        return ORACLE_WATERMARK_COLUMN
+
+    if db_engine in POSTGRES:
+        return POSTGRES_WATERMARK_COLUMN
+
+    return None
+
+
+def get_watermark_window(src_config, schema, table):
+    """
+    Returns the watermark window of the records to be validated.
+
+    :return: None, if the table can't be validated incrementally. Otherwise, a
+        dictionary with keys:
+        - column: The watermark column (or expression).
+        - start: The watermark saved by the last run, None on the first run.
+        - start_key: The primary key values of the last record validated by
+          the last run, when it couldn't read all the changed records. The
+          records having the start watermark are read after this key.
+          Otherwise, None.
+        - end: The current watermark.
+    """
+    column = get_watermark_column(src_config, schema, table)
+
+    if column is None:
+        return None
+
+    queries = get_queries(src_config["db_engine"])
+
+    if column in [ORACLE_WATERMARK_COLUMN, POSTGRES_WATERMARK_COLUMN]:
+        query = queries["watermark_current"]
+    else:
+        query = replace_placeholders(queries["watermark_max"], schema, table, 0)
+        query = query.replace("<watermark_column>", column)
+
+    end = to_bind_value(table_to_df(src_config, query, None).values.tolist()[0][0])
+
+    if end is None:
+        return None
+
+    start = None
+    start_key = None
+    entry = load_watermarks().get(cache_key(src_config, schema, table))
+
+    # A different column, or a watermark that went backwards (for ex, the
+    # table was reloaded): start again.
+    if entry is not None and entry["column"] == column:
+        start = decode_watermark(entry["value"])
+
+        if entry.get("key") is not None:
+            start_key = [decode_watermark(v) for v in entry["key"]]
+
+        if not is_before(start, end):
+            start = None
+            start_key = None
+
+    return {"column": column, "start": start, "start_key": start_key, "end": end}
+
+
+def set_watermark(src_config, schema, table, window):
+    """
+    Saves the end of the window (and its key, see advance_window()), the next
+    run validates the records changed after it.
+    """
+    watermarks = load_watermarks()
+    end_key = window.get("end_key")
+
+    with _watermarks_lock:
+        watermarks[cache_key(src_config, schema, table)] = {
+            "db": db_identifier(src_config),
+            "schema": schema.upper(),
+            "table": table.upper(),
+            "column": window["column"],
+            "value": encode_watermark(window["end"]),
+            "key": None if end_key is None else [encode_watermark(v) for v in end_key],
+            "validated_at": time.time(),
+        }
+
+
+def advance_window(window, last_watermark, last_key):
+    """
+    Returns the window ending at the last record read, when not all the records
+    changed within the window could be read. The next run starts after that
+    record: its watermark & primary key values (last_key) are saved.
+    """
+    return {
+        **window,
+        "end": to_bind_value(last_watermark),
+        "end_key": [to_bind_value(v) for v in last_key],
+    }
+
+
+def is_before(start, end):
+    try:
+        return start <= end
+    except TypeError:
+        return False
+
+
+def encode_watermark(value):
+    """
+    Converts a watermark to a JSON value: numbers as they are, timestamps &
+    row versions (bytes) tagged with their type.
+    """
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+
+    if isinstance(value, bytes):
+        return {"bytes": value.hex()}
+
+    if isinstance(value, (int, float, str)):
+        return value
+
+    # For ex, Decimal SCNs.
+    return int(value) if int(value) == value else float(value)
+
+
+def decode_watermark(value):
+    if isinstance(value, dict) and "datetime" in value:
+        return datetime.datetime.fromisoformat(value["datetime"])
+
+    if isinstance(value, dict) and "bytes" in value:
+        return bytes.fromhex(value["bytes"])
+
+    return value